@@ -0,0 +1,220 @@
+# batch_transform.py
+#
+# Element-wise transforms (square, double) and filters (even, odd, positive)
+# for the examples in list_function.py and list_comprehension.py, working on
+# lists, array.array or NumPy arrays.
+#
+# When NumPy is installed, NumPy arrays and large array.array inputs are
+# handled by vectorized NumPy kernels (array.array is viewed without copying).
+# Plain lists use a list comprehension by default, because converting a list
+# to NumPy and back costs about as much as the comprehension itself; pass
+# backend='numpy' to force it. The result has the same container type as the
+# input.
+#
+# Run this file to print a benchmark matrix (loop vs map vs comprehension vs
+# NumPy) for sizes from 10 up to 10**7 (pass a larger exponent, e.g.
+# `python batch_transform.py 8`, for 10**8; that needs several GB of RAM for
+# the list-based versions).
+
+import sys
+import time
+from array import array
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; everything falls back to pure Python
+    np = None
+
+# Below this many items, an array.array is cheaper to process in pure Python
+NUMPY_MIN_SIZE = 1000
+# Default number of items per chunk in chunked mode
+DEFAULT_CHUNK_SIZE = 1000000
+
+# Operation name -> (pure Python function, NumPy function)
+OPERATIONS = {
+    'square': (lambda x: x * x, lambda a: a * a),
+    'double': (lambda x: x * 2, lambda a: a * 2),
+}
+
+# Predicate name -> (pure Python test, NumPy boolean mask)
+PREDICATES = {
+    'even': (lambda x: x % 2 == 0, lambda a: a % 2 == 0),
+    'odd': (lambda x: x % 2 != 0, lambda a: a % 2 != 0),
+    'positive': (lambda x: x > 0, lambda a: a > 0),
+}
+
+# Largest absolute value each operation can take without overflowing int64
+INT64_LIMITS = {
+    'square': 3037000499,
+    'double': 2 ** 62 - 1,
+}
+
+
+def _to_numpy(values):
+    """Return a NumPy view/copy of values, or None if NumPy cannot hold them exactly."""
+    if isinstance(values, np.ndarray):
+        result = values
+    elif isinstance(values, array):
+        if values.typecode in ('u', 'w'):  # Unicode arrays are not numbers
+            return None
+        result = np.frombuffer(values, dtype=np.dtype(values.typecode))  # No copy
+    else:
+        result = np.asarray(values)
+    if result.dtype.kind not in 'iuf':  # Big ints or mixed types end up as objects
+        return None
+    return result
+
+
+def _from_numpy(result, original):
+    """Give the result back in the same container type as the input."""
+    if isinstance(original, np.ndarray):
+        return result
+    if isinstance(original, array):
+        converted = result.astype(np.dtype(original.typecode))
+        if not np.array_equal(converted, result, equal_nan=result.dtype.kind == 'f'):
+            raise OverflowError(f"result does not fit in array typecode '{original.typecode}'")
+        return array(original.typecode, converted.tobytes())
+    return result.tolist()
+
+
+def _use_numpy(values, backend):
+    if backend == 'python' or np is None:
+        return False
+    if backend == 'numpy':
+        return True
+    if isinstance(values, np.ndarray):
+        return True
+    return isinstance(values, array) and len(values) >= NUMPY_MIN_SIZE
+
+
+def apply(values, operation, backend='auto'):
+    """
+    Apply an element-wise operation ('square' or 'double').
+
+    backend: 'auto' (NumPy for NumPy arrays and large array.array inputs),
+             'numpy' or 'python'.
+
+    Usage example:
+        apply([1, 2, 3], 'square')  # [1, 4, 9]
+    """
+    python_fn, numpy_fn = OPERATIONS[operation]
+    if _use_numpy(values, backend):
+        data = _to_numpy(values)
+        # Python ints never overflow, so only vectorize when int64 is safe. The
+        # bounds are checked separately: np.abs() of int64's minimum is negative.
+        limit = INT64_LIMITS[operation]
+        if data is not None and (data.dtype.kind == 'f' or data.size == 0
+                                 or (data.min() >= -limit and data.max() <= limit)):
+            if data.dtype.kind in 'iu':
+                data = data.astype(np.int64, copy=False)
+            return _from_numpy(numpy_fn(data), values)
+    if np is not None and isinstance(values, np.ndarray):
+        # Python ints (tolist()), so nothing wraps around; NumPy then picks the
+        # result dtype: int64 when every result fits, objects (Python ints) when not
+        result = [python_fn(x) for x in values.tolist()]
+        return np.array(result) if result else values.copy()
+    result = [python_fn(x) for x in values]
+    if isinstance(values, array):
+        return array(values.typecode, result)  # Raises OverflowError if a result does not fit
+    return result
+
+
+def keep(values, predicate, backend='auto'):
+    """
+    Keep the items matching a predicate ('even', 'odd' or 'positive').
+
+    Usage example:
+        keep([1, 2, 3, 4], 'even')  # [2, 4]
+    """
+    python_test, numpy_mask = PREDICATES[predicate]
+    if _use_numpy(values, backend):
+        data = _to_numpy(values)
+        if data is not None:
+            return _from_numpy(data[numpy_mask(data)], values)
+    if np is not None and isinstance(values, np.ndarray):
+        # The kept items are input items, so the input dtype holds them exactly
+        return np.array([x for x in values.tolist() if python_test(x)], dtype=values.dtype)
+    result = [x for x in values if python_test(x)]
+    if isinstance(values, array):
+        return array(values.typecode, result)
+    return result
+
+
+def square(values, backend='auto'):
+    return apply(values, 'square', backend)
+
+
+def double(values, backend='auto'):
+    return apply(values, 'double', backend)
+
+
+def transform_chunks(iterable, operation=None, predicate=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     dtype='int64', backend='auto'):
+    """
+    Transform an iterable that may be larger than memory, one chunk at a time.
+
+    Each chunk is filtered by `predicate` (if given) and then transformed by
+    `operation` (if given). Chunks are NumPy arrays of `dtype` when NumPy is
+    used, otherwise lists.
+
+    Usage example:
+        total = sum(int(chunk.sum()) for chunk in transform_chunks(range(10**9), 'square'))
+    """
+    iterator = iter(iterable)
+    use_numpy = backend != 'python' and np is not None
+    while True:
+        if use_numpy:
+            chunk = np.fromiter(islice(iterator, chunk_size), dtype=dtype)
+        else:
+            chunk = list(islice(iterator, chunk_size))
+        if len(chunk) == 0:
+            return
+        chunk_backend = 'numpy' if use_numpy else 'python'
+        if predicate:
+            chunk = keep(chunk, predicate, chunk_backend)
+        if operation:
+            chunk = apply(chunk, operation, chunk_backend)
+        yield chunk
+
+
+#############
+# Benchmark matrix
+#############
+
+def _time(fn, repeats):
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start_time) / repeats
+
+
+def benchmark(max_exponent=7):
+    """Time squaring with a loop, map, a comprehension and NumPy for sizes 10 .. 10**max_exponent."""
+    from list_comprehension import square_numbers_loop, square_numbers_comprehension
+
+    methods = [
+        ('loop', lambda nums, arr: square_numbers_loop(nums)),
+        ('map', lambda nums, arr: list(map(lambda x: x * x, nums))),
+        ('comprehension', lambda nums, arr: square_numbers_comprehension(nums)),
+    ]
+    if np is not None:
+        methods.append(('numpy (list in/out)', lambda nums, arr: square(nums, backend='numpy')))
+        methods.append(('numpy (ndarray)', lambda nums, arr: square(arr, backend='numpy')))
+    else:
+        print("NumPy is not installed; only the pure Python methods are timed.")
+
+    sizes = [10 ** e for e in range(1, max_exponent + 1)]
+    print("Seconds per call to square N numbers")
+    print(f"{'N':>12} " + " ".join(f"{name:>20}" for name, _ in methods))
+    for n in sizes:
+        numbers = list(range(n))
+        numpy_numbers = np.arange(n, dtype=np.int64) if np is not None else None
+        repeats = max(1, 10 ** 6 // n)  # Repeat small sizes so the timing is meaningful
+        timings = [_time(lambda: fn(numbers, numpy_numbers), repeats) for _, fn in methods]
+        print(f"{n:>12,} " + " ".join(f"{t:>20.6f}" for t in timings))
+        del numbers, numpy_numbers
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 7)
@@ -1,7 +1,26 @@
 import csv  # Import the csv module for reading and writing CSV files
 import json  # Import the json module for working with JSON data
+import io  # Capturing output during benchmarks
+import os  # File sizes and removing temporary part files
+import sys  # Command line arguments and progress output
+import math  # Checking that inferred floats are finite
+import time  # Timing the conversions for progress and benchmarks
+import shutil  # Copying part files into the final output
+import argparse  # Command line interface
+import tempfile  # Temporary directory for the parallel part files
+from concurrent.futures import ProcessPoolExecutor  # Process pool for parallel mode
 
-def csv_to_json(csv_file, json_file):
+from generator import Pipeline  # Lazy generator pipeline stages
+
+# Size of each byte range handed to a worker in parallel mode
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+# Bytes read at a time when counting quotes between chunk boundaries
+QUOTE_SCAN_BYTES = 1024 * 1024
+# Print progress every this many rows in streaming mode
+PROGRESS_EVERY_ROWS = 100000
+
+def csv_to_json_list(csv_file, json_file):
+    """Original list-based version, kept as the baseline for benchmark_pipeline()."""
     try:
         data = []  # Initialize an empty list to store CSV rows as dictionaries
         with open(csv_file, mode='r', newline='', encoding='utf-8') as f:  # Open the CSV file for reading
@@ -16,6 +35,245 @@ def csv_to_json(csv_file, json_file):
     except Exception as e:  # Handle any other exceptions
         print(f"An error occurred: {e}")  # Print the exception message
 
+# Streaming conversion
+# ---------------------
+# csv_to_json_list() above keeps every row in a list before writing, so memory
+# grows with the input. The functions below write each row as soon as it is read.
+
+def infer_value(value):
+    """Convert a CSV string to an int or float when it is plainly numeric."""
+    try:
+        number = int(value)  # Try an integer first
+        if str(number) == value:  # Keep values like '007' or '+5' as text
+            return number
+        return value
+    except ValueError:
+        pass
+    try:
+        number = float(value)  # Then try a float
+    except ValueError:
+        return value  # Not numeric, keep the string
+    return number if math.isfinite(number) else value  # JSON has no NaN/Infinity
+
+def make_record(fieldnames, values):
+    """
+    Pair a row with the header the way csv.DictReader does: values beyond the
+    header go in a list under the None key, and missing trailing fields are None.
+    """
+    record = dict(zip(fieldnames, values))
+    if len(values) > len(fieldnames):
+        record[None] = list(values[len(fieldnames):])
+    elif len(values) < len(fieldnames):
+        for name in fieldnames[len(values):]:
+            record[name] = None
+    return record
+
+def iter_records(rows, fieldnames, infer_types=False):
+    """Yield one dict per CSV row, optionally converting numeric columns."""
+    for values in rows:  # Each row is a list of strings
+        if not values:
+            continue  # Skip blank lines, as csv.DictReader does
+        if infer_types:
+            values = [infer_value(value) for value in values]
+        yield make_record(fieldnames, values)  # Pair the values with the header
+
+def write_records(records, out, json_lines=False, first=True):
+    """Write records one at a time as JSON Lines or as JSON array items. Returns the count."""
+    count = 0
+    for record in records:
+        if json_lines:
+            out.write(json.dumps(record))
+            out.write('\n')
+        else:
+            # Array items are separated by commas, one item per line
+            out.write('\n    ' if first and count == 0 else ',\n    ')
+            out.write(json.dumps(record))
+        count += 1
+    return count
+
+def report_progress(rows, start_time, done=False):
+    """Print a single updating progress line to stderr."""
+    elapsed = time.perf_counter() - start_time
+    rate = rows / elapsed if elapsed else 0
+    end = '\n' if done else ''
+    print(f"\r{rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)", end=end, file=sys.stderr, flush=True)
+
+def counting_progress(records, start_time, every=PROGRESS_EVERY_ROWS):
+    """Pass records through while printing progress every few rows."""
+    rows = 0
+    for rows, record in enumerate(records, 1):
+        if rows % every == 0:
+            report_progress(rows, start_time)
+        yield record
+    report_progress(rows, start_time, done=True)
+
+def csv_to_json_streaming(csv_file, json_file, json_lines=False, infer_types=False, progress=False):
+    """
+    Convert a CSV file to a JSON array (or JSON Lines) without holding the rows in memory.
+
+    Usage example:
+        csv_to_json_streaming('big.csv', 'big.jsonl', json_lines=True, infer_types=True)
+    """
+    start_time = time.perf_counter()
+    with open(csv_file, mode='r', newline='', encoding='utf-8') as f_in, \
+            open(json_file, mode='w', encoding='utf-8') as f_out:
+        reader = csv.reader(f_in)
+        records = iter_records(reader, next(reader, []), infer_types)
+        if progress:
+            records = counting_progress(records, start_time)
+        if not json_lines:
+            f_out.write('[')
+        count = write_records(records, f_out, json_lines)
+        if not json_lines:
+            f_out.write('\n]\n' if count else ']\n')
+    return count
+
+# Parallel conversion
+# -------------------
+# Large files are split into byte ranges that start and end on record boundaries.
+# Each worker converts its range into a part file, and the parts are joined in
+# order. A line break inside a quoted field never ends a range.
+
+def read_record_line(f):
+    """Read one record from a binary file, joining lines inside quoted fields."""
+    line = f.readline()
+    while line.count(b'"') % 2:  # An odd number of quotes: the field goes on
+        more = f.readline()
+        if not more:
+            break
+        line += more
+    return line
+
+def count_quotes(f, start, end):
+    """Number of quote characters between two byte offsets of a binary file."""
+    position = f.tell()
+    f.seek(start)
+    quotes = 0
+    while start < end:
+        block = f.read(min(QUOTE_SCAN_BYTES, end - start))
+        if not block:
+            break
+        quotes += block.count(b'"')
+        start += len(block)
+    f.seek(position)
+    return quotes
+
+def find_chunks(csv_file, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Return the header and the (start, end) byte ranges of the rows after it.
+
+    A line break only ends a record when an even number of quotes comes
+    before it, so a boundary inside a quoted field moves on to the end of
+    that record.
+    """
+    with open(csv_file, mode='rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        header = next(csv.reader([read_record_line(f).decode('utf-8')]), [])
+        offsets = [f.tell()]
+        while offsets[-1] + chunk_bytes < size:
+            f.seek(offsets[-1] + chunk_bytes)
+            f.readline()  # Move forward to the start of the next line
+            quotes = count_quotes(f, offsets[-1], f.tell())
+            while quotes % 2 and f.tell() < size:
+                quotes += f.readline().count(b'"')
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+        offsets.append(size)
+    return header, list(zip(offsets[:-1], offsets[1:]))
+
+def read_lines(f, start, end):
+    """Yield the decoded lines of a binary file between two byte offsets."""
+    f.seek(start)
+    for line in f:
+        if start >= end:
+            return
+        start += len(line)
+        yield line.decode('utf-8')
+
+def convert_chunk(task):
+    """Worker: convert one byte range into a part file and return its row count."""
+    csv_file, header, start, end, part_file, json_lines, infer_types = task
+    with open(csv_file, mode='rb') as f_in, \
+            open(part_file, mode='w', encoding='utf-8') as out:
+        records = iter_records(csv.reader(read_lines(f_in, start, end)), header, infer_types)
+        return write_records(records, out, json_lines, first=False)
+
+def csv_to_json_parallel(csv_file, json_file, json_lines=False, infer_types=False,
+                         workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES, progress=False):
+    """
+    Convert a large CSV file on a process pool, keeping the output in input order.
+
+    Usage example:
+        csv_to_json_parallel('big.csv', 'big.json', workers=8)
+    """
+    start_time = time.perf_counter()
+    header, chunks = find_chunks(csv_file, chunk_bytes)  # Byte ranges aligned to record starts
+    count = 0
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(json_file))) as tmp_dir:
+        tasks = [
+            (csv_file, header, start, end, os.path.join(tmp_dir, f'part-{i:05d}'), json_lines, infer_types)
+            for i, (start, end) in enumerate(chunks)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                open(json_file, mode='w', encoding='utf-8') as f_out:
+            if not json_lines:
+                f_out.write('[')
+            # map() returns results in task order, so parts are appended in order
+            for task, part_count in zip(tasks, executor.map(convert_chunk, tasks)):
+                part_file = task[4]
+                if part_count:
+                    with open(part_file, mode='r', encoding='utf-8') as part:
+                        if not json_lines:
+                            # Each part starts with ',\n    '; the very first item has no comma
+                            first_separator = part.read(1)
+                            if count:
+                                f_out.write(first_separator)
+                        shutil.copyfileobj(part, f_out)
+                os.remove(part_file)
+                count += part_count
+                if progress:
+                    report_progress(count, start_time)
+            if not json_lines:
+                f_out.write('\n]\n' if count else ']\n')
+    if progress:
+        report_progress(count, start_time, done=True)
+    return count
+
+# Pipeline version of csv_to_json
+# -------------------------------
+# Produces exactly the same file as csv_to_json_list(), but each row goes
+# through a lazy pipeline (see generator.py) and is written straight away.
+
+def format_array_item(record):
+    """Format one record the way json.dump(..., indent=4) lays out a list item."""
+    return '\n    ' + json.dumps(record, indent=4).replace('\n', '\n    ')
+
+def csv_to_json(csv_file, json_file):
+    try:
+        with open(csv_file, mode='r', newline='', encoding='utf-8') as f_in, \
+                open(json_file, mode='w', encoding='utf-8') as f:  # Open the JSON file for writing
+            reader = csv.reader(f_in)  # Rows as lists of strings
+            fieldnames = next(reader, [])  # Column names from the first line
+            pipeline = (Pipeline(reader)
+                        .filter(bool)  # Skip blank lines, as csv.DictReader does
+                        .map(lambda row: make_record(fieldnames, row))  # Pair each row with the header
+                        .map(format_array_item)  # Turn each record into its JSON text
+                        .batch(1000))  # Write a thousand items per call
+            f.write('[')
+            first = True
+            for items in pipeline:
+                if not first:
+                    f.write(',')  # Separate this batch from the previous one
+                f.write(','.join(items))
+                first = False
+            f.write(']' if first else '\n]')  # Same ending as json.dump
+        print(f"Successfully converted {csv_file} to {json_file}")  # Print success message
+    except FileNotFoundError:  # Handle the case where the CSV file does not exist
+        print(f"Error: File {csv_file} not found.")  # Print error message
+    except Exception as e:  # Handle any other exceptions
+        print(f"An error occurred: {e}")  # Print the exception message
+
 # Sample usage with sample data
 def create_sample_csv(filename):
     sample_data = [  # Define a list of dictionaries as sample data
@@ -28,9 +286,124 @@ def create_sample_csv(filename):
         writer.writeheader()  # Write the header row to the CSV file
         writer.writerows(sample_data)  # Write all sample data rows to the CSV file
 
+# Benchmark
+def create_large_csv(filename, size_mb):
+    """Write a synthetic CSV file of roughly size_mb megabytes."""
+    target = size_mb * 1024 * 1024
+    cities = ['Austin', 'Dallas', 'Houston', 'San Antonio', 'El Paso']
+    with open(filename, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'age', 'gpa', 'city'])
+        row_id = 0
+        while f.tell() < target:
+            # Write in blocks so the size check is cheap
+            writer.writerows(
+                [i, f'Student {i}', 18 + i % 10, f'{2 + (i % 200) / 100:.2f}', cities[i % len(cities)]]
+                for i in range(row_id, row_id + 100000)
+            )
+            row_id += 100000
+
+def benchmark(size_mb=1024, workers=None):
+    """Time the streaming and parallel modes on a generated CSV of size_mb megabytes."""
+    import resource  # Peak memory (Unix only)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, 'input.csv')
+        print(f"Generating {size_mb} MB CSV...")
+        create_large_csv(csv_file, size_mb)
+        actual_mb = os.path.getsize(csv_file) / (1024 * 1024)
+
+        modes = [
+            ('streaming array', lambda out: csv_to_json_streaming(csv_file, out, infer_types=True)),
+            ('streaming jsonl', lambda out: csv_to_json_streaming(csv_file, out, json_lines=True, infer_types=True)),
+            ('parallel array', lambda out: csv_to_json_parallel(csv_file, out, infer_types=True, workers=workers)),
+            ('parallel jsonl', lambda out: csv_to_json_parallel(csv_file, out, json_lines=True, infer_types=True, workers=workers)),
+        ]
+        print(f"{'Mode':<18} {'Rows':>12} {'Seconds':>9} {'MB/s':>9} {'Peak RSS (MB)':>14}")
+        print("-" * 66)
+        for name, convert in modes:
+            out = os.path.join(tmp_dir, 'output.json')
+            start_time = time.perf_counter()
+            rows = convert(out)
+            seconds = time.perf_counter() - start_time
+            os.remove(out)
+            # ru_maxrss is in KB on Linux; for parallel modes the workers' peak is reported
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN if name.startswith('parallel') else resource.RUSAGE_SELF)
+            print(f"{name:<18} {rows:>12,} {seconds:>9.2f} {actual_mb / seconds:>9.1f} {usage.ru_maxrss / 1024:>14.1f}")
+
+def benchmark_pipeline(size_mb=50):
+    """Compare the list-based and pipeline versions of csv_to_json (time and peak Python memory)."""
+    import tracemalloc
+    from contextlib import redirect_stdout
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, 'input.csv')
+        create_large_csv(csv_file, size_mb)
+        print(f"csv_to_json on a {os.path.getsize(csv_file) / (1024 * 1024):.0f} MB CSV")
+        print(f"{'Version':<10} {'Seconds':>9} {'Peak memory (MB)':>17}")
+        print("-" * 38)
+        outputs = []
+        for name, convert in (('list', csv_to_json_list), ('pipeline', csv_to_json)):
+            out = os.path.join(tmp_dir, f'{name}.json')
+            outputs.append(out)
+            with redirect_stdout(io.StringIO()):  # Hide the success messages
+                start_time = time.perf_counter()
+                convert(csv_file, out)
+                seconds = time.perf_counter() - start_time
+                # Measure memory in a second run, since tracing slows everything down
+                tracemalloc.start()
+                convert(csv_file, out)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{name:<10} {seconds:>9.2f} {peak / (1024 * 1024):>17.1f}")
+        with open(outputs[0], 'rb') as a, open(outputs[1], 'rb') as b:
+            print("Outputs identical:", a.read() == b.read())
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description='Convert a CSV file to JSON or JSON Lines.')
+    parser.add_argument('csv_file', nargs='?', help='input CSV file')
+    parser.add_argument('json_file', nargs='?', help='output JSON file')
+    parser.add_argument('--jsonl', action='store_true', help='write JSON Lines instead of a JSON array')
+    parser.add_argument('--infer-types', action='store_true', help='convert numeric columns to numbers')
+    parser.add_argument('--workers', type=int, default=0, help='convert in parallel with this many processes')
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_BYTES // (1024 * 1024),
+                        help='size of each parallel chunk in MB')
+    parser.add_argument('--quiet', action='store_true', help='do not print progress')
+    parser.add_argument('--benchmark-pipeline', type=int, metavar='SIZE_MB', nargs='?', const=50,
+                        help='benchmark the list and pipeline versions of csv_to_json (default 50 MB)')
+    parser.add_argument('--benchmark', type=int, metavar='SIZE_MB', nargs='?', const=1024,
+                        help='benchmark the converters on a generated CSV (default 1024 MB)')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.benchmark, workers=args.workers or None)
+        return
+
+    if args.benchmark_pipeline:
+        benchmark_pipeline(args.benchmark_pipeline)
+        return
+
+    if not args.csv_file or not args.json_file:
+        # No files given: run the original small example
+        sample_csv = 'sample.csv'  # Define the sample CSV file name
+        sample_json = 'sample.json'  # Define the sample JSON file name
+        create_sample_csv(sample_csv)  # Create a sample CSV file with sample data
+        csv_to_json(sample_csv, sample_json)  # Convert the sample CSV file to a JSON file
+        return
+
+    try:
+        if args.workers:
+            count = csv_to_json_parallel(args.csv_file, args.json_file, args.jsonl, args.infer_types,
+                                         workers=args.workers, chunk_bytes=args.chunk_mb * 1024 * 1024,
+                                         progress=not args.quiet)
+        else:
+            count = csv_to_json_streaming(args.csv_file, args.json_file, args.jsonl, args.infer_types,
+                                          progress=not args.quiet)
+        print(f"Successfully converted {count} rows from {args.csv_file} to {args.json_file}")
+    except FileNotFoundError:  # Handle the case where the CSV file does not exist
+        print(f"Error: File {args.csv_file} not found.")
+
 if __name__ == "__main__":  # Check if this script is being run directly
-    sample_csv = 'sample.csv'  # Define the sample CSV file name
-    sample_json = 'sample.json'  # Define the sample JSON file name
-    create_sample_csv(sample_csv)  # Create a sample CSV file with sample data
-    csv_to_json(sample_csv, sample_json)  # Convert the sample CSV file to a JSON file
+    main()
 
@@ -1,3 +1,9 @@
+import heapq
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import islice
 
 # here all the value from the 0 to 200 will be stored in a memory. 
 def creater(): 
@@ -10,8 +16,6 @@ def creater():
 
     return listValue
 
-print(creater())
-
 
 # Here the value will be generated one by one and it will not store all the value in a memory.
 # This is called generator function. 
@@ -26,7 +30,255 @@ def generator_create():
         i += 1; 
 
 
-generator_value = generator_create(); 
+#############
+# Streaming pipelines built from generators
+#############
+# Each stage below is a generator that pulls items from the stage before it.
+# Nothing runs until the last stage asks for an item, so only a handful of
+# items are in memory at once: that pull model is the pipeline's backpressure.
+# Stages that have to hold items (batch, window, dedupe, parallel map) keep a
+# bounded buffer and report its peak size.
+
+
+class StageStats:
+    """Counters collected for one stage when a pipeline is instrumented."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0  # Items the stage produced
+        self.seconds = 0.0  # Time spent producing them, including upstream stages
+        self.peak_buffered = 0  # Most items the stage held at once
+        self.peak_memory = 0  # Highest traced memory (bytes) seen while the stage ran
+
+    def note_buffer(self, size):
+        if size > self.peak_buffered:
+            self.peak_buffered = size
+
+
+def map_stage(items, stats, fn):
+    for item in items:
+        yield fn(item)
+
+
+def filter_stage(items, stats, predicate):
+    for item in items:
+        if predicate(item):
+            yield item
+
+
+def _check_positive(name, value):
+    """Sizes and steps of 0 or less would loop forever or yield nothing."""
+    if value < 1:
+        raise ValueError(f"{name} must be at least 1, got {value}")
+
+
+def batch_stage(items, stats, size):
+    """Group items into lists of at most `size`."""
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        stats.note_buffer(len(batch))
+        yield batch
+
+
+def window_stage(items, stats, size, step):
+    """Sliding windows (tuples) of `size` items, moving `step` items at a time."""
+    window = deque(maxlen=size)
+    skip = 0
+    for item in items:
+        window.append(item)
+        stats.note_buffer(len(window))
+        if skip:
+            skip -= 1
+            continue
+        if len(window) == size:
+            yield tuple(window)
+            skip = step - 1
+
+
+def dedupe_stage(items, stats, key, max_keys):
+    """Drop repeated items. With max_keys, only the most recent keys are remembered."""
+    seen = set()
+    order = deque()
+    for item in items:
+        k = key(item) if key else item
+        if k in seen:
+            continue
+        seen.add(k)
+        if max_keys:
+            order.append(k)
+            if len(order) > max_keys:
+                seen.discard(order.popleft())
+        stats.note_buffer(len(seen))
+        yield item
+
+
+def parallel_map_stage(items, stats, fn, workers, executor, max_pending):
+    """Run fn on a thread or process pool, yielding results in input order."""
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            stats.note_buffer(len(pending))
+            # Stop pulling new input until the oldest result has been taken
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def merge_sorted(*iterables, key=None, reverse=False):
+    """
+    Lazily merge already-sorted iterables into one sorted stream.
+
+    Usage example:
+        list(merge_sorted([1, 4, 7], [2, 5], [3, 6]))  # [1, 2, 3, 4, 5, 6, 7]
+    """
+    return heapq.merge(*iterables, key=key, reverse=reverse)
+
+
+def _instrumented(items, stats):
+    """Wrap a stage's output to count items, time and traced memory."""
+    iterator = iter(items)
+    tracing = tracemalloc.is_tracing()
+    while True:
+        start_time = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - start_time
+            return
+        stats.seconds += time.perf_counter() - start_time
+        stats.items += 1
+        if tracing:
+            current = tracemalloc.get_traced_memory()[0]
+            if current > stats.peak_memory:
+                stats.peak_memory = current
+        yield item
+
+
+def _traced(items):
+    """Trace memory allocations while items are consumed, unless tracing is already on."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield from items
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+class Pipeline:
+    """
+    A chain of lazy stages over any iterable.
+
+    Use case:
+        - Process large inputs item by item without building lists in between.
+        - Run a CPU-heavy step on a pool while keeping the output order.
+
+    Usage example:
+        pipeline = (Pipeline(range(1, 201), instrument=True)
+                    .map(lambda x: x * x)
+                    .filter(lambda x: x % 2 == 0)
+                    .batch(10))
+        for batch in pipeline:
+            print(batch)
+        pipeline.report()
+    """
+
+    def __init__(self, source, instrument=False):
+        self.source = source
+        self.instrument = instrument
+        self.stages = []  # (name, stage function, extra arguments)
+        self.stats = []
+
+    def _add(self, name, stage, *args):
+        self.stages.append((name, stage, args))
+        return self
+
+    def map(self, fn, workers=0, executor='thread', max_pending=None):
+        """Apply fn to every item; with workers > 0 it runs on a thread/process pool."""
+        if workers:
+            return self._add(f'map[{executor} x{workers}]', parallel_map_stage, fn, workers,
+                             executor, max_pending or workers * 4)
+        return self._add('map', map_stage, fn)
+
+    def filter(self, predicate):
+        return self._add('filter', filter_stage, predicate)
+
+    def batch(self, size):
+        _check_positive('batch size', size)
+        return self._add(f'batch({size})', batch_stage, size)
+
+    def window(self, size, step=1):
+        _check_positive('window size', size)
+        _check_positive('window step', step)
+        return self._add(f'window({size}, {step})', window_stage, size, step)
+
+    def dedupe(self, key=None, max_keys=None):
+        return self._add('dedupe', dedupe_stage, key, max_keys)
+
+    def then(self, stage, name=None):
+        """Add a custom stage: a function taking an iterator and returning an iterator."""
+        return self._add(name or getattr(stage, '__name__', 'stage'),
+                         lambda items, stats: stage(items))
+
+    def __iter__(self):
+        self.stats = []
+        source_stats = StageStats('source')
+        items = iter(self.source)
+        if self.instrument:
+            items = _instrumented(items, source_stats)
+            self.stats.append(source_stats)
+        for name, stage, args in self.stages:
+            stats = StageStats(name)
+            items = stage(items, stats, *args)
+            if self.instrument:
+                items = _instrumented(items, stats)
+                self.stats.append(stats)
+        if self.instrument:
+            items = _traced(items)  # So the peak memory column has something to report
+        return items
+
+    def run(self):
+        """Consume the pipeline and return the number of items that came out."""
+        count = 0
+        for count, _ in enumerate(self, 1):
+            pass
+        return count
+
+    def report(self):
+        """Print items/sec, time and buffer size for every stage (needs instrument=True)."""
+        print(f"{'Stage':<22} {'Items':>10} {'Own time (s)':>13} {'Items/sec':>12} "
+              f"{'Peak buffer':>12} {'Peak mem (KB)':>14}")
+        print("-" * 88)
+        upstream_seconds = 0.0
+        for stats in self.stats:
+            # A stage's timer includes the stages it pulls from, so subtract them
+            own_seconds = max(stats.seconds - upstream_seconds, 0.0)
+            upstream_seconds = stats.seconds
+            rate = stats.items / stats.seconds if stats.seconds else 0
+            print(f"{stats.name:<22} {stats.items:>10,} {own_seconds:>13.3f} {rate:>12,.0f} "
+                  f"{stats.peak_buffered:>12,} {stats.peak_memory / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    print(creater())
+
+    generator_value = generator_create();
+
+    print(next(generator_value));
+    print(next(generator_value));
 
-print(next(generator_value));
-print(next(generator_value));  
\ No newline at end of file
+    # The same numbers through a pipeline: square, keep evens, group in tens
+    pipeline = (Pipeline(generator_create(), instrument=True)
+                .map(lambda x: x * x)
+                .filter(lambda x: x % 2 == 0)
+                .dedupe()
+                .batch(10))
+    for batch in islice(pipeline, 2):
+        print(batch)
+    pipeline.report()
@@ -0,0 +1,422 @@
+# grading.py
+#
+# Batch version of intialProject.grade_check(). Instead of asking one student
+# for three marks with input(), it grades whole class rosters:
+#   - rosters are CSV or JSON Lines files (or already open text streams)
+#   - any list of subjects, each with its own weight
+#   - percentages and divisions are computed for a chunk of students at a
+#     time with NumPy (pure Python when NumPy is not installed)
+#   - division thresholds are configurable; the default matches grade_check():
+#     above 80 is "1st division", everything else "2nd Division"
+#   - students with a missing mark (empty CSV field, JSON null or NaN) get no
+#     percentage and the division "Incomplete" instead of a computed one
+#   - results are written chunk by chunk, so memory stays bounded by
+#     chunk_rows no matter how long the roster is
+#
+# Roster layout (CSV header or JSONL keys): name, roll_number, then one column
+# per subject holding marks out of 100. Columns not listed as subjects are
+# ignored.
+#
+# Usage:
+#   python grading.py roster.csv results.csv --subject Math:2 --subject Science --subject Computer
+#   python grading.py roster.jsonl results.jsonl --division 80:"1st division" --division 60:"2nd division" --below "3rd division"
+#   python grading.py --benchmark 10000000
+#   python grading.py  # Runs test_grading()
+
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; grading falls back to pure Python
+    np = None
+
+# Same subjects and rule as grade_check()
+DEFAULT_SUBJECTS = {"Math": 1, "Science": 1, "Computer": 1}
+DEFAULT_DIVISIONS = [(80, "1st division")]
+DEFAULT_BELOW = "2nd Division"
+DEFAULT_INCOMPLETE = "Incomplete"
+# Students graded (and held in memory) at a time
+DEFAULT_CHUNK_ROWS = 100000
+
+RESULT_COLUMNS = ["name", "roll_number", "percentage", "division"]
+
+
+class GradingScheme:
+    """
+    Subject weights and division thresholds.
+
+    A student is in the division of the highest threshold their percentage is
+    strictly greater than (like `totalPercentage > 80` in grade_check()), and
+    in `below` otherwise. A student missing any mark is `incomplete`.
+
+    Usage example:
+        scheme = GradingScheme({"Math": 2, "Science": 1}, [(80, "1st"), (60, "2nd")], below="3rd")
+        scheme.grade([[90], [60]])  # ([80.0], ['2nd'])
+    """
+
+    def __init__(self, subjects=None, divisions=None, below=DEFAULT_BELOW, incomplete=DEFAULT_INCOMPLETE):
+        subjects = DEFAULT_SUBJECTS if subjects is None else subjects
+        if not subjects:
+            raise ValueError("At least one subject is needed")
+        if isinstance(subjects, dict):
+            self.subjects = list(subjects)
+            self.weights = [float(subjects[name]) for name in self.subjects]
+        else:
+            self.subjects = list(subjects)
+            self.weights = [1.0] * len(self.subjects)  # Plain list: equal weights, as in grade_check()
+        self.total_weight = sum(self.weights)
+        if self.total_weight <= 0:
+            raise ValueError("Subject weights must add up to more than 0")
+
+        divisions = DEFAULT_DIVISIONS if divisions is None else divisions
+        divisions = sorted(divisions)  # Lowest threshold first
+        self.cutoffs = [float(cutoff) for cutoff, _ in divisions]
+        self.labels = [below] + [label for _, label in divisions]  # labels[i]: above i cutoffs
+        self.incomplete = incomplete
+
+    def percentages(self, marks):
+        """
+        Weighted percentage per student.
+
+        marks holds one column (sequence of marks, numbers or numeric strings)
+        per subject, in the order of self.subjects. A student missing a mark
+        gets NaN.
+        """
+        if len(marks) != len(self.weights):
+            raise ValueError(f"Expected marks for {len(self.weights)} subjects, got {len(marks)}")
+        if np is not None:
+            try:
+                marks = np.asarray(marks, dtype=np.float64)  # Shape (subjects, students); None is NaN
+            except ValueError:  # Empty fields; convert mark by mark only then
+                marks = np.array([[_mark(m) for m in column] for column in marks], dtype=np.float64)
+            return (np.asarray(self.weights) / self.total_weight) @ marks
+        weights = [w / self.total_weight for w in self.weights]
+        return [sum(_mark(m) * w for m, w in zip(row, weights)) for row in zip(*marks)]
+
+    def divisions(self, percentages):
+        """Division label per percentage; NaN (a missing mark) is self.incomplete."""
+        labels = self.labels
+        if np is not None:
+            percentages = np.asarray(percentages, dtype=np.float64)
+            # Number of cutoffs strictly below each percentage = index into labels.
+            # searchsorted puts NaN past every cutoff, so those are replaced after.
+            positions = np.searchsorted(np.asarray(self.cutoffs), percentages, side='left')
+            divisions = np.asarray(labels, dtype=object)[positions]
+            divisions[np.isnan(percentages)] = self.incomplete
+            return divisions.tolist()
+        cutoffs = self.cutoffs
+        return [self.incomplete if math.isnan(p) else labels[sum(1 for cutoff in cutoffs if p > cutoff)]
+                for p in percentages]
+
+    def grade(self, marks):
+        """
+        Return (percentages, divisions) as lists for marks given column by
+        column. Incomplete students have a percentage of None.
+        """
+        percentages = self.percentages(marks)
+        divisions = self.divisions(percentages)
+        if np is not None:
+            missing = np.isnan(percentages)
+            percentages = np.round(percentages, 2).tolist()
+            if missing.any():
+                percentages = [None if m else p for p, m in zip(percentages, missing.tolist())]
+        else:
+            percentages = [None if math.isnan(p) else round(p, 2) for p in percentages]
+        return percentages, divisions
+
+
+def _mark(value):
+    """A mark as a float; a missing one (None or an empty string) is NaN."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return math.nan
+    return float(value)
+
+
+#############
+# Reading rosters in chunks
+#############
+
+def _open(source, mode):
+    """Return (file, should_close) for a path or an already open stream."""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, mode, newline='', encoding='utf-8'), True
+    return source, False
+
+
+def _format_of(source, fmt):
+    if fmt:
+        return fmt
+    name = str(source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', ''))
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_csv_roster(f, subjects, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield (names, roll_numbers, marks) per chunk of a CSV roster; marks has one column per subject."""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    index = {column: i for i, column in enumerate(header)}
+    missing = [column for column in ['name', 'roll_number'] + subjects if column not in index]
+    if missing:
+        raise ValueError(f"Roster is missing columns: {', '.join(missing)}")
+    width = len(header)
+    while True:
+        rows = list(islice(reader, chunk_rows))
+        if not rows:
+            return
+        if any(len(row) != width for row in rows):
+            rows = [row for row in rows if row]  # Skip blank lines
+            if not rows:
+                continue  # A chunk of blank lines only; more rows may follow
+            if any(len(row) != width for row in rows):
+                raise ValueError(f"Roster rows must have {width} columns")
+        # Transpose the chunk in C: one tuple per column
+        columns = list(zip(*rows))
+        yield (columns[index['name']],
+               columns[index['roll_number']],
+               [columns[index[subject]] for subject in subjects])
+
+
+def read_jsonl_roster(f, subjects, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield (names, roll_numbers, marks) per chunk of a JSON Lines roster."""
+    loads = json.loads
+    while True:
+        lines = list(islice(f, chunk_rows))
+        if not lines:
+            return
+        records = [loads(line) for line in lines if line.strip()]  # Skip blank lines
+        if not records:
+            continue  # A chunk of blank lines only; more records may follow
+        try:
+            yield ([record['name'] for record in records],
+                   [record['roll_number'] for record in records],
+                   [[record[subject] for record in records] for subject in subjects])
+        except KeyError as e:
+            raise ValueError(f"Roster record is missing {e.args[0]!r}") from None
+
+
+def grade_roster(roster, output, scheme=None, fmt=None, output_fmt=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Grade every student of a roster and stream the results to output.
+
+    roster and output are paths or open text streams. The format is taken from
+    the file extension (.jsonl/.ndjson or CSV) unless fmt/output_fmt is given.
+    Returns the number of students graded.
+
+    Usage example:
+        grade_roster('roster.csv', 'results.csv', GradingScheme({"Math": 2, "Science": 1}))
+    """
+    scheme = scheme or GradingScheme()
+    fmt = _format_of(roster, fmt)
+    output_fmt = _format_of(output, output_fmt)
+    read_chunks = read_jsonl_roster if fmt == 'jsonl' else read_csv_roster
+
+    source, close_source = _open(roster, 'r')
+    target, close_target = _open(output, 'w')
+    count = 0
+    try:
+        if output_fmt == 'csv':
+            writer = csv.writer(target)
+            writer.writerow(RESULT_COLUMNS)
+        for names, roll_numbers, marks in read_chunks(source, scheme.subjects, chunk_rows):
+            percentages, divisions = scheme.grade(marks)
+            results = zip(names, roll_numbers, percentages, divisions)
+            if output_fmt == 'csv':
+                writer.writerows(results)
+            else:
+                dumps = json.dumps
+                target.writelines(
+                    dumps(dict(zip(RESULT_COLUMNS, result))) + '\n' for result in results
+                )
+            count += len(names)
+    finally:
+        if close_source:
+            source.close()
+        if close_target:
+            target.close()
+    return count
+
+
+#############
+# Tests
+#############
+
+def test_grading():
+    """
+    Test thresholds, weights, missing marks and chunked rosters, with NumPy
+    and with the pure Python fallback.
+
+    Usage example:
+        test_grading()
+    """
+    global np
+    numpy = np
+    try:
+        for np in ([numpy, None] if numpy is not None else [None]):
+            # Exactly on the cutoff is not "above" it, as in grade_check()
+            assert GradingScheme().grade([[80], [80], [80]]) == ([80.0], [DEFAULT_BELOW])
+            assert GradingScheme().grade([[81], [80], [80]]) == ([80.33], ["1st division"])
+
+            scheme = GradingScheme({"Math": 2, "Science": 1}, [(80, "1st"), (60, "2nd")], below="3rd")
+            assert scheme.grade([[90, 100, 30], [60, 100, 30]]) == ([80.0, 100.0, 30.0], ["2nd", "1st", "3rd"])
+
+            # A missing mark is Incomplete, even when the other marks are in the top division
+            roster = "name,roll_number,Math,Science,Computer\nAmy,1,100,,100\nBob,2,90,90,90\n"
+            results = io.StringIO()
+            assert grade_roster(io.StringIO(roster), results, fmt='csv', output_fmt='jsonl') == 2
+            assert [json.loads(line) for line in results.getvalue().splitlines()] == [
+                {"name": "Amy", "roll_number": "1", "percentage": None, "division": DEFAULT_INCOMPLETE},
+                {"name": "Bob", "roll_number": "2", "percentage": 90.0, "division": "1st division"},
+            ]
+            roster = ('{"name": "Cid", "roll_number": 3, "Math": null, "Science": 95, "Computer": 95}\n'
+                      '{"name": "Dee", "roll_number": 4, "Math": 50, "Science": 60, "Computer": 70}\n')
+            results = io.StringIO()
+            grade_roster(io.StringIO(roster), results, fmt='jsonl', output_fmt='csv')
+            assert results.getvalue().splitlines() == [
+                "name,roll_number,percentage,division", f"Cid,3,,{DEFAULT_INCOMPLETE}", f"Dee,4,60.0,{DEFAULT_BELOW}",
+            ]
+
+            # Chunks of 2 give the same results as a single chunk
+            roster = "name,roll_number,Math,Science,Computer\n" + "".join(
+                f"S{i},{i},{i * 9 % 101},{i * 7 % 101},{i * 5 % 101}\n" for i in range(5))
+            whole, chunked = io.StringIO(), io.StringIO()
+            grade_roster(io.StringIO(roster), whole, fmt='csv', output_fmt='csv')
+            assert grade_roster(io.StringIO(roster), chunked, fmt='csv', output_fmt='csv', chunk_rows=2) == 5
+            assert chunked.getvalue() == whole.getvalue()
+            assert len(chunked.getvalue().splitlines()) == 6
+
+            # A chunk of blank lines only is not the end of the roster
+            lines = roster.splitlines(True)
+            blanks = io.StringIO()
+            grade_roster(io.StringIO("".join(lines[:3] + ["\n", "\n"] + lines[3:] + ["\n"])), blanks,
+                         fmt='csv', output_fmt='csv', chunk_rows=2)
+            assert blanks.getvalue() == whole.getvalue()
+            records = "".join(f'{{"name": "S{i}", "roll_number": {i}, "Math": 50, "Science": 50, "Computer": 50}}\n'
+                              for i in range(3))
+            results = io.StringIO()
+            assert grade_roster(io.StringIO("\n\n" + records + "\n"), results, fmt='jsonl', chunk_rows=2) == 3
+    finally:
+        np = numpy
+    print("Grading tests passed.")
+
+
+#############
+# Benchmark
+#############
+
+def create_roster(path, num_students, subjects):
+    """Write a roster with random-looking but reproducible marks."""
+    fmt = _format_of(path, None)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(['name', 'roll_number'] + subjects)
+            for start in range(0, num_students, DEFAULT_CHUNK_ROWS):
+                writer.writerows(
+                    [f'Student {i}', f'R{i:08d}'] + [(i * 7 + s * 13) % 101 for s in range(len(subjects))]
+                    for i in range(start, min(start + DEFAULT_CHUNK_ROWS, num_students))
+                )
+        else:
+            for i in range(num_students):
+                record = {'name': f'Student {i}', 'roll_number': f'R{i:08d}'}
+                record.update((subject, (i * 7 + s * 13) % 101) for s, subject in enumerate(subjects))
+                f.write(json.dumps(record) + '\n')
+
+
+def _peak_rss_mb():
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def benchmark(num_students=1000000, subjects=("Math", "Science", "Computer", "English", "History")):
+    """Print students/sec and peak RSS for CSV and JSONL rosters."""
+    subjects = list(subjects)
+    scheme = GradingScheme(dict(zip(subjects, range(1, len(subjects) + 1))),
+                           [(80, "1st division"), (60, "2nd division"), (40, "3rd division")],
+                           below="Fail")
+    print(f"Grading {num_students:,} students, {len(subjects)} weighted subjects"
+          + ("" if np is not None else " (NumPy not installed: pure Python)"))
+    print(f"{'Input -> output':<18} {'Roster (MB)':>12} {'Seconds':>9} {'Students/sec':>14} {'Peak RSS (MB)':>14}")
+    print("-" * 71)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in ('csv', 'jsonl'):
+            roster = os.path.join(tmp_dir, f'roster.{fmt}')
+            output = os.path.join(tmp_dir, f'results.{fmt}')
+            create_roster(roster, num_students, subjects)
+            start_time = time.perf_counter()
+            count = grade_roster(roster, output, scheme)
+            seconds = time.perf_counter() - start_time
+            print(f"{f'{fmt} -> {fmt}':<18} {os.path.getsize(roster) / (1024 * 1024):>12.1f} "
+                  f"{seconds:>9.2f} {count / seconds:>14,.0f} {_peak_rss_mb():>14.1f}")
+            os.remove(roster)
+            os.remove(output)
+    print("Peak RSS is for the whole process, including creating the rosters.")
+
+
+def main(argv=None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description='Grade a class roster (CSV or JSON Lines).')
+    parser.add_argument('roster', nargs='?', help='input roster (.csv or .jsonl); - for stdin')
+    parser.add_argument('results', nargs='?', help='output file (.csv or .jsonl); - for stdout')
+    parser.add_argument('--subject', action='append', metavar='NAME[:WEIGHT]',
+                        help='subject column and optional weight (repeat; default Math, Science, Computer)')
+    parser.add_argument('--division', action='append', metavar='MIN:LABEL',
+                        help='division for percentages above MIN (repeat; default 80:"1st division")')
+    parser.add_argument('--below', default=DEFAULT_BELOW, help='division below every threshold')
+    parser.add_argument('--incomplete', default=DEFAULT_INCOMPLETE, help='division for students missing a mark')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='roster format (default: from extension)')
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help='results format (default: from extension)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='students graded at a time')
+    parser.add_argument('--benchmark', type=int, metavar='STUDENTS', nargs='?', const=1000000,
+                        help='benchmark on a generated roster (default 1,000,000 students)')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    if not args.roster or not args.results:
+        parser.error('roster and results are required')
+
+    subjects = None
+    if args.subject:
+        subjects = {}
+        for spec in args.subject:
+            name, _, weight = spec.partition(':')
+            subjects[name] = float(weight) if weight else 1.0
+    divisions = None
+    if args.division:
+        divisions = []
+        for spec in args.division:
+            cutoff, _, label = spec.partition(':')
+            divisions.append((float(cutoff), label))
+    scheme = GradingScheme(subjects, divisions, args.below, args.incomplete)
+
+    roster = sys.stdin if args.roster == '-' else args.roster
+    results = sys.stdout if args.results == '-' else args.results
+    try:
+        count = grade_roster(roster, results, scheme, args.format, args.output_format, args.chunk_rows)
+    except FileNotFoundError:
+        print(f"Error: File {args.roster} not found.")
+        return
+    if results is not sys.stdout:
+        print(f"Graded {count} students from {args.roster} into {args.results}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main()
+    else:
+        test_grading()
@@ -0,0 +1,266 @@
+# interest.py
+
+#############
+# Month-end interest accrual and statements for whole portfolios
+#############
+#
+# InterestMixin.add_interest() handles one account per call. For a month-end
+# run over many accounts this module:
+#   - accrue_interest(): reads every balance into one NumPy array, computes
+#     all the interest in a single vectorized step, and writes back exactly
+#     one INTEREST entry per account. For ledger.LedgerAccount portfolios the
+#     entries are appended to the TransactionLog in one bulk extend().
+#   - iter_statement() / iter_ledger_statements(): generators that stream
+#     statement lines, so no statement is ever built in memory as a whole.
+#
+# Without NumPy the same results are computed in pure Python.
+
+import io
+import sys
+import time
+from itertools import repeat
+
+from ledger import (Ledger, LedgerAccount, KIND_NAMES, DEPOSIT, WITHDRAW, INTEREST,
+                    TRANSFER_IN, TRANSFER_OUT)
+from oops import SavingsAccount
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; accrual falls back to pure Python
+    np = None
+
+# Transaction kinds that add to the balance; every other kind subtracts
+CREDIT_KINDS = {'DEPOSIT', 'INTEREST', 'TRANSFER_IN'}
+
+# Month-end summary layout used by iter_ledger_statements()
+STATEMENT_HEADER = (f"{'Account':>8} {'Owner':<16} {'Opening':>12} {'Deposits':>12} {'Withdrawals':>12} "
+                    f"{'Interest':>10} {'Transfers':>12} {'Closing':>12}")
+STATEMENT_LINE = "%8d %-16s %12.2f %12.2f %12.2f %10.2f %12.2f %12.2f"
+
+
+def _compute_interest(balances, rate):
+    """Return (interest, new balances) as lists for a list of balances."""
+    if np is not None:
+        values = np.asarray(balances, dtype=np.float64)
+        interest = values * np.asarray(rate, dtype=np.float64)  # Scalar or one rate per account
+        return interest.tolist(), (values + interest).tolist()
+    rates = repeat(rate) if isinstance(rate, (int, float)) else rate
+    interest = [balance * r for balance, r in zip(balances, rates)]
+    return interest, [balance + i for balance, i in zip(balances, interest)]
+
+
+def accrue_interest(accounts, rate):
+    """
+    Add interest to every account and record one INTEREST entry per account.
+
+    rate: one rate for all accounts, or a sequence with one rate per account.
+    Works with oops.SavingsAccount (or any account with a transactions list)
+    and with ledger.LedgerAccount. Returns the total interest paid.
+
+    Usage example:
+        accounts = [SavingsAccount("Bob", 500), SavingsAccount("Amy", 1000)]
+        accrue_interest(accounts, 0.01)  # 15.0
+    """
+    accounts = list(accounts)
+    if not isinstance(rate, (int, float)) and len(rate) != len(accounts):
+        raise ValueError("Need one rate per account")
+    interest, new_balances = _compute_interest([account.balance for account in accounts], rate)
+
+    if not any(isinstance(account, LedgerAccount) for account in accounts):
+        # Plain accounts: write the balance and append the entry, nothing else per account
+        for account, amount, balance in zip(accounts, interest, new_balances):
+            account.balance = balance
+            account.transactions.append(('INTEREST', amount))
+        return sum(interest)
+
+    ledgers = {}  # Ledger -> (account ids, amounts), for one bulk append per ledger
+    for account, amount, balance in zip(accounts, interest, new_balances):
+        account.balance = balance
+        if isinstance(account, LedgerAccount):
+            account_ids, amounts = ledgers.setdefault(account.ledger, ([], []))
+            account_ids.append(account.account_id)
+            amounts.append(amount)
+        else:
+            account.transactions.append(('INTEREST', amount))
+    for ledger, (account_ids, amounts) in ledgers.items():
+        ledger.record_many(account_ids, INTEREST, amounts, sum(amounts))
+    return sum(interest)
+
+
+def accrue_ledger_interest(ledger, rate):
+    """
+    Add interest to every account of a Ledger in bulk.
+
+    Faster than accrue_interest(ledger.accounts, rate) because the account ids
+    are simply 0..n-1 and no per-account grouping is needed.
+
+    Usage example:
+        ledger = Ledger()
+        ledger.open_account("Alice", 100)
+        accrue_ledger_interest(ledger, 0.02)  # 2.0
+    """
+    accounts = ledger.accounts
+    if not isinstance(rate, (int, float)) and len(rate) != len(accounts):
+        raise ValueError("Need one rate per account")
+    interest, new_balances = _compute_interest([account.balance for account in accounts], rate)
+    for account, balance in zip(accounts, new_balances):
+        account.balance = balance
+    total = sum(interest)
+    ledger.record_many(range(len(accounts)), INTEREST, interest, total)
+    return total
+
+
+#############
+# Statements, streamed with generators
+#############
+
+def iter_statement(account):
+    """
+    Yield the lines of one account's statement with a running balance.
+
+    Usage example:
+        for line in iter_statement(sav):
+            print(line)
+    """
+    transactions = account.transactions
+    net = sum(amount if kind in CREDIT_KINDS else -amount for kind, amount in transactions)
+    balance = account.balance - net  # Opening balance
+    yield f"Statement for {account.owner}"
+    yield f"{'Opening balance':<20} {'':>12} {balance:>12.2f}"
+    for kind, amount in transactions:
+        balance += amount if kind in CREDIT_KINDS else -amount
+        yield f"{kind:<20} {amount:>12.2f} {balance:>12.2f}"
+    yield f"{'Closing balance':<20} {'':>12} {account.balance:>12.2f}"
+
+
+def _ledger_totals(ledger):
+    """Per-account totals of each transaction kind, as lists indexed by account id."""
+    num_accounts = len(ledger.accounts)
+    log = ledger.log
+    if np is not None and len(log):
+        ids = np.frombuffer(log.account_ids, dtype=np.uint32)
+        kinds = np.frombuffer(log.kinds, dtype=np.uint8)
+        amounts = np.frombuffer(log.amounts, dtype=np.float64)
+        # One bincount per kind sums the amounts of every account at once
+        return [np.bincount(ids[kinds == kind], weights=amounts[kinds == kind],
+                            minlength=num_accounts).tolist()
+                for kind in range(len(KIND_NAMES))]
+    totals = [[0.0] * num_accounts for _ in KIND_NAMES]
+    for account_id, kind, amount in zip(log.account_ids, log.kinds, log.amounts):
+        totals[kind][account_id] += amount
+    return totals
+
+
+def iter_ledger_statements(ledger):
+    """
+    Yield one month-end summary line per account of a Ledger.
+
+    The log is summarised in a single pass, then lines are generated one
+    account at a time, so writing millions of statements needs no more memory
+    than the totals themselves.
+
+    Usage example:
+        with open('statements.txt', 'w') as f:
+            f.writelines(line + '\\n' for line in iter_ledger_statements(ledger))
+    """
+    totals = _ledger_totals(ledger)
+    deposits, withdrawals, interest = totals[DEPOSIT], totals[WITHDRAW], totals[INTEREST]
+    transfers = [t_in - t_out for t_in, t_out in zip(totals[TRANSFER_IN], totals[TRANSFER_OUT])]
+    yield STATEMENT_HEADER
+    # %-formatting is roughly twice as fast as an f-string with eight format specs
+    line = STATEMENT_LINE
+    for account, deposit, withdrawal, paid, transfer in zip(ledger.accounts, deposits, withdrawals,
+                                                          interest, transfers):
+        closing = account.balance
+        opening = closing - deposit + withdrawal - paid - transfer
+        yield line % (account.account_id, account.owner, opening, deposit, withdrawal, paid,
+                      transfer, closing)
+
+
+#############
+# Benchmark and tests
+#############
+
+def benchmark(num_accounts=1000000, rate=0.004):
+    """Time a month-end run (accrual + statements) over num_accounts accounts."""
+    print(f"Month-end run over {num_accounts:,} accounts")
+    print(f"{'Variant':<36} {'Accrual (s)':>12} {'Statements (s)':>15}")
+    print("-" * 65)
+
+    # 1. One add_interest() call per SavingsAccount, one statement per account
+    accounts = [SavingsAccount(f"Owner {i}", 100 + i % 1000) for i in range(num_accounts)]
+    start_time = time.perf_counter()
+    for account in accounts:
+        account.add_interest(rate)
+    accrual_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    out = io.StringIO()
+    for account in accounts:
+        out.writelines(iter_statement(account))
+    statement_seconds = time.perf_counter() - start_time
+    print(f"{'add_interest() per account':<36} {accrual_seconds:>12.3f} {statement_seconds:>15.3f}")
+
+    # 2. Vectorized accrual over the same kind of objects
+    accounts = [SavingsAccount(f"Owner {i}", 100 + i % 1000) for i in range(num_accounts)]
+    start_time = time.perf_counter()
+    accrue_interest(accounts, rate)
+    accrual_seconds = time.perf_counter() - start_time
+    print(f"{'accrue_interest(SavingsAccount)':<36} {accrual_seconds:>12.3f} {'-':>15}")
+    del accounts, out
+
+    # 3. Ledger: bulk log append and one-pass statements
+    ledger = Ledger()
+    for i in range(num_accounts):
+        ledger.open_account(f"Owner {i}", 100 + i % 1000)
+    start_time = time.perf_counter()
+    accrue_ledger_interest(ledger, rate)
+    accrual_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    out = io.StringIO()
+    out.writelines(iter_ledger_statements(ledger))
+    statement_seconds = time.perf_counter() - start_time
+    print(f"{'accrue_ledger_interest(Ledger)':<36} {accrual_seconds:>12.3f} {statement_seconds:>15.3f}")
+    if np is None:
+        print("NumPy is not installed; the vectorized variants ran in pure Python.")
+
+
+def test_interest():
+    """
+    Test single and batch accrual and the statements.
+
+    Usage example:
+        test_interest()
+    """
+    sav = SavingsAccount("Bob", 500)
+    sav.add_interest(0.1)
+    assert sav.balance == 550
+    assert sav.transactions == [('INTEREST', 50.0)]  # Logged once, not also as a DEPOSIT
+
+    accounts = [SavingsAccount("Amy", 1000), SavingsAccount("Cid", 200)]
+    assert accrue_interest(accounts, [0.01, 0.05]) == 20.0
+    assert [account.balance for account in accounts] == [1010.0, 210.0]
+    assert [kind for account in accounts for kind, _ in account.transactions] == ['INTEREST', 'INTEREST']
+
+    lines = list(iter_statement(accounts[0]))
+    assert lines[1].endswith('1000.00') and lines[-1].endswith('1010.00')
+
+    ledger = Ledger()
+    alice = ledger.open_account("Alice", 100)
+    ledger.open_account("Bob", 300)
+    alice.deposit(100)
+    assert accrue_ledger_interest(ledger, 0.5) == 250.0
+    assert ledger.total_funds() == 750.0
+    assert alice.transactions == [('DEPOSIT', 100), ('INTEREST', 100.0)]
+    assert accrue_interest([alice], 0.0) == 0.0
+    assert len(alice.transactions) == 3
+
+    statements = list(iter_ledger_statements(ledger))
+    assert len(statements) == 3  # Header + one line per account
+    opening, closing = statements[1].split()[2], statements[1].split()[-1]
+    assert (opening, closing) == ('100.00', '300.00')
+    print("Interest tests passed.")
+
+
+if __name__ == "__main__":
+    test_interest()
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
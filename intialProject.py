@@ -40,4 +40,5 @@ def grade_check():
 
     
 
-grade_check(); 
\ No newline at end of file
+if __name__ == "__main__":
+    grade_check()
@@ -0,0 +1,295 @@
+# ledger.py
+
+#############
+# A compact, high-throughput ledger for the accounts in oops.py
+#############
+#
+# oops.BankAccount keeps a Python list of ('DEPOSIT', amount) tuples per
+# account, and Bank.total_funds() loops over every account. That is fine for a
+# handful of accounts but costs roughly 90 bytes per transaction and O(n) per
+# total. This module stores the same information as:
+#   - LedgerAccount objects with __slots__ (no per-instance __dict__)
+#   - one TransactionLog of typed columns (struct-of-arrays): account id,
+#     kind and amount, about 13 bytes per transaction
+#   - an optional append-only log file that can be memory-mapped back
+#   - a running total, so Ledger.total_funds() is O(1)
+
+import mmap
+import os
+import struct
+import tracemalloc
+from array import array
+
+# Transaction kinds, stored as one byte each
+DEPOSIT = 0
+WITHDRAW = 1
+INTEREST = 2
+TRANSFER_IN = 3
+TRANSFER_OUT = 4
+KIND_NAMES = ('DEPOSIT', 'WITHDRAW', 'INTEREST', 'TRANSFER_IN', 'TRANSFER_OUT')
+
+# On-disk record: account id (uint32), kind (uint8), 3 padding bytes, amount (float64)
+RECORD = struct.Struct('<IB3xd')
+
+
+class TransactionLog:
+    """
+    Transactions stored column by column in typed arrays.
+
+    Usage example:
+        log = TransactionLog()
+        log.append(0, DEPOSIT, 100.0)
+        print(log[0])  # (0, 'DEPOSIT', 100.0)
+    """
+    __slots__ = ('account_ids', 'kinds', 'amounts')
+
+    def __init__(self):
+        self.account_ids = array('I')
+        self.kinds = array('B')
+        self.amounts = array('d')
+
+    def append(self, account_id, kind, amount):
+        self.account_ids.append(account_id)
+        self.kinds.append(kind)
+        self.amounts.append(amount)
+
+    def extend(self, account_ids, kind, amounts):
+        """Append one transaction of the same kind for each account id, in bulk."""
+        self.account_ids.extend(array('I', account_ids))
+        self.kinds.extend(array('B', [kind]) * len(amounts))
+        self.amounts.extend(array('d', amounts))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, index):
+        return self.account_ids[index], KIND_NAMES[self.kinds[index]], self.amounts[index]
+
+    def for_account(self, account_id):
+        """Yield (kind name, amount) for one account, oldest first."""
+        kinds, amounts = self.kinds, self.amounts
+        for i, owner in enumerate(self.account_ids):
+            if owner == account_id:
+                yield KIND_NAMES[kinds[i]], amounts[i]
+
+    def nbytes(self):
+        """Bytes used by the column buffers."""
+        return sum(column.itemsize * len(column) for column in (self.account_ids, self.kinds, self.amounts))
+
+    def write_records(self, f, start=0):
+        """Append records [start:] to an open binary file; returns the new end index."""
+        pack = RECORD.pack
+        account_ids, kinds, amounts = self.account_ids, self.kinds, self.amounts
+        end = len(amounts)
+        f.write(b''.join(pack(account_ids[i], kinds[i], amounts[i]) for i in range(start, end)))
+        return end
+
+
+class MappedTransactionLog:
+    """
+    Read-only view of an append-only log file through mmap.
+
+    Usage example:
+        with MappedTransactionLog('bank.log') as log:
+            for account_id, kind, amount in log:
+                ...
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('transaction index out of range')
+        account_id, kind, amount = RECORD.unpack_from(self.data, index * RECORD.size)
+        return account_id, KIND_NAMES[kind], amount
+
+    def __iter__(self):
+        # iter_unpack walks the mapped bytes without copying the file
+        view = memoryview(self.data)[:self.count * RECORD.size]
+        for account_id, kind, amount in RECORD.iter_unpack(view):
+            yield account_id, KIND_NAMES[kind], amount
+        view.release()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LedgerAccount:
+    """
+    A bank account whose history lives in the shared Ledger.
+
+    Same deposit/withdraw rules as oops.BankAccount.
+
+    Usage example:
+        ledger = Ledger()
+        acc = ledger.open_account("Alice", 100)
+        acc.deposit(50)
+        print(acc)  # LedgerAccount(owner=Alice, balance=150)
+    """
+    __slots__ = ('ledger', 'account_id', 'owner', 'balance')
+
+    def __init__(self, ledger, account_id, owner, balance=0):
+        self.ledger = ledger
+        self.account_id = account_id
+        self.owner = owner
+        self.balance = balance
+
+    def deposit(self, amount):
+        if amount > 0:
+            self.balance += amount
+            self.ledger.record(self.account_id, DEPOSIT, amount, amount)
+            return True
+        return False
+
+    def withdraw(self, amount):
+        if 0 < amount <= self.balance:
+            self.balance -= amount
+            self.ledger.record(self.account_id, WITHDRAW, amount, -amount)
+            return True
+        return False
+
+    @property
+    def transactions(self):
+        """History as ('KIND', amount) tuples, like BankAccount.transactions."""
+        return list(self.ledger.log.for_account(self.account_id))
+
+    def __str__(self):
+        return f"LedgerAccount(owner={self.owner}, balance={self.balance})"
+
+
+class Ledger:
+    """
+    Accounts, their transaction log and a running total of all balances.
+
+    Use case:
+        - Millions of accounts and transactions with little memory.
+        - O(1) total funds.
+        - Persist transactions to an append-only file (see flush()).
+
+    Usage example:
+        ledger = Ledger('bank.log')
+        acc = ledger.open_account("Alice", 100)
+        acc.deposit(50)
+        ledger.flush()
+        print(ledger.total_funds())  # 150
+    """
+
+    def __init__(self, path=None):
+        self.log = TransactionLog()
+        self.accounts = []
+        self.total = 0
+        self.path = path
+        self.flushed = 0  # Number of log entries already written to the file
+
+    def open_account(self, owner, balance=0):
+        account = LedgerAccount(self, len(self.accounts), owner, balance)
+        self.accounts.append(account)
+        self.total += balance
+        return account
+
+    def record(self, account_id, kind, amount, delta):
+        """Append a transaction and update the running total by delta."""
+        self.log.append(account_id, kind, amount)
+        self.total += delta
+
+    def record_many(self, account_ids, kind, amounts, delta):
+        """Append many transactions of one kind and update the running total by delta."""
+        self.log.extend(account_ids, kind, amounts)
+        self.total += delta
+
+    def total_funds(self):
+        """Sum of all balances, kept up to date on every transaction: O(1)."""
+        return self.total
+
+    def flush(self):
+        """Append transactions recorded since the last flush to the log file."""
+        if self.path is None:
+            raise ValueError("Ledger has no log file path")
+        with open(self.path, 'ab') as f:
+            self.flushed = self.log.write_records(f, self.flushed)
+
+    def mapped_log(self):
+        """Open the log file through mmap (call flush() first)."""
+        return MappedTransactionLog(self.path)
+
+
+#############
+# Benchmark and tests
+#############
+
+def benchmark_memory(num_transactions=1000000):
+    """Compare memory per million transactions: list of tuples vs TransactionLog."""
+    per_million = 1000000 / num_transactions
+
+    tracemalloc.start()
+    transactions = []
+    for i in range(num_transactions):
+        transactions.append(('DEPOSIT', float(i % 500 + 1)))
+    tuple_bytes = tracemalloc.get_traced_memory()[0]
+    del transactions
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    log = TransactionLog()
+    for i in range(num_transactions):
+        log.append(i % 1000, DEPOSIT, float(i % 500 + 1))
+    log_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Memory per million transactions ({num_transactions:,} measured)")
+    print(f"  list of tuples:  {tuple_bytes * per_million / (1024 * 1024):8.1f} MB")
+    print(f"  TransactionLog:  {log_bytes * per_million / (1024 * 1024):8.1f} MB "
+          f"(columns: {log.nbytes() * per_million / (1024 * 1024):.1f} MB)")
+
+
+def test_ledger():
+    """
+    Test Ledger, LedgerAccount and the mapped log file.
+
+    Usage example:
+        test_ledger()
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ledger = Ledger(os.path.join(tmp_dir, 'bank.log'))
+        alice = ledger.open_account("Alice", 100)
+        bob = ledger.open_account("Bob", 50)
+        assert alice.deposit(50)
+        assert alice.withdraw(70)
+        assert not alice.withdraw(1000)
+        assert bob.deposit(25)
+        assert alice.balance == 80
+        assert ledger.total_funds() == 155
+        assert alice.transactions == [('DEPOSIT', 50), ('WITHDRAW', 70)]
+
+        ledger.flush()
+        assert bob.withdraw(5)
+        ledger.flush()
+        with ledger.mapped_log() as log:
+            assert len(log) == 4
+            assert log[-1] == (1, 'WITHDRAW', 5.0)
+            assert list(log) == [ledger.log[i] for i in range(4)]
+    print("Ledger tests passed.")
+
+
+if __name__ == "__main__":
+    test_ledger()
+    benchmark_memory()
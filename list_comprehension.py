@@ -30,8 +30,18 @@ def square_numbers_comprehension(numbers):
     """
     return [num ** 2 for num in numbers]
 
+# Function using the batch transform engine (batch_transform.py)
+def square_numbers_vectorized(numbers):
+    """
+    Squares each number using NumPy for large inputs (lists, array.array or NumPy arrays),
+    falling back to a list comprehension when NumPy is not installed.
+    """
+    from batch_transform import square
+    return square(numbers)
+
 # Example usage:
 if __name__ == "__main__":
     nums = [1, 2, 3, 4, 5]
     print("Without list comprehension:", square_numbers_loop(nums))
-    print("With list comprehension:", square_numbers_comprehension(nums))
\ No newline at end of file
+    print("With list comprehension:", square_numbers_comprehension(nums))
+    print("With the batch transform engine:", square_numbers_vectorized(nums))
\ No newline at end of file
@@ -71,6 +71,14 @@ print("Square of 3 using normal function:", square_function(3))  # Output: 9
 # - When passing a function as an argument (e.g., to map, filter, sorted).
 # - When you don't want to formally define a function with def.
 
+# 6. Doing the same on large data
+# map() and filter() call a Python function once per item. For big inputs,
+# batch_transform.py runs the same operations as vectorized NumPy kernels
+# (when NumPy is installed) and also works on array.array and NumPy arrays.
+from batch_transform import double, keep
+print("Doubled numbers using batch_transform:", double(numbers))  # Output: [2, 4, 6, 8, 10]
+print("Even numbers using batch_transform:", keep(numbers, 'even'))  # Output: [2, 4]
+
 # Example: Sorting a list of tuples by the second item
 pairs = [(1, 'one'), (3, 'three'), (2, 'two')]
 sorted_pairs = sorted(pairs, key=lambda x: x[1])
@@ -1,5 +1,7 @@
 # oops.py
 
+import threading
+
 #############
 # 1. Classes, objects, constructors (__init__)
 #############
@@ -100,9 +102,12 @@ class InterestMixin:
         acc.add_interest(0.05)
     """
     def add_interest(self, rate):
+        # Record the interest once, as INTEREST (not as a DEPOSIT too).
+        # For whole portfolios use interest.accrue_interest().
         interest = self.balance * rate
-        self.deposit(interest)
+        self.balance += interest
         self.transactions.append(('INTEREST', interest))
+        return interest
 
 class SavingsAccount(BankAccount, InterestMixin):
     """
@@ -118,9 +123,7 @@ class SavingsAccount(BankAccount, InterestMixin):
         sav.withdraw(100)
     """
     def __init__(self, owner, balance=0):
-        self.owner = owner; 
-        self.balance = balance
-        # super().__init__(owner, balance)
+        super().__init__(owner, balance)
 
     # Overriding withdraw to limit withdrawals
     def withdraw(self, amount):
@@ -179,11 +182,14 @@ class Bank:
         print(bank.total_funds())
     """
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.accounts = []
+        # Lock so two threads cannot both create the "only" instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance.accounts = []
         return cls._instance
 
     def add_account(self, account):
@@ -193,7 +199,8 @@ class Bank:
         Usage example:
             bank.add_account(acc)
         """
-        self.accounts.append(account)
+        with self._lock:
+            self.accounts.append(account)
 
     def total_funds(self):
         """
@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import user_passes_test
 from django.shortcuts import redirect
 from django.core.exceptions import PermissionDenied
 from functools import wraps
+from .roles import get_roles, STUDENT, INSTRUCTOR
 
 def student_required(function=None, redirect_field_name=REDIRECT_FIELD_NAME, login_url=None):
     """
@@ -10,7 +11,7 @@ def student_required(function=None, redirect_field_name=REDIRECT_FIELD_NAME, log
     redirecting to the login page if necessary.
     """
     actual_decorator = user_passes_test(
-        lambda u: u.is_authenticated and hasattr(u, 'student'),
+        lambda u: STUDENT in get_roles(u),
         login_url=login_url,
         redirect_field_name=redirect_field_name
     )
@@ -24,7 +25,7 @@ def instructor_required(function=None, redirect_field_name=REDIRECT_FIELD_NAME,
     redirecting to the login page if necessary.
     """
     actual_decorator = user_passes_test(
-        lambda u: u.is_authenticated and hasattr(u, 'instructor'),
+        lambda u: INSTRUCTOR in get_roles(u),
         login_url=login_url,
         redirect_field_name=redirect_field_name
     )
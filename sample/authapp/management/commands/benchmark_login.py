@@ -0,0 +1,102 @@
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+ITERATION_STEPS = [100000, 200000, 320000, 600000, 870000, 1000000, 1200000]
+
+SESSION_PROFILES = [
+    ('db', 'django.contrib.messages.storage.session.SessionStorage'),
+    ('db', 'django.contrib.messages.storage.cookie.CookieStorage'),
+    ('cached_db', 'django.contrib.messages.storage.cookie.CookieStorage'),
+    ('signed_cookies', 'django.contrib.messages.storage.cookie.CookieStorage'),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measures password hasher cost and login/page throughput per session profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help='Logins per session profile')
+        parser.add_argument('--requests', type=int, default=200, help='Logged-in page requests per profile')
+        parser.add_argument('--target-ms', type=float, default=250,
+                            help='Longest acceptable time for one password check')
+
+    def handle(self, *args, **options):
+        self.benchmark_hasher(options['target_ms'])
+        # Everything the login benchmark writes (user, sessions) is rolled back
+        try:
+            with transaction.atomic():
+                self.benchmark_sessions(options['logins'], options['requests'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def benchmark_hasher(self, target_ms):
+        """Time one PBKDF2 check per iteration count and suggest a count for this machine."""
+        self.stdout.write(f'PBKDF2-SHA256 cost (current PASSWORD_PBKDF2_ITERATIONS = '
+                          f'{settings.PASSWORD_PBKDF2_ITERATIONS:,})')
+        self.stdout.write(f"{'Iterations':>12} {'ms/check':>10} {'Checks/sec/core':>16}")
+        suggested = None
+        for iterations in ITERATION_STEPS:
+            with override_settings(PASSWORD_PBKDF2_ITERATIONS=iterations):
+                encoded = make_password('benchmark-password')
+                timings = []
+                for _ in range(3):  # Best of three, to smooth out noise
+                    start_time = time.perf_counter()
+                    check_password('benchmark-password', encoded)
+                    timings.append(time.perf_counter() - start_time)
+                seconds = min(timings)
+            self.stdout.write(f'{iterations:>12,} {seconds * 1000:>10.1f} {1 / seconds:>16.1f}')
+            if seconds * 1000 <= target_ms:
+                suggested = iterations
+        if suggested:
+            self.stdout.write(self.style.SUCCESS(
+                f'Largest count under {target_ms:.0f} ms: {suggested:,} '
+                f'(set DJANGO_PBKDF2_ITERATIONS={suggested})'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(f'No tested count is under {target_ms:.0f} ms'))
+        self.stdout.write('Lower counts are faster to log in but cheaper to brute-force; '
+                          'stay near the OWASP minimum of 600,000 for PBKDF2-SHA256.\n')
+
+    def benchmark_sessions(self, logins, requests):
+        """Time login_view POSTs and logged-in page views under each session/messages profile."""
+        password = 'benchmark-password'
+        User.objects.create_user('benchmark-login-user', password=password)
+        page = reverse('courses:my_courses')
+
+        self.stdout.write(f'login_view and {page} per session profile')
+        self.stdout.write(f"{'Sessions':<16} {'Messages':<16} {'Logins/sec':>11} "
+                          f"{'Pages/sec':>10} {'Queries/page':>13}")
+        for profile, message_storage in SESSION_PROFILES:
+            with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[profile],
+                                   MESSAGE_STORAGE=message_storage):
+                cache.clear()
+                client = Client()
+                start_time = time.perf_counter()
+                for _ in range(logins):
+                    client.post(reverse('login'), {'username': 'benchmark-login-user', 'password': password})
+                login_seconds = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                for _ in range(requests):
+                    client.get(page)
+                page_seconds = time.perf_counter() - start_time
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(page)
+
+            self.stdout.write(f'{profile:<16} {message_storage.rsplit(".", 1)[-1]:<16} '
+                              f'{logins / login_seconds:>11.1f} {requests / page_seconds:>10.1f} '
+                              f'{len(queries):>13}')
+        self.stdout.write('Logins/sec is dominated by the password hasher; tune it above.')
@@ -0,0 +1,97 @@
+import csv
+import os
+import tempfile
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from authapp.onboarding import (ROSTER_COLUMNS, DEFAULT_CHUNK_SIZE, read_roster, validate_rows,
+                                hash_passwords, create_students)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Creates users and student profiles in bulk from a roster CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', nargs='?', help=f'CSV with columns: {", ".join(ROSTER_COLUMNS)}')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes')
+        parser.add_argument('--iterations', type=int, default=None,
+                            help='PBKDF2 iterations for the initial hashes (at least the configured count)')
+        parser.add_argument('--no-passwords', action='store_true',
+                            help='Ignore the roster passwords and give every student an unusable one '
+                                 '(they set theirs through password reset); skips hashing')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Rows inserted per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the roster')
+        parser.add_argument('--benchmark', type=int, metavar='STUDENTS',
+                            help='Onboard a generated roster of this size, then roll it back')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, 'roster.csv')
+                write_sample_roster(path, options['benchmark'])
+                try:
+                    with transaction.atomic():
+                        self.onboard(path, options)
+                        raise Rollback
+                except Rollback:
+                    self.stdout.write('Benchmark data rolled back.')
+            return
+
+        if not options['roster']:
+            raise CommandError('Give a roster file (or --benchmark N)')
+        self.onboard(options['roster'], options)
+
+    def onboard(self, path, options):
+        timings = {}
+        start_time = time.perf_counter()
+        try:
+            rows = read_roster(path)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        timings['read'] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        valid, errors = validate_rows(rows)
+        timings['validate'] = time.perf_counter() - start_time
+        if errors:
+            for line, message in errors[:20]:
+                self.stderr.write(f'Line {line}: {message}')
+            raise CommandError(f'{len(errors)} invalid rows; nothing was created')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'All {len(valid)} rows are valid'))
+            return
+
+        start_time = time.perf_counter()
+        try:
+            passwords = hash_passwords([None if options['no_passwords'] else row['password'] or None
+                                        for row in valid], options['workers'], options['iterations'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        timings['hash'] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        created = create_students(valid, passwords, options['chunk_size'])
+        timings['insert'] = time.perf_counter() - start_time
+
+        total = sum(timings.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} students in {total:.1f}s ({created / total:,.0f} students/sec)'
+        ))
+        self.stdout.write('  ' + ', '.join(f'{step} {seconds:.2f}s' for step, seconds in timings.items()))
+
+
+def write_sample_roster(path, count):
+    """Generate a valid roster for benchmarks."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(ROSTER_COLUMNS)
+        writer.writerows(
+            [f'onboard{i}', 'First', f'Last{i}', f'onboard{i}@example.edu', f'B{i:07d}',
+             f'Tx-{i * 7919:09d}-pass', '2004-05-17', 'OFM'[i % 3], '', '', 'Undeclared']
+            for i in range(count)
+        )
@@ -0,0 +1,207 @@
+"""
+Bulk student onboarding.
+
+Creates User + Student pairs for a whole roster instead of one
+StudentRegistrationForm submission at a time:
+1. Rows are validated with the same rules as StudentRegistrationForm, using
+   validators built once (compiled regexes, the password validators) instead
+   of one form instance per row.
+2. Usernames, emails and student ids are checked for uniqueness against sets
+   loaded with a single query, and against the other rows of the roster.
+3. Passwords are hashed on a process pool.
+4. Users and students are inserted with bulk_create, one transaction per chunk.
+
+Password hashing dominates the cost: at the default PBKDF2 iteration count a
+hash takes a few hundred milliseconds. Rows without a password get an
+unusable password (students then use password reset), which is the way to
+onboard a large roster quickly (onboard_students --no-passwords). Initial
+hashes never use fewer iterations than the configured hasher: weaker hashes
+would stay in the database for as long as a student never logs in.
+"""
+
+import csv
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import get_default_password_validators
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import Student
+
+ROSTER_COLUMNS = ['username', 'first_name', 'last_name', 'email', 'student_id', 'password',
+                  'date_of_birth', 'gender', 'address', 'phone_number', 'major']
+
+# Same limits as StudentRegistrationForm and the models
+REQUIRED = ['username', 'first_name', 'last_name', 'email', 'student_id']
+MAX_LENGTHS = {'username': 150, 'first_name': 30, 'last_name': 30, 'email': 254, 'student_id': 20,
+               'address': 255, 'phone_number': 15, 'major': 100}
+GENDERS = {code for code, _ in Student.GENDER_CHOICES}
+USERNAME_RE = re.compile(UnicodeUsernameValidator.regex)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def read_roster(path):
+    """Read a roster CSV into a list of dicts with every ROSTER_COLUMNS key."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Roster is missing columns: {', '.join(missing)}")
+        return [{column: (row.get(column) or '').strip() for column in ROSTER_COLUMNS} for row in reader]
+
+
+def load_taken():
+    """Usernames, emails (lowercased) and student ids already in use, with one query."""
+    usernames, emails, student_ids = set(), set(), set()
+    for username, email, student_id in User.objects.values_list('username', 'email', 'student__student_id'):
+        usernames.add(username.lower())
+        if email:
+            emails.add(email.lower())
+        if student_id:
+            student_ids.add(student_id)
+    return usernames, emails, student_ids
+
+
+def validate_rows(rows, taken=None):
+    """
+    Validate roster rows; returns (valid rows, [(line number, message), ...]).
+
+    Line numbers count the CSV header as line 1.
+    """
+    usernames, emails, student_ids = taken if taken is not None else load_taken()
+    # Values repeated inside the roster itself
+    username_counts = Counter(row['username'].lower() for row in rows)
+    email_counts = Counter(row['email'].lower() for row in rows)
+    student_id_counts = Counter(row['student_id'] for row in rows)
+    password_validators = get_default_password_validators()
+
+    valid, errors = [], []
+    for line, row in enumerate(rows, start=2):
+        problems = [f'{column} is required' for column in REQUIRED if not row[column]]
+        problems += [f'{column} is longer than {limit} characters'
+                     for column, limit in MAX_LENGTHS.items() if len(row[column]) > limit]
+        username, email, student_id = row['username'], row['email'], row['student_id']
+
+        if username and not USERNAME_RE.match(username):
+            problems.append('username may only contain letters, digits and @/./+/-/_')
+        if username.lower() in usernames:
+            problems.append('username is already taken')
+        elif username_counts[username.lower()] > 1:
+            problems.append('username appears more than once in the roster')
+
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                problems.append('email is not a valid address')
+        if email.lower() in emails:
+            problems.append('email is already registered')
+        elif email and email_counts[email.lower()] > 1:
+            problems.append('email appears more than once in the roster')
+
+        if student_id in student_ids:
+            problems.append('student_id is already taken')
+        elif student_id and student_id_counts[student_id] > 1:
+            problems.append('student_id appears more than once in the roster')
+
+        if row['gender'] and row['gender'] not in GENDERS:
+            problems.append(f"gender must be one of {', '.join(sorted(GENDERS))}")
+        if row['date_of_birth']:
+            try:
+                row['date_of_birth'] = date.fromisoformat(row['date_of_birth'])
+            except ValueError:
+                problems.append('date_of_birth must be YYYY-MM-DD')
+        else:
+            row['date_of_birth'] = None
+
+        if row['password']:
+            # The form's password rules, against an unsaved user for the similarity check
+            user = User(username=username, first_name=row['first_name'],
+                        last_name=row['last_name'], email=email)
+            for validator in password_validators:
+                try:
+                    validator.validate(row['password'], user)
+                except ValidationError as e:
+                    problems.extend(e.messages)
+
+        if problems:
+            errors.append((line, '; '.join(problems)))
+        else:
+            valid.append(row)
+    return valid, errors
+
+
+def _hash_chunk(args):
+    """Worker: hash a list of passwords (None gives an unusable password)."""
+    import django
+    django.setup()  # No-op when the worker was forked from a set-up process
+    passwords, iterations = args
+    if iterations is None:
+        return [make_password(password) for password in passwords]
+    hasher = get_hasher('default')
+    return [make_password(None) if password is None
+            else hasher.encode(password, hasher.salt(), iterations)
+            for password in passwords]
+
+
+def hash_passwords(passwords, workers=None, iterations=None, chunk_size=200):
+    """
+    Hash passwords in order on a process pool (inline when workers is 1).
+
+    iterations may raise the configured PBKDF2 count, never lower it (ValueError).
+    """
+    minimum = get_hasher('default').iterations
+    if iterations is not None and iterations < minimum:
+        raise ValueError(f'iterations must be at least {minimum:,} (the configured PBKDF2 count)')
+    chunks = [(passwords[i:i + chunk_size], iterations) for i in range(0, len(passwords), chunk_size)]
+    if workers == 1:
+        results = map(_hash_chunk, chunks)
+        return [encoded for chunk in results for encoded in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [encoded for chunk in executor.map(_hash_chunk, chunks) for encoded in chunk]
+
+
+def create_students(rows, passwords, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Insert validated rows with bulk_create, one transaction per chunk; returns the count."""
+    created = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=row['username'], first_name=row['first_name'], last_name=row['last_name'],
+                     email=row['email'], password=password)
+                for row, password in zip(chunk, passwords[start:start + chunk_size])
+            ])
+            Student.objects.bulk_create([
+                Student(user=user, student_id=row['student_id'], date_of_birth=row['date_of_birth'],
+                        gender=row['gender'], address=row['address'], phone_number=row['phone_number'],
+                        major=row['major'])
+                for user, row in zip(users, chunk)
+            ])
+        created += len(chunk)
+    return created
+
+
+def onboard_students(rows, workers=None, iterations=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Validate, hash and insert a roster; returns (created count, errors).
+
+    Nothing is inserted when any row is invalid, so a roster can be fixed and
+    submitted again as a whole.
+
+    Usage example:
+        created, errors = onboard_students(read_roster('cohort.csv'), workers=4)
+    """
+    valid, errors = validate_rows(rows)
+    if errors or dry_run:
+        return 0, errors
+    passwords = hash_passwords([row['password'] or None for row in valid], workers, iterations)
+    return create_students(valid, passwords, chunk_size), errors
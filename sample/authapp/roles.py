@@ -0,0 +1,82 @@
+"""
+Role resolution for students, instructors and staff.
+
+A user's roles are loaded with one query (LEFT JOINs to the Student and
+Instructor profiles), kept on the user object for the rest of the request and
+in the cache for ROLES_CACHE_TIMEOUT seconds. The signals in authapp/signals.py
+drop the cached roles when a profile is created or deleted, or a user's staff
+flag changes.
+
+UserRolesMiddleware exposes the roles as request.user_roles, and the
+user_roles context processor makes them available to templates:
+    {% if 'student' in user_roles %}...{% endif %}
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+STUDENT = 'student'
+INSTRUCTOR = 'instructor'
+STAFF = 'staff'
+
+ROLES_CACHE_KEY = 'user_roles:{}'
+ROLES_CACHE_TIMEOUT = 300
+
+
+def load_roles(user_id):
+    """Read a user's roles from the database with a single query."""
+    row = User.objects.filter(pk=user_id).values_list('student__id', 'instructor__id', 'is_staff').first()
+    if row is None:
+        return frozenset()
+    student_id, instructor_id, is_staff = row
+    roles = set()
+    if student_id is not None:
+        roles.add(STUDENT)
+    if instructor_id is not None:
+        roles.add(INSTRUCTOR)
+    if is_staff:
+        roles.add(STAFF)
+    return frozenset(roles)
+
+
+def get_roles(user):
+    """The roles of a user: from the user object, then the cache, then the database."""
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_user_roles', None)
+    if roles is None:
+        key = ROLES_CACHE_KEY.format(user.pk)
+        roles = cache.get(key)
+        if roles is None:
+            roles = load_roles(user.pk)
+            cache.set(key, roles, ROLES_CACHE_TIMEOUT)
+        user._user_roles = roles
+    return roles
+
+
+def invalidate_roles(user_id, user=None):
+    """Forget cached roles (and the copy on the user object, when given)."""
+    cache.delete(ROLES_CACHE_KEY.format(user_id))
+    if user is not None:
+        try:
+            del user._user_roles
+        except AttributeError:
+            pass
+
+
+class UserRolesMiddleware(MiddlewareMixin):
+    """Set request.user_roles; must come after AuthenticationMiddleware."""
+
+    def process_request(self, request):
+        # Lazy, so requests that never look at roles do not query for them
+        request.user_roles = SimpleLazyObject(lambda: get_roles(request.user))
+
+
+def user_roles(request):
+    """Context processor: the current user's roles as `user_roles`."""
+    roles = getattr(request, 'user_roles', None)
+    if roles is None:  # UserRolesMiddleware is not installed
+        roles = SimpleLazyObject(lambda: get_roles(request.user))
+    return {'user_roles': roles}
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from courses.models import Instructor
+from .models import Student
+from .roles import invalidate_roles
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Instructor)
+@receiver(post_delete, sender=Instructor)
+def profile_changed(sender, instance, created=None, **kwargs):
+    """A student/instructor profile was created or deleted: the user's roles changed."""
+    if created is False:
+        return  # Editing an existing profile does not change any role
+    user = instance.user if sender.user.is_cached(instance) else None
+    invalidate_roles(instance.user_id, user)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    """The staff flag is a role too; cheap enough to drop the cache on every save."""
+    if not created:
+        invalidate_roles(instance.pk, instance)
@@ -1,3 +1,143 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from courses.models import Course, Enrollment, Instructor
+from .models import Student
+from .onboarding import ROSTER_COLUMNS, validate_rows, onboard_students
+from .roles import get_roles, STUDENT, INSTRUCTOR, STAFF
+
+
+class StudentDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', first_name='Alice', last_name='Smith')
+        Student.objects.create(user=self.user, student_id='S000001')
+        self.client.force_login(self.user)
+
+    def enroll(self, count, status='ENR', grade=None):
+        start = Course.objects.count()
+        for i in range(start, start + count):
+            course = Course.objects.create(title=f'Course {i}', code=f'C{i:03d}', description='About it',
+                                           credits=3, start_date=date(2024, 9, 1), end_date=date(2024, 12, 15))
+            Enrollment.objects.create(student=self.user, course=course, status=status, grade=grade)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_does_not_grow_with_enrollments(self):
+        self.count_queries()  # Resolve and cache the user's roles
+        self.enroll(1)  # Enrolling invalidates the cached GPA, before both measurements
+        few, _ = self.count_queries()
+        self.enroll(30)
+        many, _ = self.count_queries()
+        self.assertEqual(few, many)
+
+    def test_summary_block(self):
+        self.enroll(2, status='ENR', grade='IP')
+        self.enroll(1, status='CMP', grade='A')
+        self.enroll(1, status='CMP', grade='C')
+        _, response = self.count_queries()
+        summary = response.context['summary']
+        self.assertEqual(summary['credits_in_progress'], 6)
+        self.assertEqual(summary['completed'], 2)
+        self.assertEqual(summary['gpa'], 3.0)
+        self.assertContains(response, reverse('courses:course_detail', args=['C000']))
+
+    def test_fragment_cache_follows_enrollment_changes(self):
+        self.enroll(1)
+        self.client.get(reverse('dashboard'))
+        enrollment = Enrollment.objects.get()
+        Course.objects.filter(pk=enrollment.course_id).update(title='Renamed')  # No updated_at change
+        self.assertNotContains(self.client.get(reverse('dashboard')), 'Renamed')
+
+        enrollment.status = 'DRP'
+        enrollment.save()  # Bumps last_activity, so the card is rendered again
+        enrollment.course.title = 'Renamed'
+        enrollment.course.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Renamed')
+        self.assertContains(response, 'Dropped')
+
+    def test_many_enrollments_rendered_from_cached_cards(self):
+        self.enroll(100)
+        self.count_queries()  # Fill the fragment cache
+        Course.objects.update(title='Renamed')  # No updated_at change
+        queries, response = self.count_queries()
+        self.assertEqual(len(response.context['enrollments']), 100)
+        self.assertNotContains(response, 'Renamed')  # All 100 cards came from the cache
+        with self.assertNumQueries(queries):
+            self.client.get(reverse('dashboard'))
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('bob', is_staff=True)
+
+    def test_roles_loaded_with_one_query_then_cached(self):
+        Student.objects.create(user=self.user, student_id='S000002')
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_roles(user), {STUDENT, STAFF})
+            self.assertEqual(get_roles(user), {STUDENT, STAFF})  # Kept on the user object
+        fresh_user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_roles(fresh_user), {STUDENT, STAFF})
+
+    def test_cache_invalidated_when_profiles_change(self):
+        self.assertEqual(get_roles(self.user), {STAFF})
+        student = Student.objects.create(user=self.user, student_id='S000003')
+        self.assertEqual(get_roles(self.user), {STUDENT, STAFF})
+        Instructor.objects.create(user=self.user)
+        self.assertEqual(get_roles(User.objects.get(pk=self.user.pk)), {STUDENT, INSTRUCTOR, STAFF})
+        student.delete()
+        self.assertEqual(get_roles(User.objects.get(pk=self.user.pk)), {INSTRUCTOR, STAFF})
+
+    def test_student_required_uses_request_roles(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)  # Not a student: sent to the login page
+        self.assertEqual(response.wsgi_request.user_roles, {STAFF})
+        Student.objects.create(user=self.user, student_id='S000004')
+        self.assertEqual(self.client.get(reverse('dashboard')).status_code, 200)
+
+
+class BulkOnboardingTests(TestCase):
+    def row(self, i, **overrides):
+        row = dict.fromkeys(ROSTER_COLUMNS, '')
+        row.update(username=f'new{i}', first_name='New', last_name=f'Student{i}',
+                   email=f'new{i}@example.edu', student_id=f'N{i:04d}', password=f'Tx-{i:04d}-secret')
+        row.update(overrides)
+        return row
+
+    def test_rows_validated_like_the_registration_form(self):
+        User.objects.create_user('taken', email='taken@example.edu')
+        rows = [self.row(1), self.row(2, username='taken'), self.row(3, email='NEW1@example.edu'),
+                self.row(4, password='12345678'), self.row(5, gender='X', date_of_birth='05/17/2004')]
+        with self.assertNumQueries(1):
+            valid, errors = validate_rows(rows)
+        self.assertEqual([row['username'] for row in valid], [])  # new1 shares its email with row 3
+        self.assertEqual([line for line, _ in errors], [2, 3, 4, 5, 6])
+        self.assertIn('already taken', errors[1][1])
+        self.assertIn('entirely numeric', errors[3][1])
+        self.assertIn('gender', errors[4][1])
 
-# Create your tests here.
+    def test_students_created_in_bulk(self):
+        rows = [self.row(i) for i in range(5)] + [self.row(5, password='')]
+        with self.assertRaises(ValueError):  # Weaker than the configured hasher
+            onboard_students(rows, workers=1, iterations=1000)
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            created, errors = onboard_students(rows, workers=1, chunk_size=4)
+        self.assertEqual((created, errors), (6, []))
+        self.assertEqual(Student.objects.count(), 6)
+        self.assertTrue(User.objects.get(username='new1').check_password('Tx-0001-secret'))
+        self.assertFalse(User.objects.get(username='new5').has_usable_password())
@@ -7,6 +7,7 @@ from .forms import StudentRegistrationForm, StudentProfileForm, ValidationExampl
 from .models import Student
 from .decorators import student_required
 from courses.models import Enrollment
+from courses.transcripts import get_transcript
 
 def login_view(request):
     if request.method == 'POST':
@@ -73,11 +74,19 @@ def change_password_view(request):
 @login_required
 @student_required
 def student_dashboard(request):
-    # Get all enrollments for the current student
-    enrollments = Enrollment.objects.filter(student=request.user)
+    # Get all enrollments for the current student, with their course in the same query
+    enrollments = list(Enrollment.objects.filter(student=request.user).select_related('course'))
+    
+    # Summary block, computed from the rows already loaded
+    summary = {
+        'credits_in_progress': sum(e.course.credits for e in enrollments if e.status == 'ENR'),
+        'completed': sum(1 for e in enrollments if e.status == 'CMP'),
+        'gpa': get_transcript(request.user.id)['gpa'],  # Cached per student
+    }
     
     context = {
         'enrollments': enrollments,
+        'summary': summary,
     }
     return render(request, 'authapp/student_dashboard.html', context)
 
@@ -2,8 +2,17 @@ from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q, Count
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from .bulk_grading import apply_grades, BulkGradeError
+from .sync import catalog_changes, catalog_last_modified
+from .registration import register_cart, MODES, ALL_OR_NOTHING, MAX_CART_SIZE
+from .exports import ENROLLMENT_COLUMNS, COURSE_COLUMNS, FORMATS, export_response
 from .models import Course, Instructor, Enrollment
-from .serializers import CourseSerializer, InstructorSerializer, EnrollmentSerializer
+from .serializers import (CourseSerializer, InstructorSerializer, EnrollmentSerializer,
+                          course_rows, requested_fields, with_enrolled_count)
 
 class CourseViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -31,19 +40,93 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
                 Q(description__icontains=query)
             )
         
+        # The list goes through course_rows(), which adds its own columns
+        if self.action == 'retrieve':
+            queryset = with_enrolled_count(queryset.select_related('instructor__user'))
+        
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        # Conditional GET: 304 Not Modified while the catalog is unchanged
+        last_modified = catalog_last_modified()
+        if last_modified is None:
+            return self.fast_list(request)
+        etag = f'"{last_modified.timestamp():.6f}"'  # Exact, where Last-Modified has whole seconds
+        not_modified = get_conditional_response(request, etag=etag,
+                                                last_modified=int(last_modified.timestamp()))
+        if not_modified is not None:
+            return not_modified
+        response = self.fast_list(request)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        response['Cache-Control'] = 'no-cache'  # Cache, but revalidate every time
+        response['Vary'] = 'Accept'  # JSON and the browsable API share the URL
+        return response
+    
+    def fast_list(self, request):
+        """The list as plain dicts from .values() rows (see course_rows), honouring ?fields=/?omit=."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(course_rows(queryset, requested_fields(request, CourseSerializer.Meta.fields)))
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Courses changed since ?since=<watermark of the previous sync>, plus the
+        ids of deactivated and deleted courses; without since, every course
+        """
+        since = request.query_params.get('since')
+        if since is not None:
+            since = parse_datetime(since.replace(' ', '+'))  # An unencoded + in the UTC offset
+            if since is None:
+                return Response({'detail': 'since must be a watermark returned by this endpoint'}, status=400)
+        fields = requested_fields(request, CourseSerializer.Meta.fields)
+        changes = catalog_changes(since)
+        return Response({
+            'watermark': changes['watermark'].isoformat(),
+            'reset': changes['reset'],
+            'courses': course_rows(changes['courses'], fields),
+            'deactivated': changes['deactivated'],
+            'deleted': changes['deleted'],
+        })
+    
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """
         Return a list of featured courses (most enrolled)
         """
-        courses = Course.objects.filter(is_active=True)\
+        courses = with_enrolled_count(Course.objects.filter(is_active=True).select_related('instructor__user'))\
             .annotate(enrollment_count=Count('enrollments'))\
             .order_by('-enrollment_count')[:5]
         
         serializer = self.get_serializer(courses, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the (filtered) course list as CSV or JSON lines:
+        ?type=csv|jsonl, plus ?gzip=1 to compress it
+        """
+        return stream_export(request, self.filter_queryset(self.get_queryset()), COURSE_COLUMNS, 'courses')
+    
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def grades(self, request, pk=None):
+        """
+        Update the status and grade of many students in one request (course
+        instructor or staff only). Body: a list of
+        {"student": <user id> or "username": ..., "status": "CMP", "grade": "A"}
+        """
+        # Also inactive courses, whose grades are finalized after the term
+        course = get_object_or_404(Course.objects.select_related('instructor'), pk=pk)
+        if not (request.user.is_staff or (course.instructor and course.instructor.user_id == request.user.id)):
+            return Response({'detail': 'Only the course instructor can grade this course'}, status=403)
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of updates'}, status=400)
+        try:
+            updated = apply_grades(course, request.data)
+        except BulkGradeError as e:
+            return Response({'detail': str(e), 'errors': e.errors}, status=400)
+        return Response({'updated': updated})
 
 class InstructorViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -65,4 +148,40 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         # Set the student to the current user
-        serializer.save(student=self.request.user)
\ No newline at end of file
+        serializer.save(student=self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream enrollments as CSV or JSON lines (every enrollment for staff):
+        ?type=csv|jsonl, plus ?gzip=1 to compress it
+        """
+        queryset = Enrollment.objects.all() if request.user.is_staff else self.get_queryset()
+        return stream_export(request, queryset, ENROLLMENT_COLUMNS, 'enrollments')
+    
+    @action(detail=False, methods=['post'])
+    def register(self, request):
+        """
+        Enroll in several courses in one transaction. Body:
+        {"courses": ["CS101", "MATH101"], "mode": "all" or "best_effort"}
+        """
+        if not isinstance(request.data, dict):
+            return Response({'detail': 'Expected an object with a list of courses'}, status=400)
+        codes = request.data.get('courses')
+        mode = request.data.get('mode', ALL_OR_NOTHING)
+        if not isinstance(codes, list) or not codes or not all(isinstance(code, str) for code in codes):
+            return Response({'detail': 'courses must be a list of course codes'}, status=400)
+        if len(codes) > MAX_CART_SIZE:
+            return Response({'detail': f'At most {MAX_CART_SIZE} courses at once'}, status=400)
+        if mode not in MODES:
+            return Response({'detail': f"mode must be one of {', '.join(MODES)}"}, status=400)
+        enrolled, problems = register_cart(request.user, codes, mode)
+        return Response({'enrolled': enrolled, 'problems': problems}, status=201 if enrolled else 400)
+
+def stream_export(request, queryset, columns, filename):
+    # Not ?format=, which DRF uses to pick a renderer
+    fmt = request.query_params.get('type', 'csv')
+    if fmt not in FORMATS:
+        return Response({'detail': f"type must be one of {', '.join(FORMATS)}"}, status=400)
+    compress = request.query_params.get('gzip') in ('1', 'true')
+    return export_response(queryset, columns, filename, fmt, compress)
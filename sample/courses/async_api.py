@@ -0,0 +1,126 @@
+"""
+Async read-only catalog API, for serving through myproject/asgi.py.
+
+DRF views are sync only, so under ASGI every request to CourseViewSet holds
+a worker thread until its queries and rendering are done. These endpoints
+return the same rows (course_rows, ?fields=/?omit=) from async views that
+use the async ORM (async for, acount, aaggregate), so a request
+waiting on the database costs no thread of its own:
+
+    GET /courses/api/async/courses/                  active courses, ?level=, ?q=
+    GET /courses/api/async/courses/search/?q=&limit= {"count", "results"}
+    GET /courses/api/async/courses/featured/         five most enrolled courses
+    GET /courses/api/async/courses/<id>/             one course
+
+Independent queries are awaited together with asyncio.gather. Django still
+runs each query in the request's database thread, one at a time, so that
+saves the hops between them rather than running queries in parallel.
+
+Under WSGI they work too (Django runs them in an event loop per request),
+but the sync DRF endpoints are cheaper there.
+"""
+
+import asyncio
+
+from django.db.models import Count, Q
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import ValidationError
+
+from .models import Course
+from .renderers import FastJSONRenderer
+from .serializers import CourseSerializer, acourse_rows, requested_fields
+from .sync import acatalog_last_modified
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+def json_response(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def catalog(request):
+    """Active courses, filtered by ?level= and ?q= (or DRF's ?search=) like CourseViewSet."""
+    courses = Course.objects.filter(is_active=True)
+    level = request.GET.get('level')
+    if level and level in dict(Course.LEVEL_CHOICES):
+        courses = courses.filter(level=level)
+    query = request.GET.get('q') or request.GET.get('search')
+    if query:
+        courses = courses.filter(Q(title__icontains=query) | Q(code__icontains=query) |
+                                 Q(description__icontains=query))
+    return courses
+
+
+def fields_or_error(request):
+    """(fields, None), or (None, a 400 response) for unknown ?fields=/?omit= names."""
+    try:
+        return requested_fields(request, CourseSerializer.Meta.fields), None
+    except ValidationError as e:
+        return None, json_response(e.detail, status=400)
+
+
+@require_safe
+async def course_list(request):
+    fields, error = fields_or_error(request)
+    if error:
+        return error
+    # Conditional GET, with the same validators as CourseViewSet.list
+    last_modified = await acatalog_last_modified()
+    if last_modified is not None:
+        etag = f'"{last_modified.timestamp():.6f}"'
+        not_modified = get_conditional_response(request, etag=etag,
+                                                last_modified=int(last_modified.timestamp()))
+        if not_modified is not None:
+            return not_modified
+    response = json_response(await acourse_rows(catalog(request), fields))
+    if last_modified is not None:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_safe
+async def course_search(request):
+    fields, error = fields_or_error(request)
+    if error:
+        return error
+    try:
+        limit = min(int(request.GET.get('limit', SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+    except ValueError:
+        return json_response({'detail': 'limit must be a number'}, status=400)
+    courses = catalog(request)
+    count, results = await asyncio.gather(courses.acount(), acourse_rows(courses[:max(limit, 0)], fields))
+    return json_response({'count': count, 'results': results})
+
+
+@require_safe
+async def course_featured(request):
+    fields, error = fields_or_error(request)
+    if error:
+        return error
+    top = [pk async for pk in Course.objects.filter(is_active=True)
+           .annotate(enrollment_count=Count('enrollments'))
+           .order_by('-enrollment_count').values_list('pk', flat=True)[:5]]
+    rows = await acourse_rows(Course.objects.filter(pk__in=top), fields if 'id' in fields else ['id'] + fields)
+    rank = {pk: position for position, pk in enumerate(top)}
+    rows.sort(key=lambda row: rank[row['id']])
+    if 'id' not in fields:
+        for row in rows:
+            del row['id']
+    return json_response(rows)
+
+
+@require_safe
+async def course_detail(request, pk):
+    fields, error = fields_or_error(request)
+    if error:
+        return error
+    rows = await acourse_rows(Course.objects.filter(pk=pk, is_active=True), fields)
+    if not rows:
+        return json_response({'detail': 'No Course matches the given query.'}, status=404)
+    return json_response(rows[0])
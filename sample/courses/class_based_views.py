@@ -3,6 +3,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.db.models import Q, Count
 from .models import Course, Instructor, Enrollment
+from .recommendations import related_courses
 
 # Class-based view equivalent of course_list function
 class CourseListView(ListView):
@@ -64,14 +65,11 @@ class CourseDetailView(DetailView):
         # Get prerequisites
         prerequisites = course.prerequisites.all()
         
-        # Get related courses
-        related_courses = Course.objects.filter(
-            Q(instructor=course.instructor) | Q(level=course.level)
-        ).exclude(id=course.id)[:3]
-        
         context['is_enrolled'] = is_enrolled
         context['prerequisites'] = prerequisites
-        context['related_courses'] = related_courses
+        # Courses often taken together with this one (precomputed)
+        context['related_courses'] = related_courses(course)
+        context['enrolled_count'] = course.enrollments.count()
         
         return context
 
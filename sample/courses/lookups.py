@@ -0,0 +1,33 @@
+"""
+Lookups for searches that should be served by an index.
+
+LIKE 'abc%' (startswith/istartswith) only uses an index under conditions
+that depend on the database (SQLite's case_sensitive_like, PostgreSQL's
+*_pattern_ops), so the admin's "^field" searches scan the whole table.
+"""
+
+from django.db.models import CharField, Value
+from django.db.models.functions import Upper
+from django.db.models.lookups import IStartsWith, Lookup, StartsWith
+
+
+@CharField.register_lookup
+class IPrefix(Lookup):
+    """
+    Case-insensitive prefix match written as a range on UPPER(column)
+    (UPPER(col) >= UPPER('abc') AND UPPER(col) < UPPER('abc\\U0010ffff')),
+    which an index on Upper('col') can answer. The LIKE is kept so
+    collations that do not order by code point still return only real
+    prefixes.
+    """
+    lookup_name = 'iprefix'
+    upper_bound = '\U0010ffff'
+
+    def as_sql(self, compiler, connection):
+        if not isinstance(self.rhs, str):
+            return compiler.compile(IStartsWith(self.lhs, self.rhs))
+        upper = Upper(self.lhs)
+        lhs_sql, lhs_params = compiler.compile(upper)
+        like_sql, like_params = compiler.compile(StartsWith(upper, Upper(Value(self.rhs))))
+        return (f'{lhs_sql} >= UPPER(%s) AND {lhs_sql} < UPPER(%s) AND {like_sql}',
+                (*lhs_params, self.rhs, *lhs_params, self.rhs + self.upper_bound, *like_params))
@@ -0,0 +1,159 @@
+import asyncio
+import io
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from courses.models import Course, Enrollment, Instructor
+
+ENDPOINTS = [
+    # (label, sync URL, async URL)
+    ('Course list API', '/courses/api/courses/', '/courses/api/async/courses/'),
+    ('Course search API', '/courses/api/courses/?q=course+1', '/courses/api/async/courses/search/?q=course+1'),
+    ('Course detail page', '/courses/XASGI00001/', '/courses/XASGI00001/'),
+]
+
+
+class Command(BaseCommand):
+    help = ('Compares throughput of the sync views behind WSGI (a thread pool) with the async views '
+            'behind ASGI (one event loop), at a given number of concurrent requests')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=200, help='Courses in the catalog')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and server')
+        parser.add_argument('--concurrency', type=int, default=100, help='Requests in flight at once')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help='Milliseconds added to every query, as with a database across the network')
+
+    def handle(self, *args, **options):
+        # Requests run on other threads and their own connections, so the data
+        # is committed (and deleted afterwards) instead of rolled back
+        self.generate(options['courses'])
+        delay = options['db_latency'] / 1000
+
+        def slow_execute(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            # Once per connection object, which reconnects for every WSGI request
+            if slow_execute not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_execute)
+
+        if delay:
+            # Every connection the requests open from now on
+            connection_created.connect(add_latency)
+        try:
+            self.benchmark(options['requests'], options['concurrency'], options['threads'])
+        finally:
+            connection_created.disconnect(add_latency)
+            Course.objects.filter(code__startswith='XASGI').delete()
+            User.objects.filter(username__startswith='asgi-').delete()
+            self.stdout.write('Benchmark data deleted.')
+
+    def generate(self, count):
+        instructor = Instructor.objects.create(
+            user=User.objects.create_user('asgi-prof', first_name='Prof', last_name='Async'),
+            expertise='Benchmarks')
+        start = date(2025, 1, 13)
+        courses = Course.objects.bulk_create([
+            Course(title=f'Benchmark course {i}', code=f'XASGI{i:05d}', description='A course. ' * 20,
+                   credits=3, level='BEG', instructor=instructor, max_students=40,
+                   start_date=start, end_date=start + timedelta(days=110))
+            for i in range(count)
+        ])
+        students = User.objects.bulk_create([User(username=f'asgi-student{i}') for i in range(20)])
+        Enrollment.objects.bulk_create([Enrollment(student=student, course=course)
+                                        for course in courses[:10] for student in students])
+
+    def benchmark(self, requests, concurrency, threads):
+        from myproject.asgi import application as asgi_application
+        from myproject.wsgi import application as wsgi_application
+
+        self.stdout.write(f'{requests} requests per run, {concurrency} in flight; WSGI: {threads} threads')
+        self.stdout.write(f"{'Endpoint':<20} {'Server':<6} {'Req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'Errors':>7}")
+        for label, sync_url, async_url in ENDPOINTS:
+            runs = [
+                ('WSGI', lambda: self.run_wsgi(wsgi_application, sync_url, requests, concurrency, threads)),
+                ('ASGI', lambda: asyncio.run(self.run_asgi(asgi_application, async_url, requests, concurrency))),
+            ]
+            for server, run in runs:
+                run()  # Warm up
+                start_time = time.perf_counter()
+                results = run()
+                seconds = time.perf_counter() - start_time
+                latencies = sorted(latency for _, latency in results)
+                errors = sum(status != 200 for status, _ in results)
+                self.stdout.write(
+                    f'{label:<20} {server:<6} {len(results) / seconds:>8,.0f} '
+                    f'{statistics.median(latencies) * 1000:>8.1f} '
+                    f'{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.1f} {errors:>7}')
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def run_wsgi(self, application, url, requests, concurrency, threads):
+        path, _, query = url.partition('?')
+        in_flight = threading.BoundedSemaphore(concurrency)
+
+        def call(issued):
+            status = []
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'testserver', 'HTTP_ACCEPT': 'application/json', 'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(b''), 'wsgi.errors': io.StringIO(),
+                'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+            try:
+                body = application(environ, lambda code, headers, exc_info=None: status.append(int(code[:3])))
+                b''.join(body)
+                body.close()
+                return status[0], time.perf_counter() - issued
+            finally:
+                in_flight.release()
+
+        # Like a threaded WSGI server: requests in flight queue up for the worker
+        # threads, and their latency includes the wait
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = []
+            for _ in range(requests):
+                in_flight.acquire()
+                futures.append(pool.submit(call, time.perf_counter()))
+            return [future.result() for future in futures]
+
+    async def run_asgi(self, application, url, requests, concurrency):
+        path, _, query = url.partition('?')
+        in_flight = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with in_flight:
+                start_time = time.perf_counter()
+                scope = {
+                    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                    'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+                    'root_path': '', 'headers': [(b'host', b'testserver'), (b'accept', b'application/json')],
+                    'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+                }
+                status, requested, finished = [], [], asyncio.Event()
+
+                async def receive():
+                    if not requested:
+                        requested.append(True)
+                        return {'type': 'http.request', 'body': b'', 'more_body': False}
+                    await finished.wait()  # The client stays connected until the response is sent
+                    return {'type': 'http.disconnect'}
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        status.append(message['status'])
+                    elif not message.get('more_body'):
+                        finished.set()
+
+                await application(scope, receive, send)
+                return status[0], time.perf_counter() - start_time
+
+        return await asyncio.gather(*(call() for _ in range(requests)))
@@ -0,0 +1,76 @@
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from courses.models import Course, Instructor
+from myproject.middleware import brotli, gzip_bytes
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measures bytes sent and CPU per response for the course API, uncompressed and compressed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=2000, help='Courses in the response')
+        parser.add_argument('--repeat', type=int, default=20, help='Compressions per setting (mean is reported)')
+        parser.add_argument('--mbps', type=float, default=10.0, help='Link speed for the transfer time column')
+
+    def handle(self, *args, **options):
+        # The generated courses are rolled back
+        try:
+            with transaction.atomic():
+                self.generate(options['courses'])
+                self.benchmark(options['repeat'], options['mbps'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def generate(self, count):
+        instructors = [Instructor.objects.create(
+            user=User.objects.create_user(f'gz-prof{i}', first_name='Prof', last_name=f'Number {i}'),
+            expertise='Benchmarks') for i in range(20)]
+        start = date(2025, 1, 13)
+        Course.objects.bulk_create([
+            Course(title=f'Benchmark course {i}', code=f'XGZ{i:05d}',
+                   description=f'Course {i} covers the basics and then some. ' * 4,
+                   credits=3, level=['BEG', 'INT', 'ADV'][i % 3], instructor=instructors[i % 20],
+                   max_students=40, start_date=start, end_date=start + timedelta(days=110))
+            for i in range(count)
+        ])
+
+    def benchmark(self, repeat, mbps):
+        client = Client()
+        for query in ['', '?fields=code,title']:
+            url = f'/courses/api/courses/{query}'
+            start_time = time.perf_counter()
+            body = client.get(url).content
+            view_ms = (time.perf_counter() - start_time) * 1000
+            self.stdout.write(f'\nGET {url}: {len(body) / 1024:,.0f} KB, {view_ms:.1f} ms to produce')
+            self.stdout.write(f"{'Encoding':<12} {'KB':>8} {'Ratio':>6} {'CPU ms':>8} {'Transfer ms':>12}")
+
+            settings = [('identity', lambda: body)]
+            settings += [(f'gzip -{level}', lambda level=level: gzip_bytes(body, level)) for level in (1, 6, 9)]
+            if brotli is not None:
+                settings += [(f'br q{quality}', lambda quality=quality: brotli.compress(body, quality=quality))
+                             for quality in (4, 5, 11)]
+            for label, compress in settings:
+                start_cpu = time.process_time()
+                for _ in range(repeat):
+                    compressed = compress()
+                cpu_ms = (time.process_time() - start_cpu) / repeat * 1000
+                transfer_ms = len(compressed) * 8 / (mbps * 1_000_000) * 1000
+                self.stdout.write(f'{label:<12} {len(compressed) / 1024:>8,.1f} '
+                                  f'{len(body) / len(compressed):>5.1f}x {cpu_ms:>8.2f} {transfer_ms:>12.1f}')
+
+            # End to end, as the client gets it with the middleware in place
+            response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.stdout.write(self.style.SUCCESS(
+                f"Accept-Encoding: gzip, br -> {response.get('Content-Encoding', 'identity')}, "
+                f'{len(response.content) / 1024:,.1f} KB'))
+        if brotli is None:
+            self.stdout.write('(Brotli not installed: br rows skipped)')
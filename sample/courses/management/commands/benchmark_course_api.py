@@ -0,0 +1,83 @@
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+from courses.models import Course, Enrollment, Instructor
+from courses.renderers import FastJSONRenderer, orjson
+from courses.serializers import CourseSerializer, course_rows, with_enrolled_count
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measures course list serialization throughput (rows/sec) before and after the fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=10000, help='Courses in the response')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per method (best is reported)')
+
+    def handle(self, *args, **options):
+        # The generated courses are rolled back
+        try:
+            with transaction.atomic():
+                self.generate(options['courses'])
+                self.benchmark(options['courses'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def generate(self, count):
+        instructors = [Instructor.objects.create(
+            user=User.objects.create_user(f'api-prof{i}', first_name='Prof', last_name=f'Number {i}'),
+            expertise='Benchmarks', bio='Teaches ' * 20) for i in range(50)]
+        start = date(2025, 1, 13)
+        courses = Course.objects.bulk_create([
+            Course(title=f'Benchmark course {i}', code=f'XAPI{i:05d}', description='A course. ' * 30,
+                   credits=3, level='BEG', instructor=instructors[i % 50], max_students=40,
+                   start_date=start, end_date=start + timedelta(days=110))
+            for i in range(count)
+        ])
+        students = User.objects.bulk_create([User(username=f'api-student{i}') for i in range(20)])
+        Enrollment.objects.bulk_create([Enrollment(student=student, course=course)
+                                        for course in courses[::10] for student in students])
+
+    def benchmark(self, count, repeat):
+        courses = Course.objects.filter(code__startswith='XAPI')
+        annotated = with_enrolled_count(courses.select_related('instructor__user'))
+        methods = [
+            ('CourseSerializer, query per row', JSONRenderer,
+             lambda: CourseSerializer(courses, many=True).data),
+            ('CourseSerializer, annotated', JSONRenderer,
+             lambda: CourseSerializer(annotated, many=True).data),
+            ('course_rows', JSONRenderer, lambda: course_rows(courses)),
+            ('course_rows + orjson', FastJSONRenderer, lambda: course_rows(courses)),
+            ('course_rows code,title + orjson', FastJSONRenderer, lambda: course_rows(courses, ['code', 'title'])),
+        ]
+        self.stdout.write(f'{count:,} courses' + ('' if orjson else ' (orjson not installed)'))
+        self.stdout.write(f"{'Method':<34} {'Serialize':>10} {'Render':>8} {'Rows/sec':>10} {'KB':>8}")
+        for label, renderer, serialize in methods:
+            timings = []
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                data = serialize()
+                serialized = time.perf_counter()
+                content = renderer().render(data)
+                timings.append((serialized - start_time, time.perf_counter() - serialized))
+            serialize_seconds, render_seconds = min(timings, key=sum)
+            total = serialize_seconds + render_seconds
+            self.stdout.write(f'{label:<34} {serialize_seconds:>9.3f}s {render_seconds:>7.3f}s '
+                              f'{count / total:>10,.0f} {len(content) / 1024:>8,.0f}')
+
+        # The whole request, through the view, middleware and renderer
+        client = Client()
+        for query in ['', '?fields=code,title']:
+            start_time = time.perf_counter()
+            response = client.get(f'/courses/api/courses/{query}')
+            seconds = time.perf_counter() - start_time
+            self.stdout.write(f'GET /courses/api/courses/{query}: {seconds:.3f}s, '
+                              f'{len(response.content) / 1024:,.0f} KB')
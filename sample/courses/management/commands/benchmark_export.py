@@ -0,0 +1,89 @@
+import resource
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from courses.exports import ENROLLMENT_COLUMNS, export_response
+from courses.models import Course, Enrollment
+
+COURSES = 500
+INSERT_BATCH = 20000
+
+
+class Rollback(Exception):
+    pass
+
+
+def current_rss_mb():
+    """Resident set size of this process (Linux), else the peak so far."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = 'Generates enrollments, streams them through the CSV/JSONL export and reports time and memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000000, help='Enrollments to export')
+        parser.add_argument('--type', choices=['csv', 'jsonl'], default='csv', dest='fmt')
+        parser.add_argument('--gzip', action='store_true', help='Compress the export')
+
+    def handle(self, *args, **options):
+        # The generated users, courses and enrollments are rolled back
+        try:
+            with transaction.atomic():
+                self.generate(options['rows'])
+                self.export(options['rows'], options['fmt'], options['gzip'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def generate(self, rows):
+        start_time = time.perf_counter()
+        start = date(2024, 8, 1)
+        courses = Course.objects.bulk_create([
+            Course(title=f'Benchmark course {i}', code=f'XBM{i:04d}', description='', credits=3,
+                   start_date=start, end_date=start + timedelta(days=120))
+            for i in range(COURSES)
+        ])
+        students = -(-rows // COURSES)
+        for offset in range(0, students, INSERT_BATCH):
+            User.objects.bulk_create([User(username=f'export{i}', first_name='First', last_name=f'Last{i}')
+                                      for i in range(offset, min(offset + INSERT_BATCH, students))])
+        student_ids = list(User.objects.filter(username__startswith='export')
+                           .order_by('id').values_list('id', flat=True))
+        batch = []
+        for n in range(rows):
+            batch.append(Enrollment(student_id=student_ids[n // COURSES], course=courses[n % COURSES],
+                                    status='CMP', grade='ABCDF'[n % 5]))
+            if len(batch) == INSERT_BATCH:
+                Enrollment.objects.bulk_create(batch)
+                batch = []
+        Enrollment.objects.bulk_create(batch)
+        self.stdout.write(f'Generated {rows:,} enrollments in {time.perf_counter() - start_time:.1f}s')
+
+    def export(self, rows, fmt, compress):
+        response = export_response(Enrollment.objects.all(), ENROLLMENT_COLUMNS, 'enrollments', fmt, compress)
+        rss_before = peak_rss = current_rss_mb()
+        size = 0
+        start_time = time.perf_counter()
+        for i, piece in enumerate(response.streaming_content):
+            size += len(piece)
+            if i % 50 == 0:
+                peak_rss = max(peak_rss, current_rss_mb())
+        seconds = time.perf_counter() - start_time
+        peak_rss = max(peak_rss, current_rss_mb())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {rows:,} rows as {fmt}{' (gzip)' if compress else ''}: {size / 2 ** 20:,.1f} MB "
+            f"in {seconds:.1f}s ({rows / seconds:,.0f} rows/sec)"
+        ))
+        self.stdout.write(f'RSS {rss_before:.0f} MB before the export, {peak_rss:.0f} MB at its peak '
+                          f'(+{peak_rss - rss_before:.0f} MB)')
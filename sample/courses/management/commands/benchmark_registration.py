@@ -0,0 +1,79 @@
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from courses.models import Course, Enrollment, Instructor
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compares registering through the cart API with sequential enroll_course requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Students registering per method')
+        parser.add_argument('--cart-size', type=int, default=5, help='Courses per student')
+
+    def handle(self, *args, **options):
+        # The generated courses, students and enrollments are rolled back
+        try:
+            with transaction.atomic():
+                self.benchmark(options['students'], options['cart_size'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Benchmark data rolled back.')
+
+    def benchmark(self, students, cart_size):
+        start = date(2025, 1, 13)
+        instructor = Instructor.objects.create(user=User.objects.create_user('benchmark-registration-prof'))
+        courses = Course.objects.bulk_create([
+            Course(title=f'Benchmark course {i}', code=f'XRG{i:03d}', description='', credits=3,
+                   instructor=instructor,
+                   max_students=students * 2, start_date=start, end_date=start + timedelta(days=110))
+            for i in range(cart_size + 1)
+        ])
+        # Every other course requires the first one, which every student has completed
+        foundation, courses = courses[0], courses[1:]
+        for course in courses[::2]:
+            course.prerequisites.add(foundation)
+        codes = [course.code for course in courses]
+
+        self.stdout.write(f'{students} students registering for {cart_size} courses each')
+        self.stdout.write(f"{'Method':<24} {'Seconds':>8} {'Students/sec':>13} {'Queries/student':>16}")
+        self.run(f'enroll_course x {cart_size}', students, 'sequential', foundation, lambda client: [
+            client.post(reverse('courses:enroll_course', args=[code]), follow=True) for code in codes
+        ])
+        self.run('cart API', students, 'cart', foundation, lambda client: client.post(
+            reverse('courses:enrollment-register'), {'courses': codes}, content_type='application/json'
+        ))
+        registered = Enrollment.objects.filter(course__in=courses).count()
+        self.stdout.write(f'{registered} enrollments created ({students * cart_size * 2} expected)')
+        self.stdout.write('enroll_course also follows its redirect to my_courses, as a browser would.')
+
+    def run(self, label, students, prefix, foundation, register):
+        clients = []
+        for i in range(students):
+            user = User.objects.create_user(f'{prefix}{i}')
+            Enrollment.objects.create(student=user, course=foundation, status='CMP', grade='A')
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        queries = 0
+
+        def count_query(execute, *args):
+            nonlocal queries
+            queries += 1
+            return execute(*args)
+
+        with connection.execute_wrapper(count_query):
+            start_time = time.perf_counter()
+            for client in clients:
+                register(client)
+            seconds = time.perf_counter() - start_time
+        self.stdout.write(f'{label:<24} {seconds:>8.2f} {students / seconds:>13.1f} '
+                          f'{queries / students:>16.1f}')
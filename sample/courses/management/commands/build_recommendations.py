@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from courses.recommendations import build_recommendations, TOP_N, np
+
+
+class Command(BaseCommand):
+    help = 'Builds the co-enrollment related courses, incrementally unless --full'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every course from scratch')
+        parser.add_argument('--top-n', type=int, default=TOP_N, help='Related courses kept per course')
+        parser.add_argument('--interval', type=float,
+                            help='Keep refreshing incrementally, this many seconds apart')
+
+    def handle(self, *args, **options):
+        full = options['full']
+        try:
+            while True:
+                start_time = time.perf_counter()
+                build = build_recommendations(full=full, top_n=options['top_n'])
+                seconds = time.perf_counter() - start_time
+                self.stdout.write(self.style.SUCCESS(
+                    f"{'Full' if build.full else 'Incremental'} build: {build.courses_refreshed} courses "
+                    f"refreshed up to enrollment {build.last_enrollment_id} in {seconds:.2f}s"
+                    + ('' if np is not None else ' (NumPy not installed: pure Python)')
+                ))
+                if options['interval'] is None:
+                    break
+                full = False
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
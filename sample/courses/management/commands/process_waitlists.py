@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from courses.waitlist import promote_waitlists, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Enrolls waitlisted students into freed seats, in a loop or once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds between checks for free seats')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Students promoted per transaction')
+        parser.add_argument('--once', action='store_true', help='Promote everyone who can be, then exit')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                promoted = self.process(options['batch_size'])
+                if promoted:
+                    self.stdout.write(self.style.SUCCESS(f'Promoted {promoted} students from waitlists'))
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def process(self, batch_size):
+        """Promote in batches until no seat can be filled."""
+        promoted = 0
+        while True:
+            enrollments = promote_waitlists(batch_size)
+            promoted += len(enrollments)
+            if len(enrollments) < batch_size:
+                return promoted
@@ -0,0 +1,42 @@
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from courses.transcripts import compute_transcripts, CACHE_KEY, CACHE_TIMEOUT
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached GPA/transcript of every student'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Students computed per aggregate query')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        student_ids = User.objects.filter(enrollments__isnull=False).distinct() \
+            .order_by('id').values_list('id', flat=True)
+
+        start_time = time.perf_counter()
+        students = graded = 0
+        chunk = []
+        for student_id in student_ids.iterator(chunk_size=chunk_size):
+            chunk.append(student_id)
+            if len(chunk) == chunk_size:
+                graded += self.recompute(chunk)
+                students += len(chunk)
+                chunk = []
+        if chunk:
+            graded += self.recompute(chunk)
+            students += len(chunk)
+
+        seconds = time.perf_counter() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {students} transcripts ({graded} with a GPA) in {seconds:.2f}s'
+        ))
+
+    def recompute(self, student_ids):
+        """One aggregate query and one cache write for a chunk of students."""
+        transcripts = compute_transcripts(student_ids)
+        cache.set_many({CACHE_KEY.format(student_id): transcript
+                        for student_id, transcript in transcripts.items()}, CACHE_TIMEOUT)
+        return sum(1 for transcript in transcripts.values() if transcript['gpa'] is not None)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:56
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+# The enrollment and waitlist admins search the student's username and names
+# with the __iprefix lookup (courses/lookups.py), which needs an index on
+# UPPER() of each column. auth_user belongs to django.contrib.auth, whose
+# migrations cannot be changed, so these indexes are created here with raw
+# SQL and are not part of any model's migration state.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='course',
+            name='courses_cou_title_6e78a2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(django.db.models.functions.text.Upper('title'), name='courses_course_upper_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(django.db.models.functions.text.Upper('code'), name='courses_course_upper_code_idx'),
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX courses_user_upper_username_idx ON auth_user (UPPER(username))',
+            reverse_sql='DROP INDEX courses_user_upper_username_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX courses_user_upper_first_name_idx ON auth_user (UPPER(first_name))',
+            reverse_sql='DROP INDEX courses_user_upper_first_name_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX courses_user_upper_last_name_idx ON auth_user (UPPER(last_name))',
+            reverse_sql='DROP INDEX courses_user_upper_last_name_idx',
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
 
 class Instructor(models.Model):
@@ -11,6 +12,11 @@ class Instructor(models.Model):
     
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['expertise']),
+        ]
 
 class Course(models.Model):
     LEVEL_CHOICES = [
@@ -38,6 +44,13 @@ class Course(models.Model):
     
     class Meta:
         ordering = ['code']
+        indexes = [
+            # For the admin's case-insensitive __iprefix searches (see lookups.py)
+            models.Index(Upper('title'), name='courses_course_upper_title_idx'),
+            models.Index(Upper('code'), name='courses_course_upper_code_idx'),
+            models.Index(fields=['start_date']),
+            models.Index(fields=['updated_at']),
+        ]
 
 class Enrollment(models.Model):
     STATUS_CHOICES = [
@@ -70,3 +83,64 @@ class Enrollment(models.Model):
     class Meta:
         unique_together = ['student', 'course']
         ordering = ['-enrollment_date']
+        indexes = [
+            models.Index(fields=['enrollment_date']),
+            models.Index(fields=['status', 'grade']),
+            models.Index(fields=['last_activity']),
+        ]
+
+class WaitlistEntry(models.Model):
+    """A student waiting for a seat in a full course, served in position order."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='waitlist')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    # Increases per course; gaps are left when students are promoted or leave
+    position = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.student.username} waiting for {self.course.code} (#{self.position})"
+    
+    class Meta:
+        ordering = ['course', 'position']
+        constraints = [
+            # Also the (course, position) index the next student is found with
+            models.UniqueConstraint(fields=['course', 'position'], name='unique_waitlist_position'),
+            models.UniqueConstraint(fields=['course', 'student'], name='unique_waitlist_student'),
+        ]
+
+class CourseRecommendation(models.Model):
+    """One of the top co-enrolled courses of a course (built by courses/recommendations.py)."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='recommendations')
+    related = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='recommended_from')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    shared_students = models.PositiveIntegerField()
+    
+    def __str__(self):
+        return f"{self.course.code} -> {self.related.code} (#{self.rank})"
+    
+    class Meta:
+        ordering = ['course', 'rank']
+        constraints = [
+            # Also the index related courses are read with
+            models.UniqueConstraint(fields=['course', 'rank'], name='unique_recommendation_rank'),
+        ]
+
+class RecommendationBuild(models.Model):
+    """A run of the recommendation builder; the latest one is the incremental watermark."""
+    last_enrollment_id = models.BigIntegerField()
+    full = models.BooleanField()
+    courses_refreshed = models.PositiveIntegerField()
+    finished_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{'Full' if self.full else 'Incremental'} build up to enrollment {self.last_enrollment_id}"
+
+class CourseTombstone(models.Model):
+    """A deleted course, kept for a while so syncing clients learn about the deletion."""
+    course_id = models.BigIntegerField()
+    code = models.CharField(max_length=20)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"{self.code} (deleted)"
@@ -0,0 +1,185 @@
+"""
+Co-enrollment course recommendations.
+
+Two courses are related when the same students take them. The builder reads
+(student, course) pairs from Enrollment, counts the students every pair of
+courses shares (X.T @ X for the sparse binary student x course matrix X),
+scores each pair with the cosine similarity
+
+    shared(a, b) / sqrt(students(a) * students(b))
+
+and stores only the TOP_N best neighbors per course in CourseRecommendation.
+course_detail then reads related courses with one query on the
+(course, rank) index instead of computing them per request.
+
+With NumPy the shared counts are computed in COO form: every student's
+course pairs are generated with array arithmetic and summed with
+np.unique, a chunk of students at a time. Without NumPy the same counts come
+from a Counter.
+
+Builds are incremental: only enrollments after the last build's watermark
+are read, and only the courses they touch (their courses and the other
+courses of their students) get new neighbors. Scores of untouched courses
+drift slightly as other courses grow, and dropped enrollments are only
+noticed by a full build, so run one now and then:
+    python manage.py build_recommendations --full
+    python manage.py build_recommendations --interval 300
+"""
+
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import permutations
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from .models import Course, Enrollment, CourseRecommendation, RecommendationBuild
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; counts fall back to pure Python
+    np = None
+
+TOP_N = 5
+MIN_SHARED = 2  # Pairs with fewer shared students are noise
+COUNTED_STATUSES = ['ENR', 'CMP']
+PAIRS_PER_CHUNK = 5_000_000  # Course pairs generated at once on the NumPy path
+
+
+def co_enrollment_counts(students, courses):
+    """
+    Shared students per ordered pair of different courses.
+
+    students, courses: parallel sequences, one (student, course) per enrollment.
+    Returns {(course a, course b): shared students}.
+    """
+    if np is None or not len(students):
+        by_student = defaultdict(list)
+        for student, course in zip(students, courses):
+            by_student[student].append(course)
+        return dict(Counter(pair for taken in by_student.values() for pair in permutations(taken, 2)))
+
+    students = np.asarray(students, dtype=np.int64)
+    course_ids, courses = np.unique(np.asarray(courses, dtype=np.int64), return_inverse=True)
+    order = np.argsort(students, kind='stable')
+    students, courses = students[order], courses[order]
+    _, starts, sizes = np.unique(students, return_index=True, return_counts=True)
+    n = len(course_ids)
+
+    keys, counts = [], []
+    first = 0
+    while first < len(starts):
+        # As many students as fit in PAIRS_PER_CHUNK pairs (at least one)
+        pair_totals = np.cumsum(sizes[first:] ** 2)
+        last = first + max(1, int(np.searchsorted(pair_totals, PAIRS_PER_CHUNK, side='right')))
+        chunk_starts, chunk_sizes = starts[first:last], sizes[first:last]
+        # Every enrollment of the chunk, paired with every enrollment of the same student
+        rows = np.arange(chunk_starts[0], chunk_starts[-1] + chunk_sizes[-1])
+        row_sizes = np.repeat(chunk_sizes, chunk_sizes)
+        row_starts = np.repeat(chunk_starts, chunk_sizes)
+        left = np.repeat(rows, row_sizes)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(row_sizes) - row_sizes, row_sizes)
+        right = np.repeat(row_starts, row_sizes) + offsets
+        pairs = courses[left] * n + courses[right]
+        chunk_keys, chunk_counts = np.unique(pairs[left != right], return_counts=True)
+        keys.append(chunk_keys)
+        counts.append(chunk_counts)
+        first = last
+
+    keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+    return dict(zip(zip(course_ids[keys // n].tolist(), course_ids[keys % n].tolist()), counts.tolist()))
+
+
+def top_neighbors(shared, totals, course_ids=None, top_n=TOP_N, min_shared=MIN_SHARED):
+    """
+    The top_n most similar courses of each course: {course: [(related, score, shared), ...]}.
+
+    shared: co_enrollment_counts() output; totals: {course: students}.
+    course_ids limits the result to those courses.
+    """
+    candidates = defaultdict(list)
+    for (a, b), count in shared.items():
+        if count >= min_shared and (course_ids is None or a in course_ids):
+            candidates[a].append((count / math.sqrt(totals[a] * totals[b]), count, -b))
+    return {
+        a: [(-negative_b, round(score, 6), count)
+            for score, count, negative_b in heapq.nlargest(top_n, scored)]
+        for a, scored in candidates.items()
+    }
+
+
+def build_recommendations(full=False, top_n=TOP_N):
+    """
+    Refresh CourseRecommendation; returns the RecommendationBuild recorded.
+
+    Incremental unless full is set or there has been no build yet.
+    """
+    enrollments = Enrollment.objects.filter(status__in=COUNTED_STATUSES)
+    previous = RecommendationBuild.objects.order_by('-id').first()
+    last_id = Enrollment.objects.aggregate(last=Max('id'))['last'] or 0
+    full = full or previous is None
+
+    if full:
+        course_ids = None
+        students, courses = _columns(enrollments)
+    else:
+        new = enrollments.filter(id__gt=previous.last_enrollment_id, id__lte=last_id)
+        new_students = new.values('student_id')
+        # The new enrollments' courses, and every other course of their students
+        course_ids = set(enrollments.filter(student__in=new_students).values_list('course_id', flat=True))
+        # All students of those courses, with all their courses
+        students, courses = _columns(enrollments.filter(
+            student__in=enrollments.filter(course__in=course_ids).values('student_id')))
+
+    totals = dict(enrollments.values('course_id').annotate(students=Count('id'))
+                  .values_list('course_id', 'students'))
+    neighbors = top_neighbors(co_enrollment_counts(students, courses), totals, course_ids, top_n)
+
+    with transaction.atomic():
+        stale = CourseRecommendation.objects.all()
+        if course_ids is not None:
+            stale = stale.filter(course__in=course_ids)
+        stale.delete()
+        CourseRecommendation.objects.bulk_create([
+            CourseRecommendation(course_id=course, related_id=related, rank=rank, score=score,
+                                 shared_students=count)
+            for course, related_courses in neighbors.items()
+            for rank, (related, score, count) in enumerate(related_courses, start=1)
+        ], batch_size=1000)
+        return RecommendationBuild.objects.create(
+            last_enrollment_id=last_id, full=full,
+            courses_refreshed=len(totals) if course_ids is None else len(course_ids),
+        )
+
+
+def _columns(enrollments):
+    """(student ids, course ids) of a queryset of enrollments, as two lists."""
+    rows = list(enrollments.order_by().values_list('student_id', 'course_id'))
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+def related_courses(course, limit=3):
+    """
+    Courses often taken together with this one, with a single indexed query.
+
+    Courses without recommendations yet (new ones) fall back to courses with
+    the same instructor or level.
+    """
+    related = list(Course.objects.filter(recommended_from__course=course, is_active=True)
+                   .order_by('recommended_from__rank')[:limit])
+    if not related:
+        related = list(Course.objects.filter(Q(instructor=course.instructor) | Q(level=course.level))
+                       .exclude(id=course.id)[:limit])
+    return related
+
+
+async def arelated_courses(course, limit=3):
+    """related_courses() for async views."""
+    related = [related async for related in Course.objects.filter(
+        recommended_from__course=course, is_active=True).order_by('recommended_from__rank')[:limit]]
+    if not related:
+        related = [related async for related in Course.objects.filter(
+            Q(instructor=course.instructor_id) | Q(level=course.level)).exclude(id=course.id)[:limit]]
+    return related
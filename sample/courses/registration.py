@@ -0,0 +1,99 @@
+"""
+Registration cart: enroll a student in several courses at once.
+
+A whole cart is checked with a fixed number of queries whatever its size
+(the courses, their prerequisites, the student's enrollments, the seats
+taken and the waitlists), instead of enroll_course's handful of queries per course, and all
+enrollments are inserted in one transaction:
+- mode ALL_OR_NOTHING: any problem and nothing is enrolled;
+- mode BEST_EFFORT: the courses that pass are enrolled, the rest reported.
+
+Prerequisites count when completed ('CMP'). With
+REGISTRATION_CART_PREREQUISITES = True in settings (or cart_prerequisites=True)
+a prerequisite in the same cart counts too, e.g. MATH101 with MATH102.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Course, Enrollment, WaitlistEntry
+
+ALL_OR_NOTHING = 'all'
+BEST_EFFORT = 'best_effort'
+MODES = [ALL_OR_NOTHING, BEST_EFFORT]
+
+MAX_CART_SIZE = 10
+
+
+def check_cart(user, codes, cart_prerequisites=None, lock=False):
+    """
+    Check every course of a cart; returns (courses by code, {code: problem}).
+
+    Courses without a problem can be enrolled. Takes five queries; with lock
+    (inside a transaction) the courses' rows stay locked until it ends, on
+    databases that support SELECT ... FOR UPDATE.
+    """
+    if cart_prerequisites is None:
+        cart_prerequisites = getattr(settings, 'REGISTRATION_CART_PREREQUISITES', False)
+    queryset = Course.objects.select_for_update() if lock else Course.objects.all()
+    courses = {course.code: course for course in queryset.filter(code__in=codes).order_by('id')}
+    problems = {code: 'No such course' for code in codes if code not in courses}
+    course_ids = [course.id for course in courses.values()]
+
+    prerequisites = {}  # course id -> [(id, code) of its prerequisites]
+    through = Course.prerequisites.through.objects.filter(from_course_id__in=course_ids)
+    for course_id, prerequisite_id, prerequisite_code in through.values_list(
+            'from_course_id', 'to_course_id', 'to_course__code'):
+        prerequisites.setdefault(course_id, []).append((prerequisite_id, prerequisite_code))
+
+    statuses = dict(Enrollment.objects.filter(student=user).values_list('course_id', 'status'))
+    taken = dict(Enrollment.objects.filter(course_id__in=course_ids, status='ENR')
+                 .values('course_id').annotate(seats=Count('id')).values_list('course_id', 'seats'))
+    waitlisted = set(WaitlistEntry.objects.filter(course_id__in=course_ids)
+                     .order_by().values_list('course_id', flat=True).distinct())
+
+    for code, course in courses.items():
+        if course.id in statuses:
+            problems[code] = f'You are already enrolled in {course.title}'
+        elif taken.get(course.id, 0) >= course.max_students or course.id in waitlisted:
+            problems[code] = f'Sorry, {course.title} is already full'
+
+    # A course in the cart only satisfies a prerequisite if it is enrolled
+    # itself, so drop courses until nothing changes
+    changed = True
+    while changed:
+        changed = False
+        in_cart = {courses[code].id for code in courses if code not in problems} if cart_prerequisites else set()
+        for code, course in courses.items():
+            if code in problems:
+                continue
+            missing = [prerequisite_code for prerequisite_id, prerequisite_code in prerequisites.get(course.id, [])
+                       if statuses.get(prerequisite_id) != 'CMP' and prerequisite_id not in in_cart]
+            if missing:
+                problems[code] = f"You need to complete these prerequisites first: {', '.join(sorted(missing))}"
+                changed = True
+    return courses, problems
+
+
+def register_cart(user, codes, mode=ALL_OR_NOTHING, cart_prerequisites=None):
+    """
+    Enroll a user in a cart of course codes in one transaction.
+
+    Returns (enrolled codes, {code: problem}); with ALL_OR_NOTHING the first
+    is empty whenever there are problems.
+
+    Usage example:
+        enrolled, problems = register_cart(request.user, ['CS101', 'MATH101'], BEST_EFFORT)
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    codes = list(dict.fromkeys(codes))  # Keep the order, drop repeats
+    with transaction.atomic():
+        courses, problems = check_cart(user, codes, cart_prerequisites, lock=True)
+        if problems and mode == ALL_OR_NOTHING:
+            return [], problems
+        enrolled = [code for code in codes if code not in problems]
+        Enrollment.objects.bulk_create([Enrollment(student=user, course=courses[code], status='ENR')
+                                        for code in enrolled])
+    return enrolled, problems
@@ -0,0 +1,34 @@
+"""
+JSON renderer that uses orjson when it is installed.
+
+orjson serializes lists of dicts several times faster than json.dumps with
+DRF's encoder, and handles dates, datetimes and UUIDs natively. Output
+matches JSONRenderer's: compact, UTF-8, datetimes ending in 'Z', and U+2028/
+U+2029 escaped. Pretty-printed requests (?indent / the browsable API) and
+anything orjson cannot encode go through JSONRenderer unchanged.
+
+Enabled for the whole API in settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; JSONRenderer is used without it
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # default= handles what orjson does not know (Decimal, lazy strings, ...)
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z)
+        except TypeError:  # e.g. keys that are not strings
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -1,6 +1,35 @@
+from operator import itemgetter
+from django.db.models import Count, Q
 from rest_framework import serializers
 from .models import Course, Instructor, Enrollment
 
+def requested_fields(request, available):
+    """
+    Fields picked with ?fields=a,b or dropped with ?omit=a,b (sparse fieldsets),
+    in the serializer's order; all of them when neither is given.
+    """
+    if request is None:
+        params = {}
+    else:  # A DRF request, or a plain HttpRequest in the async views
+        params = getattr(request, 'query_params', request.GET)
+    picked = [name for name in params.get('fields', '').split(',') if name]
+    omitted = [name for name in params.get('omit', '').split(',') if name]
+    unknown = [name for name in picked + omitted if name not in available]
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+    return [name for name in available if (not picked or name in picked) and name not in omitted]
+
+class SparseFieldsetMixin:
+    """Serializer mixin honouring ?fields= / ?omit= on the request in its context."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None and ('fields' in request.query_params or 'omit' in request.query_params):
+            keep = set(requested_fields(request, list(self.fields)))
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
 class InstructorSerializer(serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
     
@@ -11,7 +40,7 @@ class InstructorSerializer(serializers.ModelSerializer):
     def get_name(self, obj):
         return f"{obj.user.first_name} {obj.user.last_name}"
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     instructor = InstructorSerializer(read_only=True)
     level_display = serializers.CharField(source='get_level_display', read_only=True)
     enrolled_students = serializers.SerializerMethodField()
@@ -23,6 +52,9 @@ class CourseSerializer(serializers.ModelSerializer):
                   'start_date', 'end_date', 'is_active']
     
     def get_enrolled_students(self, obj):
+        # Annotated by with_enrolled_count() in CourseViewSet's detail and featured views
+        if hasattr(obj, 'enrolled_count'):
+            return obj.enrolled_count
         return obj.enrollments.filter(status='ENR').count()
 
 class EnrollmentSerializer(serializers.ModelSerializer):
@@ -37,4 +69,63 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['student', 'enrollment_date']
     
     def get_student_name(self, obj):
-        return f"{obj.student.first_name} {obj.student.last_name}" if obj.student.first_name else obj.student.username
\ No newline at end of file
+        return f"{obj.student.first_name} {obj.student.last_name}" if obj.student.first_name else obj.student.username
+
+# Read-only fast path for course lists: the same output as CourseSerializer,
+# built from .values_list() rows without instantiating models or serializer
+# fields. Only the columns (and joins) of the requested fields are queried.
+LEVEL_DISPLAY = dict(Course.LEVEL_CHOICES)
+INSTRUCTOR_COLUMNS = ['instructor_id', 'instructor__user__first_name', 'instructor__user__last_name',
+                      'instructor__expertise', 'instructor__bio']
+
+def with_enrolled_count(queryset):
+    """Annotate each course's enrolled_count in the same query, instead of one COUNT per course."""
+    return queryset.annotate(enrolled_count=Count('enrollments', filter=Q(enrollments__status='ENR')))
+
+def _level_display(level):
+    return LEVEL_DISPLAY.get(level, level)
+
+def _instructor(values):
+    instructor_id, first_name, last_name, expertise, bio = values
+    if instructor_id is None:
+        return None
+    return {'id': instructor_id, 'name': f"{first_name} {last_name}", 'expertise': expertise, 'bio': bio}
+
+def course_rows(queryset, fields=None):
+    """
+    CourseSerializer(queryset, many=True).data as plain dicts, for any
+    subset of its fields.
+
+    Usage example:
+        Response(course_rows(Course.objects.filter(is_active=True), ['code', 'title']))
+    """
+    rows, getters = _course_columns(queryset, fields)
+    return [{name: get(row) for name, get in getters} for row in rows]
+
+async def acourse_rows(queryset, fields=None):
+    """course_rows() for async views."""
+    rows, getters = _course_columns(queryset, fields)
+    # Not rows.aiterator(): Django 5.2's values_list() iterable runs its query
+    # as soon as it is created, which aiterator() does in the event loop
+    return [{name: get(row) for name, get in getters} async for row in rows]
+
+def _course_columns(queryset, fields):
+    """The values_list() queryset behind course_rows(), and a getter per field."""
+    fields = fields or CourseSerializer.Meta.fields
+    columns, getters = [], []
+    for name in fields:
+        if name == 'instructor':
+            start = len(columns)
+            columns += INSTRUCTOR_COLUMNS
+            getters.append((name, lambda row, get=itemgetter(*range(start, start + 5)): _instructor(get(row))))
+        elif name == 'enrolled_students':
+            queryset = with_enrolled_count(queryset)
+            columns.append('enrolled_count')
+            getters.append((name, itemgetter(len(columns) - 1)))
+        elif name == 'level_display':
+            columns.append('level')
+            getters.append((name, lambda row, get=itemgetter(len(columns) - 1): _level_display(get(row))))
+        else:
+            columns.append(name)
+            getters.append((name, itemgetter(len(columns) - 1)))
+    return queryset.values_list(*columns), getters
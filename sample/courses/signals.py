@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Course, Enrollment, CourseTombstone, Instructor
+from .sync import purge_tombstones
+from .transcripts import invalidate_transcripts
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    """A grade (or status) changed: the student's cached transcript is stale."""
+    invalidate_transcripts([instance.student_id])
+
+
+@receiver(pre_save, sender=Course)
+def remember_old_credits(sender, instance, **kwargs):
+    if instance.pk:
+        instance._old_credits = Course.objects.filter(pk=instance.pk).values_list('credits', flat=True).first()
+
+
+@receiver(post_save, sender=Course)
+def course_credits_changed(sender, instance, created, **kwargs):
+    """Credits weight the GPA, so changing them invalidates every enrolled student."""
+    if not created and getattr(instance, '_old_credits', instance.credits) != instance.credits:
+        invalidate_transcripts(instance.enrollments.values_list('student_id', flat=True))
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    """A deleted enrollment leaves no last_activity behind; mark its course changed for the sync feed."""
+    Course.objects.filter(pk=instance.course_id).update(updated_at=timezone.now())
+
+
+# Fields of the instructor's user that the catalog shows (as the instructor's name)
+INSTRUCTOR_USER_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Instructor)
+def instructor_changed(sender, instance, created, **kwargs):
+    """Courses embed the instructor's expertise and bio; mark them changed for the sync feed."""
+    if not created:
+        Course.objects.filter(instructor=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+def instructor_user_changed(sender, instance, created, update_fields=None, **kwargs):
+    """Courses embed the instructor's name; saves that cannot change it (e.g. last_login) are skipped."""
+    if created or (update_fields is not None and not INSTRUCTOR_USER_FIELDS & set(update_fields)):
+        return
+    Course.objects.filter(instructor__user=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    """Leave a tombstone so syncing clients drop the course too."""
+    CourseTombstone.objects.create(course_id=instance.pk, code=instance.code)
+    purge_tombstones()
@@ -0,0 +1,89 @@
+"""
+Delta sync for clients that keep a local copy of the course catalog.
+
+GET /courses/api/courses/changes/?since=<watermark> returns only what
+changed after the watermark of the client's previous sync:
+- courses created or updated (Course.updated_at, which signals.py also
+  bumps when the instructor's name, expertise or bio changes), or whose
+  enrollments changed (Enrollment.last_activity), so seat counts stay current;
+- ids of courses that were deactivated, and of courses that were deleted
+  (from CourseTombstone, written by a post_delete signal);
+- the watermark to send next time.
+Without `since` (or with one older than the tombstones are kept) the
+response is a full snapshot with "reset": true.
+
+The returned watermark lags SYNC_OVERLAP behind the server clock, so rows
+saved by transactions that committed a little after their timestamp are
+sent again rather than missed; clients upsert by id, so repeats are harmless.
+
+The full list sends Last-Modified/ETag validators from catalog_last_modified(),
+so clients that refetch it get a 304 Not Modified when nothing changed.
+"""
+
+import asyncio
+from datetime import timedelta
+
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Course, CourseTombstone, Enrollment
+
+SYNC_OVERLAP = timedelta(seconds=5)
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+def catalog_last_modified():
+    """When the course list last changed (courses, deletions or enrollments); None if never."""
+    candidates = [
+        Course.objects.aggregate(last=Max('updated_at'))['last'],
+        CourseTombstone.objects.aggregate(last=Max('deleted_at'))['last'],
+        Enrollment.objects.aggregate(last=Max('last_activity'))['last'],
+    ]
+    candidates = [moment for moment in candidates if moment is not None]
+    return max(candidates) if candidates else None
+
+
+async def acatalog_last_modified():
+    """catalog_last_modified() for async views, with the three aggregates awaited together."""
+    candidates = await asyncio.gather(
+        Course.objects.aaggregate(last=Max('updated_at')),
+        CourseTombstone.objects.aaggregate(last=Max('deleted_at')),
+        Enrollment.objects.aaggregate(last=Max('last_activity')),
+    )
+    candidates = [row['last'] for row in candidates if row['last'] is not None]
+    return max(candidates) if candidates else None
+
+
+def catalog_changes(since=None, queryset=None):
+    """
+    Catalog changes after a watermark.
+
+    Returns {'watermark', 'reset', 'courses', 'deactivated', 'deleted'}
+    where 'courses' is a queryset of the active courses to upsert, and
+    'deactivated'/'deleted' are lists of course ids to remove.
+    """
+    watermark = timezone.now() - SYNC_OVERLAP
+    queryset = Course.objects.all() if queryset is None else queryset
+    if since is not None and timezone.is_naive(since):  # No UTC offset: the server's time zone
+        since = timezone.make_aware(since)
+    reset = since is None or since < timezone.now() - TOMBSTONE_RETENTION
+    if reset:
+        return {'watermark': watermark, 'reset': True, 'courses': queryset.filter(is_active=True),
+                'deactivated': [], 'deleted': []}
+
+    seats_changed = Enrollment.objects.filter(last_activity__gt=since).values('course_id')
+    changed = queryset.filter(Q(updated_at__gt=since) | Q(id__in=seats_changed))
+    return {
+        'watermark': watermark,
+        'reset': False,
+        'courses': changed.filter(is_active=True),
+        'deactivated': list(Course.objects.filter(updated_at__gt=since, is_active=False)
+                            .values_list('id', flat=True)),
+        'deleted': list(CourseTombstone.objects.filter(deleted_at__gt=since)
+                        .values_list('course_id', flat=True)),
+    }
+
+
+def purge_tombstones():
+    """Forget deletions older than TOMBSTONE_RETENTION; clients that old get a full snapshot."""
+    CourseTombstone.objects.filter(deleted_at__lt=timezone.now() - TOMBSTONE_RETENTION).delete()
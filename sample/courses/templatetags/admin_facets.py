@@ -0,0 +1,100 @@
+"""
+Date hierarchy for admin changelists from a cached aggregate.
+
+Django's date_hierarchy tag runs MIN/MAX and DISTINCT date queries over the
+whole table on every changelist page. cached_date_hierarchy computes the same
+links from one cached GROUP BY on the date field, as long as the only active
+filters are the date hierarchy's own; otherwise it falls back to Django's tag.
+"""
+
+from datetime import date
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+DATE_FACETS_CACHE_KEY = 'date_facets:{}:{}'
+DATE_FACETS_CACHE_TIMEOUT = 600
+
+
+def date_facets(model, field_name):
+    """Sorted list of (date, row count) for a DateField, cached."""
+    def load():
+        return list(model._default_manager.order_by(field_name)
+                    .values_list(field_name).annotate(rows=Count('pk')))
+    key = DATE_FACETS_CACHE_KEY.format(model._meta.label_lower, field_name)
+    return cache.get_or_set(key, load, DATE_FACETS_CACHE_TIMEOUT)
+
+
+def _unique(values):
+    seen = []
+    for value in values:
+        if not seen or seen[-1] != value:
+            seen.append(value)
+    return seen
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def cached_date_hierarchy(cl):
+    field_name = cl.date_hierarchy
+    year_field, month_field, day_field = (f'{field_name}__year', f'{field_name}__month', f'{field_name}__day')
+    # Any other filter, including list_filter ranges on the same field
+    # (e.g. enrollment_date__gte), changes the counts
+    other_filters = [key for key in cl.get_filters_params() if key not in (year_field, month_field, day_field)]
+    field = cl.model._meta.get_field(field_name) if '__' not in field_name else None
+    if other_filters or cl.query or field is None or field.get_internal_type() != 'DateField':
+        return date_hierarchy(cl)
+
+    year_lookup = cl.params.get(year_field)
+    month_lookup = cl.params.get(month_field)
+    day_lookup = cl.params.get(day_field)
+    if day_lookup:
+        return date_hierarchy(cl)  # A single day: nothing to aggregate
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field_name}__'])
+
+    dates = [day for day, _ in date_facets(cl.model, field_name)]
+    if not (year_lookup or month_lookup) and dates:
+        # Same starting level as Django's tag
+        if dates[0].year == dates[-1].year:
+            year_lookup = dates[0].year
+            if dates[0].month == dates[-1].month:
+                month_lookup = dates[0].month
+
+    if year_lookup and month_lookup:
+        year, month = int(year_lookup), int(month_lookup)
+        days = [day for day in dates if day.year == year and day.month == month]
+        return {
+            'show': True,
+            'back': {'link': link({year_field: year_lookup}), 'title': str(year_lookup)},
+            'choices': [
+                {'link': link({year_field: year_lookup, month_field: month_lookup, day_field: day.day}),
+                 'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))}
+                for day in days
+            ],
+        }
+    if year_lookup:
+        year = int(year_lookup)
+        months = _unique(date(day.year, day.month, 1) for day in dates if day.year == year)
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [
+                {'link': link({year_field: year_lookup, month_field: month.month}),
+                 'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT'))}
+                for month in months
+            ],
+        }
+    years = _unique(day.year for day in dates)
+    return {
+        'show': True,
+        'back': None,
+        'choices': [{'link': link({year_field: str(year)}), 'title': str(year)} for year in years],
+    }
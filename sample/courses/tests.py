@@ -1,3 +1,785 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core import mail
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from django.urls import reverse
+from django.utils import timezone
+
+from myproject import middleware
+
+from .bulk_grading import apply_grades, BulkGradeError
+from .renderers import FastJSONRenderer
+from .serializers import CourseSerializer, course_rows
+from .registration import check_cart, register_cart, BEST_EFFORT
+from .exports import ENROLLMENT_COLUMNS, export_stream
+from .models import Course, Enrollment, Instructor, WaitlistEntry, CourseRecommendation
+from . import recommendations
+from .recommendations import build_recommendations, co_enrollment_counts, related_courses
+from .transcripts import compute_transcripts, get_transcript
+from .waitlist import join_waitlist, promote_waitlists
+
+
+def make_course(code, credits, start_date):
+    return Course.objects.create(title=code, code=code, description='', credits=credits,
+                                 start_date=start_date, end_date=start_date)
+
+
+class TranscriptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        fall = date(2024, 9, 1)
+        spring = date(2025, 1, 15)
+        self.math = make_course('MATH101', 4, fall)
+        self.art = make_course('ART101', 2, fall)
+        self.cs = make_course('CS101', 3, spring)
+        Enrollment.objects.create(student=self.alice, course=self.math, status='CMP', grade='A')
+        Enrollment.objects.create(student=self.alice, course=self.art, status='CMP', grade='C')
+        Enrollment.objects.create(student=self.alice, course=self.cs, status='ENR', grade='IP')
+        Enrollment.objects.create(student=self.bob, course=self.cs, status='CMP', grade='B')
+
+    def test_term_and_cumulative_gpa_in_one_query(self):
+        with self.assertNumQueries(1):
+            transcripts = compute_transcripts([self.alice.id, self.bob.id])
+        alice = transcripts[self.alice.id]
+        self.assertEqual(alice['gpa'], 3.33)  # (4*4 + 2*2) / 6, IP not counted
+        self.assertEqual(alice['credits'], 6)
+        self.assertEqual([term['term'] for term in alice['terms']], ['Fall 2024'])
+        self.assertEqual(transcripts[self.bob.id]['gpa'], 3.0)
+
+    def test_cache_invalidated_on_grade_change(self):
+        self.assertEqual(get_transcript(self.alice.id)['gpa'], 3.33)
+        with self.assertNumQueries(0):
+            get_transcript(self.alice.id)
+
+        enrollment = Enrollment.objects.get(student=self.alice, course=self.cs)
+        enrollment.grade = 'A'
+        enrollment.save()
+        transcript = get_transcript(self.alice.id)
+        self.assertEqual(transcript['gpa'], 3.56)  # (16 + 4 + 12) / 9
+        self.assertEqual(transcript['terms'][-1]['cumulative_gpa'], 3.56)
+
+        self.math.credits = 1
+        self.math.save()
+        self.assertEqual(get_transcript(self.alice.id)['gpa'], 3.33)  # (4 + 4 + 12) / 6
+
+    def test_recompute_command_warms_cache(self):
+        call_command('recompute_gpas', chunk_size=1, stdout=StringIO())
+        with self.assertNumQueries(0):
+            self.assertEqual(get_transcript(self.bob.id)['gpa'], 3.0)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('root', password='x')
+        self.client.force_login(self.admin)
+        instructor = Instructor.objects.create(user=User.objects.create_user('prof'))
+        self.courses = [make_course(f'GEN{i}', 3, date(2024, 9, 1)) for i in range(3)]
+        Course.objects.update(instructor=instructor)
+
+    def generate(self, count):
+        """count students, each enrolled in one course on one of 90 days."""
+        start = User.objects.count()
+        users = User.objects.bulk_create([User(username=f'gen{i}') for i in range(start, start + count)])
+        Enrollment.objects.bulk_create([
+            Enrollment(student=user, course=self.courses[i % 3]) for i, user in enumerate(users)
+        ])
+        enrollments = list(Enrollment.objects.order_by('id'))
+        for i, enrollment in enumerate(enrollments):
+            enrollment.enrollment_date = date(2024, 8, 1) + timedelta(days=i % 90)
+        Enrollment.objects.bulk_update(enrollments, ['enrollment_date'])
+        # Drop the cached row counts and date facets, as their timeouts would
+        cache.delete_many(['row_count:courses.enrollment', 'date_facets:courses.enrollment:enrollment_date'])
+
+    def changelist(self, model, query=''):
+        url = reverse(f'admin:courses_{model}_changelist') + query
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in queries], response
+
+    def test_enrollment_changelist_query_count_is_constant(self):
+        self.changelist('enrollment')  # Resolve the session and roles first
+        self.generate(20)
+        few, _ = self.changelist('enrollment')
+        self.generate(200)
+        many, _ = self.changelist('enrollment')
+        self.assertEqual(len(few), len(many))
+
+    def test_cached_count_and_date_hierarchy(self):
+        self.generate(300)
+        self.changelist('enrollment')  # Fill the caches
+        queries, response = self.changelist('enrollment')
+        # Nothing over the whole table: no COUNT(*), MIN/MAX or date aggregates
+        self.assertFalse([sql for sql in queries if any(
+            word in sql for word in ('COUNT(', 'MIN(', 'GROUP BY', 'DISTINCT'))])
+        self.assertContains(response, 'enrollment_date__month=10')  # Months of 2024 from the cache
+        self.assertEqual(response.context['cl'].result_count, 300)
+        self.assertContains(response, 'August 2024')  # One year of data: the hierarchy starts at its months
+
+        # Filters fall back to exact counts
+        queries, response = self.changelist('enrollment', '?status__exact=ENR&enrollment_date__year=2024')
+        self.assertEqual(response.context['cl'].result_count, 300)
+
+        # So do list_filter ranges on the hierarchy's own field
+        queries, response = self.changelist('enrollment', '?enrollment_date__gte=2024-10-01')
+        self.assertEqual(response.context['cl'].result_count, 29 * 3)  # The last 29 of the 90 days
+        self.assertNotContains(response, 'August 2024')
+
+    def test_search_is_a_case_insensitive_prefix_match(self):
+        self.generate(30)
+        Course.objects.filter(code='GEN1').update(code='CS101', title='Algebra Basics')
+        for query, count in [('?q=cs101', 10), ('?q=CS1', 10),  # Course code
+                             ('?q=alg', 10), ('?q="ALGEBRA+basics"', 10),  # Course title
+                             ('?q=gebra', 0),  # Prefixes only
+                             ('?q=GEN7', 1)]:  # Username
+            _, response = self.changelist('enrollment', query)
+            self.assertEqual(response.context['cl'].result_count, count, query)
+        _, response = self.changelist('waitlistentry', '?q=cs101')
+        self.assertEqual(response.status_code, 200)
+
+    def test_search_matches_part_of_a_student_name(self):
+        self.generate(3)
+        User.objects.filter(username='gen3').update(first_name='Grace', last_name='Hopper')
+        for query in ('?q=Hop', '?q=gra', '?q=grace+HOPPER'):
+            _, response = self.changelist('enrollment', query)
+            self.assertEqual([e.student.username for e in response.context['cl'].result_list], ['gen3'])
+
+    def test_search_lookups_use_the_upper_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plans are checked on SQLite')
+        for queryset, index in [(Course.objects.filter(title__iprefix='alg'), 'courses_course_upper_title_idx'),
+                                (Course.objects.filter(code__iprefix='cs1'), 'courses_course_upper_code_idx'),
+                                (User.objects.filter(last_name__iprefix='hop'), 'courses_user_upper_last_name_idx'),
+                                (User.objects.filter(username__iprefix='gen'), 'courses_user_upper_username_idx')]:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                self.assertIn(f'USING INDEX {index}', ' '.join(row[-1] for row in cursor.fetchall()))
+
+    def test_course_and_instructor_changelists_join_related_rows(self):
+        self.changelist('course')  # Resolve the session and roles first
+        course_queries, _ = self.changelist('course')
+        make_course('GEN9', 3, date(2025, 1, 1))
+        self.changelist('instructor')  # And cache the instructor row count
+        instructor_queries, _ = self.changelist('instructor')
+        Instructor.objects.create(user=User.objects.create_user('prof2'))
+        self.assertEqual(len(self.changelist('course')[0]), len(course_queries))
+        self.assertEqual(len(self.changelist('instructor')[0]), len(instructor_queries))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_superuser('registrar', password='x')
+        self.alice = User.objects.create_user('alice', first_name='Alice')
+        self.bob = User.objects.create_user('bob')
+        self.math = make_course('MATH101', 4, date(2024, 9, 1))
+        self.art = make_course('ART101', 2, date(2024, 9, 1))
+        Enrollment.objects.create(student=self.alice, course=self.math, status='CMP', grade='A')
+        Enrollment.objects.create(student=self.alice, course=self.art)
+        Enrollment.objects.create(student=self.bob, course=self.math)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content)
+        if response['Content-Type'] == 'application/gzip':
+            content = gzip.decompress(content)
+        return content.decode('utf-8')
+
+    def test_stream_reads_rows_in_chunks_with_one_query(self):
+        with self.assertNumQueries(1):
+            pieces = list(export_stream(Enrollment.objects.all(), ENROLLMENT_COLUMNS, chunk_size=2))
+        rows = list(csv.reader(b''.join(pieces).decode('utf-8').splitlines()))
+        self.assertEqual(len(pieces), 2)  # Header + first chunk, then the second chunk
+        self.assertEqual(rows[0], [header for header, _ in ENROLLMENT_COLUMNS])
+        self.assertEqual(rows[1][1:], ['alice', 'Alice', '', 'MATH101', 'MATH101', str(date.today()), 'CMP', 'A'])
+        self.assertEqual(len(rows), 4)
+
+    def test_admin_action_exports_selected_rows(self):
+        self.client.force_login(self.staff)
+        selected = Enrollment.objects.filter(student=self.alice).values_list('pk', flat=True)
+        response = self.client.post(reverse('admin:courses_enrollment_changelist'), {
+            'action': 'export_csv_gz', '_selected_action': list(selected),
+        })
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="enrollments.csv.gz"')
+        rows = list(csv.DictReader(self.read(response).splitlines()))
+        self.assertEqual({row['course_code'] for row in rows}, {'MATH101', 'ART101'})
+        self.assertEqual({row['username'] for row in rows}, {'alice'})
+
+    def test_api_export(self):
+        url = reverse('courses:enrollment-export')
+        self.client.force_login(self.bob)
+        lines = self.read(self.client.get(url, {'type': 'jsonl'})).splitlines()
+        self.assertEqual([json.loads(line)['course_code'] for line in lines], ['MATH101'])
+
+        self.client.force_login(self.staff)
+        self.assertEqual(len(self.read(self.client.get(url, {'gzip': '1'})).splitlines()), 4)
+        self.assertEqual(self.client.get(url, {'type': 'xml'}).status_code, 400)
+
+        courses = self.read(self.client.get(reverse('courses:course-export'), {'level': 'BEG'}))
+        self.assertEqual([row['code'] for row in csv.DictReader(courses.splitlines())], ['MATH101', 'ART101'])
+
+
+class BulkGradingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.prof = User.objects.create_user('prof')
+        self.course = make_course('CS101', 3, date(2024, 9, 1))
+        self.course.instructor = Instructor.objects.create(user=self.prof)
+        self.course.save()
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        Enrollment.objects.create(student=self.alice, course=self.course)
+        Enrollment.objects.create(student=self.bob, course=self.course)
+        self.url = reverse('courses:course-grades', args=[self.course.pk])
+
+    def grade(self, updates, user=None):
+        self.client.force_login(user or self.prof)
+        return self.client.post(self.url, updates, content_type='application/json')
+
+    def test_grades_applied_and_transcripts_invalidated(self):
+        self.assertIsNone(get_transcript(self.alice.id)['gpa'])
+        response = self.grade([{'username': 'alice', 'status': 'CMP', 'grade': 'B'},
+                               {'student': self.bob.id, 'status': 'DRP', 'grade': 'W'}])
+        self.assertEqual(response.json(), {'updated': 2})
+        self.assertEqual(get_transcript(self.alice.id)['gpa'], 3.0)
+        self.assertEqual(set(Enrollment.objects.values_list('status', 'grade')), {('CMP', 'B'), ('DRP', 'W')})
+
+    def test_invalid_updates_save_nothing(self):
+        response = self.grade([{'username': 'alice', 'grade': 'A'},
+                               {'username': 'alice', 'grade': 'B'},
+                               {'username': 'bob', 'status': 'XXX'},
+                               {'username': 'carol', 'grade': 'A'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1, 2, 3])
+        self.assertFalse(Enrollment.objects.exclude(grade=None).exists())
+
+    def test_values_of_the_wrong_type_are_reported(self):
+        response = self.grade([{'student': [self.alice.id], 'grade': 'A'},
+                               {'username': {'name': 'bob'}},
+                               {'username': 'alice', 'status': ['CMP']},
+                               {'username': 'bob', 'grade': {'A': 1}},
+                               {'student': True}])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [0, 1, 2, 3, 4])
+        self.assertIn('student must be an id', errors[0]['error'])
+        self.assertIn('status must be one of', errors[2]['error'])
+        self.assertIn('grade must be one of', errors[3]['error'])
+        self.assertFalse(Enrollment.objects.exclude(grade=None).exists())
+
+    def test_only_instructor_or_staff(self):
+        self.assertEqual(self.grade([], user=self.alice).status_code, 403)
+        self.assertEqual(self.grade({'username': 'alice'}).status_code, 400)
+
+    def test_ten_thousand_updates(self):
+        users = User.objects.bulk_create([User(username=f'gen{i}') for i in range(10000)])
+        Enrollment.objects.bulk_create([Enrollment(student=user, course=self.course) for user in users])
+        updates = [{'student': user.id, 'status': 'CMP', 'grade': 'ABCDF'[i % 5]} for i, user in enumerate(users)]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(apply_grades(self.course, updates), 10000)
+        self.assertEqual(len(queries), 1 + 5 * 4 + 2)  # Read, 5 grades x 4 batches, savepoint
+        self.assertEqual(Enrollment.objects.filter(grade='F').count(), 2000)
+        with self.assertRaises(BulkGradeError):
+            apply_grades(self.course, updates + [{'student': self.alice.id, 'grade': 'Z'}])
+
+
+class RegistrationCartTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice')
+        self.basics = make_course('CS100', 3, date(2024, 9, 1))
+        self.intro = make_course('CS101', 3, date(2025, 1, 15))
+        self.data = make_course('CS201', 3, date(2025, 1, 15))
+        self.full = make_course('ART101', 3, date(2025, 1, 15))
+        self.intro.prerequisites.add(self.basics)
+        self.data.prerequisites.add(self.intro)
+        self.full.max_students = 1
+        self.full.save()
+        Enrollment.objects.create(student=User.objects.create_user('bob'), course=self.full)
+
+    def test_constant_number_of_queries(self):
+        with self.assertNumQueries(5):
+            check_cart(self.alice, ['CS100'])
+        with self.assertNumQueries(5):
+            check_cart(self.alice, ['CS100', 'CS101', 'CS201', 'ART101', 'NOPE'])
+
+    def test_all_or_nothing(self):
+        enrolled, problems = register_cart(self.alice, ['CS100', 'ART101', 'NOPE'])
+        self.assertEqual(enrolled, [])
+        self.assertEqual(set(problems), {'ART101', 'NOPE'})
+        self.assertFalse(Enrollment.objects.filter(student=self.alice).exists())
+
+    def test_best_effort_and_cart_prerequisites(self):
+        codes = ['CS100', 'CS101', 'CS201', 'ART101']
+        _, problems = check_cart(self.alice, codes)
+        self.assertEqual(set(problems), {'CS101', 'CS201', 'ART101'})
+
+        # CS201 needs CS101, which is only satisfied through the cart
+        with self.settings(REGISTRATION_CART_PREREQUISITES=True):
+            enrolled, problems = register_cart(self.alice, codes, BEST_EFFORT)
+        self.assertEqual(enrolled, ['CS100', 'CS101', 'CS201'])
+        self.assertEqual(list(problems), ['ART101'])
+        self.assertEqual(Enrollment.objects.filter(student=self.alice, status='ENR').count(), 3)
+
+    def test_prerequisite_dropped_from_cart_fails_dependents(self):
+        Enrollment.objects.create(student=self.alice, course=self.basics, status='DRP')
+        enrolled, problems = register_cart(self.alice, ['CS100', 'CS101'], BEST_EFFORT, cart_prerequisites=True)
+        self.assertEqual(enrolled, [])
+        self.assertIn('CS100', problems['CS101'])
+
+    def test_api(self):
+        self.client.force_login(self.alice)
+        url = reverse('courses:enrollment-register')
+        response = self.client.post(url, {'courses': ['CS100', 'CS101']}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['enrolled'], [])
+        response = self.client.post(url, {'courses': ['CS100', 'CS101'], 'mode': 'best_effort'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['enrolled'], ['CS100'])
+        self.assertEqual(self.client.post(url, {'courses': 'CS100'}, content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post(url, ['CS100'], content_type='application/json').status_code, 400)
+
+
+def make_waitlisted_course(seats, waiting):
+    """A full course with `seats` enrolled students and `waiting` waitlisted ones."""
+    course = make_course('CS101', 3, date(2025, 1, 15))
+    course.max_students = seats
+    course.save()
+    users = User.objects.bulk_create([User(username=f'student{i}', email=f'student{i}@example.edu')
+                                      for i in range(seats + waiting)])
+    Enrollment.objects.bulk_create([Enrollment(student=user, course=course) for user in users[:seats]])
+    WaitlistEntry.objects.bulk_create([WaitlistEntry(student=user, course=course, position=i + 1)
+                                       for i, user in enumerate(users[seats:])])
+    return course, users[:seats], users[seats:]
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.course, self.enrolled, self.waiting = make_waitlisted_course(2, 3)
+
+    def test_enroll_course_joins_waitlist_when_full(self):
+        carol = User.objects.create_user('carol')
+        self.client.force_login(carol)
+        self.client.post(reverse('courses:enroll_course', args=['CS101']))
+        self.assertEqual(join_waitlist(carol, self.course), 4)  # Already waiting: same place
+        self.assertEqual(WaitlistEntry.objects.get(student=carol).position, 4)
+        self.assertFalse(Enrollment.objects.filter(student=carol).exists())
+
+    def test_promotion_in_position_order(self):
+        self.assertEqual(promote_waitlists(), [])
+        Enrollment.objects.filter(student__in=self.enrolled).update(status='DRP')
+        # Savepoint, courses, seats, prerequisites, head, enrolled, delete, insert, release
+        with self.assertNumQueries(9):
+            promoted = promote_waitlists()
+        self.assertEqual([enrollment.student for enrollment in promoted], self.waiting[:2])
+        self.assertEqual(list(WaitlistEntry.objects.values_list('student', flat=True)), [self.waiting[2].id])
+        self.assertEqual([message.to for message in mail.outbox], [[user.email] for user in self.waiting[:2]])
+
+    def test_prerequisites_before_waitlist_and_promotion(self):
+        intro = make_course('CS100', 3, date(2024, 9, 1))
+        self.course.prerequisites.add(intro)
+        carol = User.objects.create_user('carol')
+        self.client.force_login(carol)
+        self.client.post(reverse('courses:enroll_course', args=['CS101']))
+        self.assertFalse(WaitlistEntry.objects.filter(student=carol).exists())
+
+        # Waiting students who have not completed CS100 are passed over and leave the waitlist
+        Enrollment.objects.create(student=self.waiting[1], course=intro, status='CMP')
+        Enrollment.objects.filter(student=self.enrolled[0]).update(status='DRP')
+        self.assertEqual([enrollment.student for enrollment in promote_waitlists()], [self.waiting[1]])
+        self.assertEqual(list(WaitlistEntry.objects.values_list('student', flat=True)), [self.waiting[2].id])
+
+    def test_inactive_courses_are_not_promoted(self):
+        Course.objects.filter(pk=self.course.pk).update(is_active=False)
+        Enrollment.objects.filter(student__in=self.enrolled).update(status='DRP')
+        self.assertEqual(promote_waitlists(), [])
+        self.assertEqual(WaitlistEntry.objects.count(), 3)
+
+    def test_cart_does_not_jump_the_waitlist(self):
+        Enrollment.objects.filter(student=self.enrolled[0]).update(status='DRP')
+        enrolled, problems = register_cart(User.objects.create_user('carol'), ['CS101'])
+        self.assertIn('CS101', problems)
+        self.assertEqual(len(promote_waitlists()), 1)
+
+
+class WaitlistConcurrencyTests(TransactionTestCase):
+    def run_threads(self, targets):
+        def run(target):
+            try:
+                for _ in range(50):  # SQLite's shared in-memory test database raises instead of waiting
+                    try:
+                        return target()
+                    except OperationalError:
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+        threads = [threading.Thread(target=run, args=[target]) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_drops_joins_and_promotions(self):
+        course, enrolled, waiting = make_waitlisted_course(10, 20)
+        late = User.objects.bulk_create([User(username=f'late{i}') for i in range(5)])
+        promoted = []
+
+        def drop(user):
+            return lambda: Enrollment.objects.filter(student=user, course=course).update(status='DRP')
+
+        def promote():
+            promoted.extend(promote_waitlists(batch_size=3))
+
+        self.run_threads([drop(user) for user in enrolled[:8]] +
+                         [lambda user=user: join_waitlist(user, course) for user in late] +
+                         [promote] * 4)
+        promote()  # The worker's next round picks up whatever the threads left over
+        promote()
+        promote()
+
+        self.assertEqual(Enrollment.objects.filter(course=course, status='ENR').count(), 10)
+        promoted_ids = set(Enrollment.objects.filter(course=course, student__in=waiting + late)
+                           .values_list('student_id', flat=True))
+        self.assertEqual(promoted_ids, {user.id for user in waiting[:8]})  # First come, first served
+        self.assertEqual(len(promoted), 8)
+        positions = list(WaitlistEntry.objects.filter(course=course).values_list('position', flat=True))
+        self.assertEqual(len(positions), 17)
+        self.assertEqual(len(set(positions)), 17)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.courses = {code: make_course(code, 3, date(2025, 1, 15))
+                        for code in ['MATH101', 'MATH102', 'PHYS101', 'ART101', 'MUS101']}
+        Course.objects.update(instructor=Instructor.objects.create(user=User.objects.create_user('prof')))
+        # Math students take physics too; art students take music
+        for i in range(6):
+            self.enroll(f'sci{i}', ['MATH101', 'MATH102', 'PHYS101'] if i < 4 else ['MATH101', 'PHYS101'])
+        for i in range(3):
+            self.enroll(f'art{i}', ['ART101', 'MUS101'])
+        self.enroll('mixed', ['MATH101', 'ART101'])
+
+    def enroll(self, username, codes):
+        user = User.objects.create_user(username)
+        Enrollment.objects.bulk_create([Enrollment(student=user, course=self.courses[code], status='CMP')
+                                        for code in codes])
+
+    def related(self, code):
+        return [course.code for course in related_courses(self.courses[code])]
+
+    def test_numpy_and_python_counts_agree(self):
+        students, courses = zip(*Enrollment.objects.values_list('student_id', 'course_id'))
+        counts = co_enrollment_counts(students, courses)
+        math, phys = self.courses['MATH101'].id, self.courses['PHYS101'].id
+        self.assertEqual(counts[math, phys], 6)
+        self.assertEqual(counts[phys, math], 6)
+        self.assertNotIn((math, math), counts)
+        numpy, recommendations.np = recommendations.np, None
+        try:
+            self.assertEqual(co_enrollment_counts(students, courses), counts)
+        finally:
+            recommendations.np = numpy
+        original = recommendations.PAIRS_PER_CHUNK
+        recommendations.PAIRS_PER_CHUNK = 5  # One student per chunk
+        try:
+            self.assertEqual(co_enrollment_counts(students, courses), counts)
+        finally:
+            recommendations.PAIRS_PER_CHUNK = original
+
+    def test_related_courses_from_co_enrollments(self):
+        build_recommendations()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.related('MATH101'), ['PHYS101', 'MATH102'])  # MATH-ART: one student only
+        self.assertEqual(self.related('MUS101'), ['ART101'])
+        response = self.client.get(reverse('courses:course_detail', args=['MATH102']))
+        self.assertEqual([course.code for course in response.context['related_courses']], ['PHYS101', 'MATH101'])
+
+    def test_incremental_build(self):
+        build_recommendations()
+        for i in range(3):
+            self.enroll(f'late{i}', ['ART101', 'MATH102'])
+        build = build_recommendations()
+        self.assertFalse(build.full)
+        self.assertEqual(build.courses_refreshed, 2)
+        self.assertEqual(self.related('ART101'), ['MUS101', 'MATH102'])
+        self.assertEqual(self.related('MUS101'), ['ART101'])  # Untouched
+        self.assertEqual(build_recommendations().courses_refreshed, 0)
+        full = build_recommendations(full=True)
+        self.assertEqual(CourseRecommendation.objects.count(), 10)
+        self.assertEqual(full.courses_refreshed, 5)
+
+
+class CatalogSyncTests(TestCase):
+    def setUp(self):
+        self.math = make_course('MATH101', 4, date(2025, 1, 15))
+        self.art = make_course('ART101', 2, date(2025, 1, 15))
+        self.music = make_course('MUS101', 2, date(2025, 1, 15))
+        # Everything was last changed an hour ago
+        self.hour_ago = timezone.now() - timedelta(hours=1)
+        Course.objects.update(updated_at=self.hour_ago)
+        self.url = reverse('courses:course-changes')
+
+    def changes(self, since=None):
+        response = self.client.get(self.url, {'since': since.isoformat()} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_snapshot_then_deltas(self):
+        snapshot = self.changes()
+        self.assertTrue(snapshot['reset'])
+        self.assertEqual(len(snapshot['courses']), 3)
+
+        since = self.hour_ago + timedelta(minutes=1)
+        self.assertEqual(self.changes(since)['courses'], [])
+        self.math.title = 'Calculus'
+        self.math.save()
+        self.art.is_active = False
+        self.art.save()
+        music_id = self.music.id
+        self.music.delete()
+        changes = self.changes(since)
+        self.assertFalse(changes['reset'])
+        self.assertEqual([course['title'] for course in changes['courses']], ['Calculus'])
+        self.assertEqual(changes['deactivated'], [self.art.id])
+        self.assertEqual(changes['deleted'], [music_id])
+
+    def test_seat_changes_are_synced(self):
+        enrollment = Enrollment.objects.create(student=User.objects.create_user('alice'), course=self.math)
+        since = timezone.now()
+        Enrollment.objects.filter(pk=enrollment.pk).update(last_activity=self.hour_ago)
+        self.assertEqual(self.changes(self.hour_ago + timedelta(minutes=1))['courses'], [])
+        enrollment.delete()
+        changes = self.changes(since - timedelta(seconds=1))
+        self.assertEqual([(course['code'], course['enrolled_students']) for course in changes['courses']],
+                         [('MATH101', 0)])
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        # Without a UTC offset the watermark is taken as server time (UTC)
+        naive = (timezone.now() + timedelta(minutes=1)).strftime('%Y-%m-%dT%H:%M:%S')
+        response = self.client.get(self.url, {'since': naive})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['reset'])
+        self.assertEqual(response.json()['courses'], [])
+
+    def test_conditional_get_on_full_list(self):
+        url = reverse('courses:course-list')
+        with self.assertNumQueries(4):  # Three validators, one list query
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()), 3)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.math.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_instructor_changes_are_synced(self):
+        url = reverse('courses:course-list')
+        prof = User.objects.create_user('prof', first_name='Ada', last_name='Lovelace')
+        instructor = Instructor.objects.create(user=prof)
+        Course.objects.filter(pk=self.math.pk).update(instructor=instructor, updated_at=self.hour_ago)
+        since = self.hour_ago + timedelta(minutes=1)
+        etag = self.client.get(url)['ETag']
+        prof.last_login = timezone.now()
+        prof.save(update_fields=['last_login'])  # Not shown in the catalog
+        self.assertEqual(self.changes(since)['courses'], [])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        instructor.bio = 'Analyst'
+        instructor.save()
+        [course] = self.changes(since)['courses']
+        self.assertEqual(course['instructor']['bio'], 'Analyst')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        since = timezone.now()
+        prof.last_name = 'King'
+        prof.save()
+        [course] = self.changes(since - timedelta(seconds=1))['courses']
+        self.assertEqual(course['instructor']['name'], 'Ada King')
+
+
+class CourseApiFastPathTests(TestCase):
+    def setUp(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user('prof', first_name='Ada',
+                                                                           last_name='Lovelace'))
+        self.math = make_course('MATH101', 4, date(2025, 1, 15))
+        self.math.instructor = instructor
+        self.math.level = 'ADV'
+        self.math.save()
+        self.art = make_course('ART101', 2, date(2025, 1, 15))
+        Enrollment.objects.create(student=User.objects.create_user('alice'), course=self.math)
+        self.url = reverse('courses:course-list')
+
+    def render(self, data, renderer=JSONRenderer):
+        return renderer().render(data)
+
+    def test_rows_match_serializer(self):
+        courses = Course.objects.order_by('code')
+        self.assertEqual(self.render(course_rows(courses)), self.render(CourseSerializer(courses, many=True).data))
+        with self.assertNumQueries(1):
+            rows = course_rows(courses)
+        self.assertEqual(rows[1]['instructor']['name'], 'Ada Lovelace')
+        self.assertEqual(rows[1]['enrolled_students'], 1)
+        self.assertIsNone(rows[0]['instructor'])
+
+    def test_detail_and_featured_count_seats_in_one_query(self):
+        Enrollment.objects.create(student=User.objects.create_user('bob'), course=self.math, status='DRP')
+        with self.assertNumQueries(1):
+            detail = self.client.get(reverse('courses:course-detail', args=[self.math.pk])).json()
+        self.assertEqual((detail['enrolled_students'], detail['instructor']['name']), (1, 'Ada Lovelace'))
+        make_course('BIO101', 3, date(2025, 1, 15))
+        with self.assertNumQueries(1):
+            featured = self.client.get(reverse('courses:course-featured')).json()
+        self.assertEqual(featured[0]['code'], 'MATH101')  # Two enrollments, one of them dropped
+        self.assertEqual([course['enrolled_students'] for course in featured], [1, 0, 0])
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get(self.url, {'fields': 'code,title'})
+        self.assertEqual(response.json(), [{'title': 'ART101', 'code': 'ART101'},
+                                           {'title': 'MATH101', 'code': 'MATH101'}])
+        response = self.client.get(self.url, {'omit': 'description,instructor'})
+        self.assertNotIn('instructor', response.json()[0])
+        self.assertIn('level_display', response.json()[0])
+        self.assertEqual(self.client.get(self.url, {'fields': 'code,secret'}).status_code, 400)
+        detail = self.client.get(reverse('courses:course-detail', args=[self.math.pk]), {'fields': 'code,credits'})
+        self.assertEqual(detail.json(), {'code': 'MATH101', 'credits': 4})
+
+    def test_orjson_renderer_matches_json_renderer(self):
+        data = [{'date': date(2025, 1, 15), 'when': datetime(2025, 1, 15, 9, 30, 0, 5, tzinfo=dt_timezone.utc),
+                 'price': Decimal('1.50'), 'text': 'caf\u00e9 \u2028', 'none': None, 'nested': {'list': [1, 2.5]}}]
+        self.assertEqual(self.render(data, FastJSONRenderer), self.render(data))
+        self.assertEqual(self.client.get(self.url, {'fields': 'start_date'}).content,
+                         b'[{"start_date":"2025-01-15"},{"start_date":"2025-01-15"}]')
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        for i in range(30):
+            make_course(f'COMP{i:03d}', 3, date(2025, 1, 15))
+        self.url = reverse('courses:course-list')
+
+    def test_negotiation(self):
+        with mock.patch.object(middleware, 'brotli', None):
+            self.assertEqual(middleware.choose_encoding('gzip, deflate, br'), 'gzip')
+            self.assertIsNone(middleware.choose_encoding('gzip;q=0, identity'))
+            self.assertIsNone(middleware.choose_encoding(''))
+            self.assertEqual(middleware.choose_encoding('*'), 'gzip')
+        with mock.patch.object(middleware, 'brotli', object()):
+            self.assertEqual(middleware.choose_encoding('gzip, br'), 'br')
+            self.assertEqual(middleware.choose_encoding('gzip;q=1.0, br;q=0.5'), 'gzip')
+            self.assertEqual(middleware.choose_encoding('gzip, br;q=0'), 'gzip')
+            self.assertEqual(middleware.choose_encoding('gzip, br', allow_brotli=False), 'gzip')
+            # HTML is never br, which cannot be padded
+            Course.objects.update(instructor=Instructor.objects.create(user=User.objects.create_user('prof')))
+            page = self.client.get(reverse('courses:course_detail', args=['COMP000']), HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(page['Content-Encoding'], 'gzip')
+
+    def test_api_json_is_gzipped(self):
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content) / 4)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        # A strong ETag becomes weak; it still validates either representation
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'],
+                                         HTTP_ACCEPT_ENCODING='gzip').status_code, 304)
+
+    def test_small_and_declined_responses_are_plain(self):
+        small = self.client.get(self.url, {'fields': 'code', 'level': 'ADV'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+        declined = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', declined)
+        with self.settings(COMPRESSION_MIN_SIZE=100_000):
+            # Settings are read when the middleware is loaded, so a new client
+            self.assertNotIn('Content-Encoding', self.client_class().get(self.url, HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_exports_are_streamed_compressed_once(self):
+        url = reverse('courses:course-export')
+        self.client.force_login(User.objects.create_superuser('registrar', password='x'))
+        plain = b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        chunks = list(response.streaming_content)
+        self.assertEqual(gzip.decompress(b''.join(chunks)), plain)
+        self.assertEqual(chunks[0][3], gzip.FNAME)  # Padded like one-shot responses
+        # Every chunk is flushed, so what has arrived so far decompresses in full
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual(b''.join(decompressor.decompress(chunk) for chunk in chunks[:-1]), plain)
+        # Already gzipped by the export itself
+        response = self.client.get(url, {'gzip': '1'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+
+class AsyncCatalogTests(TestCase):
+    def setUp(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user('prof', first_name='Ada',
+                                                                           last_name='Lovelace'))
+        self.math = make_course('MATH101', 4, date(2025, 1, 15))
+        self.calc = make_course('MATH201', 4, date(2025, 1, 15))
+        self.art = make_course('ART101', 2, date(2025, 1, 15))
+        Course.objects.update(instructor=instructor)
+        self.calc.prerequisites.add(self.math)
+        self.alice = User.objects.create_user('alice', first_name='Alice')
+        Enrollment.objects.create(student=self.alice, course=self.calc)
+        Enrollment.objects.create(student=User.objects.create_user('bob'), course=self.calc)
+
+    def test_pages(self):
+        response = self.client.get(reverse('courses:course_list'), {'q': 'MATH'})
+        self.assertEqual([course.code for course in response.context['courses']], ['MATH101', 'MATH201'])
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('courses:course_detail', args=['MATH201']))
+        self.assertTrue(response.context['is_enrolled'])
+        self.assertEqual(response.context['prerequisites'], [self.math])
+        self.assertEqual(response.context['enrolled_count'], 2)
+        self.assertContains(response, 'Welcome, Alice')
+        self.assertEqual(self.client.get(reverse('courses:course_detail', args=['NOPE'])).status_code, 404)
+
+    async def test_detail_page_through_async_client(self):
+        response = await self.async_client.get(reverse('courses:course_detail', args=['MATH101']))
+        self.assertFalse(response.context['is_enrolled'])
+        self.assertContains(response, 'Ada Lovelace')
+
+    def test_api_matches_sync_api(self):
+        for query in [{}, {'q': 'math'}, {'level': 'BEG', 'fields': 'code,title'}]:
+            self.assertEqual(self.client.get(reverse('courses:async_course_list'), query).json(),
+                             self.client.get(reverse('courses:course-list'), query).json())
+        self.assertEqual(self.client.get(reverse('courses:async_course_detail', args=[self.calc.pk])).json(),
+                         self.client.get(reverse('courses:course-detail', args=[self.calc.pk])).json())
+        featured = self.client.get(reverse('courses:async_course_featured'), {'fields': 'code'}).json()
+        self.assertEqual(featured[0], {'code': 'MATH201'})
+        self.assertEqual(len(featured), 3)
+
+        search = self.client.get(reverse('courses:async_course_search'), {'q': 'math', 'limit': 1}).json()
+        self.assertEqual(search['count'], 2)
+        self.assertEqual(len(search['results']), 1)
+        self.assertEqual(self.client.get(reverse('courses:async_course_list'), {'fields': 'secret'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('courses:async_course_detail', args=[0])).status_code, 404)
+
+    def test_conditional_get(self):
+        url = reverse('courses:async_course_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.art.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,116 @@
+"""
+GPA and transcript service.
+
+Term and cumulative GPAs are computed in the database with one aggregate
+query for any number of students: each graded enrollment is turned into grade
+points with Case/When, weighted by the course credits, and summed per student
+and term. Terms come from the course start date (Spring: Jan-May,
+Summer: Jun-Aug, Fall: Sep-Dec).
+
+Results are cached per student and invalidated by the signals in
+courses/signals.py whenever an enrollment (or a course's credits) changes.
+"""
+
+from django.core.cache import cache
+from django.db.models import Case, When, Value, F, Sum, FloatField, IntegerField
+from django.db.models.functions import ExtractYear
+
+from .models import Enrollment
+
+# Grades that count towards the GPA; I, W and IP are left out
+GRADE_POINTS = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
+
+SEMESTERS = {1: 'Spring', 2: 'Summer', 3: 'Fall'}
+
+CACHE_KEY = 'transcript:{}'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def grade_points():
+    """Expression mapping Enrollment.grade to grade points."""
+    return Case(
+        *[When(grade=grade, then=Value(points)) for grade, points in GRADE_POINTS.items()],
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def semester():
+    """Expression numbering the semester of the course start date (1, 2 or 3)."""
+    return Case(
+        When(course__start_date__month__lte=5, then=Value(1)),
+        When(course__start_date__month__lte=8, then=Value(2)),
+        default=Value(3),
+        output_field=IntegerField(),
+    )
+
+
+def _empty_transcript():
+    return {'gpa': None, 'credits': 0, 'quality_points': 0.0, 'terms': []}
+
+
+def compute_transcripts(student_ids):
+    """
+    Compute term and cumulative GPA for many students with a single query.
+
+    Returns {student_id: {'gpa', 'credits', 'quality_points', 'terms'}} where
+    'terms' is a chronological list of {'term', 'gpa', 'credits',
+    'cumulative_gpa'}. Students without graded courses get gpa None.
+    """
+    student_ids = list(student_ids)
+    transcripts = {student_id: _empty_transcript() for student_id in student_ids}
+    if not student_ids:
+        return transcripts
+
+    rows = (
+        Enrollment.objects
+        .filter(student_id__in=student_ids, grade__in=GRADE_POINTS)
+        .values('student_id', year=ExtractYear('course__start_date'), semester=semester())
+        .annotate(
+            credits=Sum('course__credits'),
+            quality_points=Sum(F('course__credits') * grade_points(), output_field=FloatField()),
+        )
+        .order_by('student_id', 'year', 'semester')
+    )
+    for row in rows:
+        transcript = transcripts[row['student_id']]
+        transcript['credits'] += row['credits']
+        transcript['quality_points'] += row['quality_points']
+        transcript['terms'].append({
+            'term': f"{SEMESTERS[row['semester']]} {row['year']}",
+            'gpa': _gpa(row['quality_points'], row['credits']),
+            'credits': row['credits'],
+            'cumulative_gpa': _gpa(transcript['quality_points'], transcript['credits']),
+        })
+    for transcript in transcripts.values():
+        transcript['gpa'] = _gpa(transcript['quality_points'], transcript['credits'])
+    return transcripts
+
+
+def _gpa(quality_points, credits):
+    return round(quality_points / credits, 2) if credits else None
+
+
+def get_transcripts(student_ids):
+    """Cached transcripts for many students; only the cache misses are computed (in one query)."""
+    student_ids = list(student_ids)
+    keys = {CACHE_KEY.format(student_id): student_id for student_id in student_ids}
+    cached = cache.get_many(keys)
+    transcripts = {keys[key]: value for key, value in cached.items()}
+    missing = [student_id for student_id in student_ids if student_id not in transcripts]
+    if missing:
+        computed = compute_transcripts(missing)
+        cache.set_many({CACHE_KEY.format(student_id): transcript
+                        for student_id, transcript in computed.items()}, CACHE_TIMEOUT)
+        transcripts.update(computed)
+    return transcripts
+
+
+def get_transcript(student_id):
+    """Cached transcript for one student."""
+    return get_transcripts([student_id])[student_id]
+
+
+def invalidate_transcripts(student_ids):
+    """Drop cached transcripts, e.g. after grades were changed with bulk_update()."""
+    cache.delete_many([CACHE_KEY.format(student_id) for student_id in student_ids])
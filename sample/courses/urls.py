@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 from . import api
+from . import async_api
 
 app_name = 'courses'
 
@@ -22,5 +23,9 @@ urlpatterns = [
     path('<str:course_code>/', views.course_detail, name='course_detail'),
     
     # API endpoints
+    path('api/async/courses/', async_api.course_list, name='async_course_list'),
+    path('api/async/courses/search/', async_api.course_search, name='async_course_search'),
+    path('api/async/courses/featured/', async_api.course_featured, name='async_course_featured'),
+    path('api/async/courses/<int:pk>/', async_api.course_detail, name='async_course_detail'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
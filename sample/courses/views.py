@@ -1,15 +1,22 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q, Count
-from .models import Course, Instructor, Enrollment
+from .models import Course, Instructor, Enrollment, WaitlistEntry
+from authapp.roles import get_roles
+from .recommendations import arelated_courses
+from .waitlist import join_waitlist
 
-def course_list(request):
+async def course_list(request):
     """Display a list of all active courses"""
     query = request.GET.get('q', '')
     level = request.GET.get('level', '')
     
-    courses = Course.objects.filter(is_active=True)
+    courses = Course.objects.filter(is_active=True).select_related('instructor__user')
     
     # Apply search filter
     if query:
@@ -27,39 +34,52 @@ def course_list(request):
     courses = courses.annotate(enrolled_students=Count('enrollments'))
     
     context = {
-        'courses': courses,
+        'courses': [course async for course in courses.aiterator()],
         'query': query,
         'level': level,
         'level_choices': Course.LEVEL_CHOICES,
     }
     
-    return render(request, 'courses/course_list.html', context)
+    return await arender(request, 'courses/course_list.html', context)
 
-def course_detail(request, course_code):
+async def course_detail(request, course_code):
     """Display details for a specific course"""
-    course = get_object_or_404(Course, code=course_code)
+    try:
+        course = await Course.objects.select_related('instructor__user').aget(code=course_code)
+    except Course.DoesNotExist:
+        raise Http404('No Course matches the given query.')
+    user = await request.auser()
     
-    # Check if user is enrolled
-    is_enrolled = False
-    if request.user.is_authenticated:
-        is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
+    async def is_enrolled():
+        return user.is_authenticated and await course.enrollments.filter(student=user).aexists()
     
-    # Get prerequisites
-    prerequisites = course.prerequisites.all()
+    async def prerequisites():
+        return [prereq async for prereq in course.prerequisites.all()]
     
-    # Get related courses (same instructor or level)
-    related_courses = Course.objects.filter(
-        Q(instructor=course.instructor) | Q(level=course.level)
-    ).exclude(id=course.id)[:3]
+    # The queries do not depend on each other, so they are awaited together
+    is_enrolled, prerequisites, related, enrolled_count = await asyncio.gather(
+        is_enrolled(), prerequisites(), arelated_courses(course), course.enrollments.acount(),
+    )
     
     context = {
         'course': course,
         'is_enrolled': is_enrolled,
         'prerequisites': prerequisites,
-        'related_courses': related_courses,
+        # Courses often taken together with this one (precomputed)
+        'related_courses': related,
+        'enrolled_count': enrolled_count,
     }
     
-    return render(request, 'courses/course_detail.html', context)
+    return await arender(request, 'courses/course_detail.html', context)
+
+async def arender(request, template_name, context):
+    """
+    render() for async views. Templates cannot query the database from the
+    event loop, so the user and roles they show are loaded beforehand.
+    """
+    request.user = await request.auser()
+    request.user_roles = await sync_to_async(get_roles)(request.user)
+    return render(request, template_name, context)
 
 @login_required
 def enroll_course(request, course_code):
@@ -71,13 +91,7 @@ def enroll_course(request, course_code):
         messages.warning(request, f'You are already enrolled in {course.title}')
         return redirect('courses:course_detail', course_code=course.code)
     
-    # Check if course is full
-    current_enrollment = Enrollment.objects.filter(course=course, status='ENR').count()
-    if current_enrollment >= course.max_students:
-        messages.error(request, f'Sorry, {course.title} is already full')
-        return redirect('courses:course_detail', course_code=course.code)
-    
-    # Check prerequisites
+    # Check prerequisites (before the waitlist, which only holds students who could enroll)
     missing_prerequisites = []
     for prereq in course.prerequisites.all():
         if not Enrollment.objects.filter(student=request.user, course=prereq, status='CMP').exists():
@@ -88,6 +102,14 @@ def enroll_course(request, course_code):
         messages.error(request, f'You need to complete these prerequisites first: {prereq_list}')
         return redirect('courses:course_detail', course_code=course.code)
     
+    # Full courses, and courses with students already waiting, put the student on the waitlist
+    current_enrollment = Enrollment.objects.filter(course=course, status='ENR').count()
+    if current_enrollment >= course.max_students or WaitlistEntry.objects.filter(course=course).exists():
+        place = join_waitlist(request.user, course)
+        messages.info(request, f'{course.title} is full. You are number {place} on its waitlist '
+                               f'and will be enrolled when a seat opens up.')
+        return redirect('courses:course_detail', course_code=course.code)
+    
     # Create enrollment
     Enrollment.objects.create(student=request.user, course=course, status='ENR')
     messages.success(request, f'You have successfully enrolled in {course.title}')
@@ -0,0 +1,140 @@
+"""
+Course waitlists and seat promotion.
+
+Students who try to enroll in a full course (or one that already has a
+waitlist, so nobody jumps the queue) join its waitlist at the next position.
+Positions only grow, so joining and finding the next students are both seeks
+on the (course, position) index: O(log n) in the length of the waitlist.
+
+Seats are freed by drops from anywhere (the admin, the API, bulk grading),
+so the drop requests do not promote anybody themselves. promote_waitlists()
+finds every course with both free seats and a waitlist, enrolls the first
+students in one transaction per batch and then emails them all at once. The
+process_waitlists command runs it in a loop:
+    python manage.py process_waitlists --interval 5
+
+Promotion recounts the seats inside its transaction, with the courses'
+rows locked (SELECT ... FOR UPDATE, where supported), so concurrent drops
+only ever free seats for the next round, and a course is never over-filled.
+"""
+
+from collections import defaultdict
+
+from django.core.mail import send_mass_mail
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+
+from .models import Course, Enrollment, WaitlistEntry
+
+BATCH_SIZE = 500  # Most students promoted per transaction
+JOIN_ATTEMPTS = 5
+
+
+def join_waitlist(user, course):
+    """
+    Put a user at the end of a course's waitlist; returns their place in line (1 = next).
+
+    Users already on the waitlist keep their position.
+    """
+    for _ in range(JOIN_ATTEMPTS):
+        entry = WaitlistEntry.objects.filter(course=course, student=user).first()
+        if entry:
+            return waitlist_place(entry)
+        try:
+            with transaction.atomic():
+                last = WaitlistEntry.objects.filter(course=course).aggregate(last=Max('position'))['last']
+                entry = WaitlistEntry.objects.create(course=course, student=user, position=(last or 0) + 1)
+            return waitlist_place(entry)
+        except IntegrityError:
+            pass  # Someone else took that position (or joined as this user) at the same time
+    raise IntegrityError(f'Could not add {user} to the waitlist of {course.code}')
+
+
+def waitlist_place(entry):
+    """Number of students ahead of an entry, plus one."""
+    return WaitlistEntry.objects.filter(course_id=entry.course_id, position__lt=entry.position).count() + 1
+
+
+def promote_waitlists(batch_size=BATCH_SIZE):
+    """
+    Enroll waitlisted students wherever seats are free; returns the new enrollments.
+
+    Promotes at most batch_size students; call it again until it returns
+    fewer than that. Inactive courses are skipped, and students who no
+    longer meet a course's prerequisites are taken off its waitlist instead
+    of being enrolled.
+    """
+    with transaction.atomic():
+        courses = list(Course.objects.select_for_update().filter(
+            is_active=True, id__in=WaitlistEntry.objects.values('course_id')).order_by('id'))
+        taken = dict(Enrollment.objects.filter(course__in=courses, status='ENR')
+                     .values('course_id').annotate(seats=Count('id')).values_list('course_id', 'seats'))
+        required = defaultdict(set)  # course id -> ids of its prerequisites
+        for course_id, prerequisite_id in Course.prerequisites.through.objects.filter(
+                from_course__in=courses).values_list('from_course_id', 'to_course_id'):
+            required[course_id].add(prerequisite_id)
+
+        heads = []  # (course, entry) pairs, in position order per course
+        ineligible = []
+        for course in courses:
+            free = min(course.max_students - taken.get(course.id, 0), batch_size - len(heads))
+            if free > 0:
+                eligible, passed_over = _next_eligible(course, required[course.id], free)
+                heads += [(course, entry) for entry in eligible]
+                ineligible += passed_over
+            if len(heads) == batch_size:
+                break
+        if ineligible:
+            WaitlistEntry.objects.filter(id__in=[entry.id for entry in ineligible]).delete()
+        if not heads:
+            return []
+
+        # Students who got into the course some other way meanwhile just leave the waitlist
+        enrolled = set(Enrollment.objects.filter(course__in={course for course, _ in heads},
+                                                 student__in={entry.student_id for _, entry in heads})
+                       .values_list('course_id', 'student_id'))
+        WaitlistEntry.objects.filter(id__in=[entry.id for _, entry in heads]).delete()
+        enrollments = Enrollment.objects.bulk_create([
+            Enrollment(course=course, student=entry.student, status='ENR')
+            for course, entry in heads if (course.id, entry.student_id) not in enrolled
+        ])
+    notify_promoted(enrollments)
+    return enrollments
+
+
+def _next_eligible(course, prerequisite_ids, free):
+    """
+    The first `free` waitlist entries of a course whose students have completed
+    its prerequisites, and the entries passed over on the way.
+    """
+    entries = WaitlistEntry.objects.filter(course=course).select_related('student')
+    eligible, passed_over = [], []
+    last_position = 0
+    while len(eligible) < free:
+        batch = list(entries.filter(position__gt=last_position)[:free - len(eligible)])
+        if not batch:
+            break
+        last_position = batch[-1].position
+        completed = set()
+        if prerequisite_ids:
+            completed = set(Enrollment.objects.filter(
+                student__in=[entry.student_id for entry in batch], course__in=prerequisite_ids, status='CMP',
+            ).values_list('student_id', 'course_id'))
+        for entry in batch:
+            if all((entry.student_id, prerequisite) in completed for prerequisite in prerequisite_ids):
+                eligible.append(entry)
+            else:
+                passed_over.append(entry)
+    return eligible, passed_over
+
+
+def notify_promoted(enrollments):
+    """Email every promoted student, over one connection."""
+    messages = [
+        (f'You are enrolled in {enrollment.course.code}',
+         f'A seat opened up in {enrollment.course.title} and you have been enrolled from the waitlist.',
+         None, [enrollment.student.email])
+        for enrollment in enrollments if enrollment.student.email
+    ]
+    if messages:
+        send_mass_mail(messages, fail_silently=True)
@@ -3,6 +3,11 @@ ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The catalog pages and courses/async_api.py are async views, which only
+pay off behind an ASGI server, e.g.:
+    uvicorn myproject.asgi:application --workers 4
+    gunicorn myproject.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,244 @@
+"""
+Negotiated compression for dynamic responses (API JSON, HTML pages, exports).
+
+Works like django.middleware.gzip.GZipMiddleware, with these differences:
+- brotli ("br") is preferred when the client accepts it and the Brotli
+  package is installed; otherwise gzip. Accept-Encoding q-values are honoured,
+  so "gzip;q=0" or "identity" alone get the plain response;
+- the size threshold, gzip level and brotli quality come from settings
+  (COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL, COMPRESSION_BROTLI_QUALITY);
+- only text-like content types are compressed: images, archives and responses
+  that already have a Content-Encoding (e.g. exports with ?gzip=1) are not.
+
+Like GZipMiddleware it pads gzip output, one-shot and streamed, with a
+random-length file name (BREACH mitigation), flushes streamed output after
+every chunk so slow exports reach the client as they are produced, turns
+strong ETags into weak ones and adds Vary: Accept-Encoding.
+
+brotli output has no such field to pad (its metadata blocks are not exposed
+by the Brotli package), so HTML, where CSRF tokens sit next to reflected
+input, is never sent as br: it gets padded gzip instead.
+
+Static files are not handled here: WhiteNoise serves the .gz/.br files that
+CompressedManifestStaticFilesStorage writes at collectstatic, and returns
+before this middleware runs (it is listed above it in settings.MIDDLEWARE).
+
+Both middlewares here work under WSGI and ASGI (myproject/asgi.py) alike.
+"""
+
+import gzip
+import re
+import secrets
+import struct
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is used without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml',
+    'application/x-ndjson', 'application/problem+json', 'image/svg+xml',
+)
+MAX_RANDOM_BYTES = 100  # Same padding as GZipMiddleware
+
+re_accepts_coding = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header, e.g. {'gzip': 1.0, 'br': 0.5}."""
+    encodings = {}
+    for part in header.split(','):
+        match = re_accepts_coding.match(part)
+        if not match:
+            continue
+        try:
+            q = float(match[2]) if match[2] is not None else 1.0
+        except ValueError:
+            q = 0.0
+        encodings[match[1].lower()] = q
+    return encodings
+
+
+def choose_encoding(header, allow_brotli=True):
+    """'br', 'gzip' or None for an Accept-Encoding header; br wins ties."""
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None and allow_brotli else ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = encodings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def gzip_bytes(data, level, max_random_bytes=MAX_RANDOM_BYTES):
+    """
+    gzip data at the given level, with the FNAME field padded by 0 to
+    max_random_bytes - 1 bytes so the compressed length varies (BREACH).
+    """
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    if not max_random_bytes:
+        return compressed
+    header = bytearray(compressed[:10])
+    header[3] = gzip.FNAME
+    filename = b'a' * secrets.randbelow(max_random_bytes) + b'\x00'
+    return bytes(header) + filename + compressed[10:]
+
+
+class GzipStream:
+    """
+    Streamed gzip, padded like gzip_bytes. zlib writes raw deflate and the
+    gzip header and trailer are written here, as zlib's own gzip header has
+    no FNAME field.
+    """
+
+    def __init__(self, level, max_random_bytes=MAX_RANDOM_BYTES):
+        self.deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.crc = 0
+        self.size = 0
+        flags = gzip.FNAME if max_random_bytes else 0
+        # Magic, deflate, flags, mtime 0, no extra flags, unknown OS
+        self.header = struct.pack('<BBBBLBB', 0x1f, 0x8b, 8, flags, 0, 0, 255)
+        if max_random_bytes:
+            self.header += b'a' * secrets.randbelow(max_random_bytes) + b'\x00'
+
+    def compress(self, chunk):
+        self.crc = zlib.crc32(chunk, self.crc)
+        self.size += len(chunk)
+        # Flushed every chunk, like Django's compress_sequence
+        return self.deflate.compress(chunk) + self.deflate.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.deflate.flush() + struct.pack('<LL', self.crc, self.size & 0xffffffff)
+
+
+class BrotliStream:
+    """Streamed brotli, flushed every chunk."""
+    header = b''
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self.compressor.process(chunk) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.level = getattr(settings, 'COMPRESSION_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+    def process_response(self, request, response):
+        if not self.compressible(response):
+            return response
+
+        # Cache the response per encoding even when this client gets it plain
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # br cannot be padded, so not for HTML (see the module docstring)
+        html = response.get('Content-Type', '').lower().startswith('text/html')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), allow_brotli=not html)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = self.compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < self.min_size:
+                return response
+            compressed = self.compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body changed, so a strong ETag no longer identifies it byte for byte
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def compressible(self, response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return False
+        content_type = response.get('Content-Type', '').lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip_bytes(data, self.level)
+
+    def stream(self, encoding):
+        if encoding == 'br':
+            return BrotliStream(self.brotli_quality)
+        return GzipStream(self.level)
+
+    def compress_stream(self, chunks, encoding):
+        stream = self.stream(encoding)
+        if stream.header:
+            yield stream.header
+        for chunk in chunks:
+            if chunk:
+                yield stream.compress(chunk)
+        yield stream.finish()
+
+    async def acompress_stream(self, chunks, encoding):
+        stream = self.stream(encoding)
+        if stream.header:
+            yield stream.header
+        async for chunk in chunks:
+            if chunk:
+                yield stream.compress(chunk)
+        yield stream.finish()
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also runs natively under ASGI.
+
+    WhiteNoise 6.9 is sync only, and Django runs a sync middleware in a thread
+    that stays blocked until the view below it has answered, so as the first
+    middleware it would cost every ASGI request a thread and undo the async
+    views. Serving a file (a dict lookup and an open()) is quick enough for
+    the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
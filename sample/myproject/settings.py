@@ -44,12 +44,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # WhiteNoise, also async under ASGI
+    'myproject.middleware.AsyncWhiteNoiseMiddleware',
+    'myproject.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'authapp.roles.UserRolesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'authapp.middleware.UserActivityMiddleware',
@@ -67,6 +70,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'authapp.roles.user_roles',
             ],
         },
     },
@@ -105,6 +109,69 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# The PBKDF2 iteration count can be tuned for the hardware with
+# `python manage.py benchmark_login`. Existing hashes keep working whatever
+# the count is, and are re-hashed with the new count on the next login.
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('DJANGO_PBKDF2_ITERATIONS', 1000000))
+
+PASSWORD_HASHERS = [
+    'authapp.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
+# Cache, sessions and messages
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/#configuring-the-session-engine
+# DJANGO_SESSION_PROFILE picks the session engine:
+#   cached_db      - read from the cache, written through to the database (default)
+#   signed_cookies - no server-side storage at all; keep sessions small
+#   db             - Django's default, one django_session query per request
+# With several server processes, point CACHES at a shared cache (Redis,
+# Memcached); the local-memory cache is per process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+SESSION_ENGINES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}
+SESSION_PROFILE = os.environ.get('DJANGO_SESSION_PROFILE', 'cached_db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+
+# Flash messages (enroll_course, login_view, ...) travel in a cookie instead
+# of being written to the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# orjson-backed JSON for the API when installed (courses/renderers.py)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'courses.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Registration cart (courses/registration.py): whether a prerequisite in the
+# same cart counts as satisfied, e.g. registering for MATH101 and MATH102 together
+REGISTRATION_CART_PREREQUISITES = False
+
+# Compression of dynamic responses (myproject/middleware.py): bodies smaller
+# than COMPRESSION_MIN_SIZE bytes are sent as is; gzip level 1-9, brotli quality 0-11
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -122,7 +189,21 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorages'
+# collectstatic writes hashed copies (served by WhiteNoise with a one-year
+# "immutable" Cache-Control) plus .gz versions, and .br ones when Brotli is installed
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# Files without a hash in their name (admin/js/... as requested directly)
+WHITENOISE_MAX_AGE = 3600
+# Until collectstatic has written the manifest (tests, a fresh checkout),
+# {% static %} falls back to the unhashed name instead of raising
+WHITENOISE_MANIFEST_STRICT = False
 # Media files (User uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -131,6 +212,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 LOGIN_REDIRECT_URL = 'courses:course_list'
 LOGOUT_REDIRECT_URL = 'courses:course_list'
 
+# Waitlist promotion emails (courses/waitlist.py); printed to the console in development
+EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -10,7 +10,6 @@ It shows how to:
 """
 
 import os
-import csv
 import sys
 import django
 from datetime import datetime
@@ -28,6 +27,7 @@ django.setup()
 
 # Import the StudentRecord model
 from sqlite_tutorial.models import StudentRecord
+from sqlite_tutorial.mmap_csv import MmapCsvReader
 
 # Get the current directory
 BASE_DIR = Path(__file__).resolve().parent
@@ -39,19 +39,19 @@ def import_students_from_csv():
     StudentRecord.objects.all().delete()
     print("Cleared existing students")
     
-    # Read data from CSV file
-    with open(CSV_PATH, 'r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
+    # Read only the columns the model needs, as lightweight records
+    columns = ['first_name', 'last_name', 'email', 'major', 'gpa', 'enrollment_date']
+    with MmapCsvReader(CSV_PATH, columns=columns) as csv_reader:
         
         # Insert each row into the database
-        for row in csv_reader:
+        for row in csv_reader.records():
             StudentRecord.objects.create(
-                first_name=row['first_name'],
-                last_name=row['last_name'],
-                email=row['email'],
-                major=row['major'],
-                gpa=float(row['gpa']),
-                enrollment_date=datetime.strptime(row['enrollment_date'], '%Y-%m-%d').date()
+                first_name=row.first_name,
+                last_name=row.last_name,
+                email=row.email,
+                major=row.major,
+                gpa=float(row.gpa),
+                enrollment_date=datetime.strptime(row.enrollment_date, '%Y-%m-%d').date()
             )
     
     print(f"Imported {StudentRecord.objects.count()} students from CSV")
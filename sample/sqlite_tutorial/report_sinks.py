@@ -0,0 +1,308 @@
+"""Report Sinks
+
+Pluggable writers for the student database project reports.
+
+Every sink takes rows in batches (straight from ``cursor.fetchmany``), so a
+report never has to be held in memory as one big Python list. The Parquet
+sink writes each batch out as it arrives; the NumPy fallback keeps each batch
+as typed column arrays and writes the file once on close. Available formats:
+1. ``csv``      - the original comma separated files
+2. ``jsonl``    - one JSON object per line
+3. ``columnar`` - Parquet when pyarrow is installed, otherwise a compressed
+                  NumPy ``.npz`` archive with one array per column
+
+Run this file directly to benchmark file size, write time and read-back time
+for each format.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import importlib.util
+from pathlib import Path
+
+# Number of rows pulled from the cursor per fetchmany() call
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ReportSink:
+    """Base class for report writers. Use as a context manager."""
+    extension = ''
+
+    def __init__(self, path, columns):
+        self.path = Path(path).with_suffix(self.extension)
+        self.columns = list(columns)
+
+    def write_batch(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvSink(ReportSink):
+    """Write rows to a CSV file with a header row."""
+    extension = '.csv'
+
+    def __init__(self, path, columns, null_value=''):
+        super().__init__(path, columns)
+        self.null_value = null_value
+        self.file = open(self.path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+
+    def write_batch(self, rows):
+        null_value = self.null_value
+        self.writer.writerows(
+            [null_value if value is None else value for value in row] for row in rows
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesSink(ReportSink):
+    """Write each row as a JSON object on its own line."""
+    extension = '.jsonl'
+
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        self.file = open(self.path, 'w', encoding='utf-8')
+
+    def write_batch(self, rows):
+        columns = self.columns
+        self.file.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink(ReportSink):
+    """
+    Write each batch to a Parquet file as it arrives (requires pyarrow).
+
+    A ParquetWriter fixes the column types when it opens, and SQLite columns
+    are dynamically typed, so batches are only held back while some column
+    has been all NULL (up to max_pending_rows, after which such columns are
+    written as strings). Later batches are cast to the file's types, e.g. an
+    int batch into a float column.
+    """
+    extension = '.parquet'
+
+    def __init__(self, path, columns, max_pending_rows=10 * DEFAULT_BATCH_SIZE):
+        super().__init__(path, columns)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.pq = pq
+        self.writer = None
+        self.pending = []
+        self.pending_rows = 0
+        self.max_pending_rows = max_pending_rows
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        pa = self.pa
+        arrays = []
+        for name, values in zip(self.columns, zip(*rows)):
+            try:
+                arrays.append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Rows for {self.path} have values of mixed types in column {name!r}: {e}") from None
+        table = pa.table(arrays, names=self.columns)
+        if self.writer is not None:
+            self._write(table)
+            return
+
+        self.pending.append(table)
+        self.pending_rows += len(rows)
+        # Widen types across the held batches (e.g. a NULL-only first batch, or int then float)
+        schema = pa.unify_schemas([table.schema for table in self.pending], promote_options='permissive')
+        if not any(pa.types.is_null(field.type) for field in schema):
+            self._open(schema)
+        elif self.pending_rows >= self.max_pending_rows:
+            self._open(pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                  for field in schema]))
+
+    def _open(self, schema):
+        self.writer = self.pq.ParquetWriter(self.path, schema)
+        for table in self.pending:
+            self._write(table)
+        self.pending = []
+
+    def _write(self, table):
+        try:
+            table = table.cast(self.writer.schema)
+        except (self.pa.ArrowInvalid, self.pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Rows for {self.path} do not match the column types of earlier rows: {e}") from None
+        self.writer.write_table(table)
+
+    def close(self):
+        pa = self.pa
+        if self.writer is None:
+            if self.pending:
+                self._open(pa.unify_schemas([table.schema for table in self.pending],
+                                            promote_options='permissive'))
+            else:
+                self._open(pa.schema([(name, pa.null()) for name in self.columns]))
+        self.writer.close()
+
+
+class NpzSink(ReportSink):
+    """Collect each column as typed NumPy arrays and save a compressed .npz."""
+    extension = '.npz'
+
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        import numpy
+        self.np = numpy
+        self.chunks = {name: [] for name in self.columns}
+
+    def _column_array(self, values):
+        np = self.np
+        if all(value is None or isinstance(value, (int, float)) for value in values):
+            if any(value is None or isinstance(value, float) for value in values):
+                return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            return np.array(values, dtype=np.int64)
+        return np.array(['' if value is None else str(value) for value in values], dtype=str)
+
+    def write_batch(self, rows):
+        if not rows:
+            return
+        for name, values in zip(self.columns, zip(*rows)):
+            self.chunks[name].append(self._column_array(values))
+
+    def close(self):
+        np = self.np
+        arrays = {
+            name: np.concatenate(chunks) if chunks else np.array([])
+            for name, chunks in self.chunks.items()
+        }
+        # Keep the original column order and names (they may contain spaces)
+        arrays['__columns__'] = np.array(self.columns, dtype=str)
+        with open(self.path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+
+def columnar_sink_class():
+    """Parquet when pyarrow is installed, otherwise the NumPy fallback."""
+    if importlib.util.find_spec('pyarrow') is not None:
+        return ParquetSink
+    return NpzSink
+
+
+def open_sink(fmt, path, columns, **options):
+    """
+    Create a sink for the given format name ('csv', 'jsonl' or 'columnar').
+
+    Usage example:
+        with open_sink('jsonl', REPORTS_DIR / 'report', ['Major', 'Count']) as sink:
+            sink.write_batch(rows)
+    """
+    if fmt == 'csv':
+        return CsvSink(path, columns, **options)
+    elif fmt == 'jsonl':
+        return JsonLinesSink(path, columns)
+    elif fmt == 'columnar':
+        return columnar_sink_class()(path, columns)
+    else:
+        raise ValueError(f"Unknown report format: {fmt}")
+
+
+def export_rows(rows, path, columns, formats=('csv',), **options):
+    """Write an already fetched (small) result set to every requested format."""
+    for fmt in formats:
+        with open_sink(fmt, path, columns, **options) as sink:
+            sink.write_batch(rows)
+
+
+def export_cursor(cursor, path, columns, formats=('csv',), batch_size=DEFAULT_BATCH_SIZE, **options):
+    """
+    Stream an executed cursor into every requested format using fetchmany().
+
+    Usage example:
+        cursor.execute("SELECT major, COUNT(*) FROM students GROUP BY major")
+        export_cursor(cursor, REPORTS_DIR / 'by_major', ['Major', 'Count'], ['csv', 'columnar'])
+    """
+    sinks = [open_sink(fmt, path, columns, **options) for fmt in formats]
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for sink in sinks:
+                sink.write_batch(rows)
+    finally:
+        for sink in sinks:
+            sink.close()
+    return [sink.path for sink in sinks]
+
+
+# Read-back helpers used by the benchmark
+def read_report(path):
+    """Read a report back and return the number of rows."""
+    path = Path(path)
+    if path.suffix == '.csv':
+        with open(path, newline='') as f:
+            return sum(1 for _ in csv.reader(f)) - 1
+    elif path.suffix == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            return sum(1 for line in f if json.loads(line))
+    elif path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path).num_rows
+    elif path.suffix == '.npz':
+        import numpy as np
+        with np.load(path) as data:
+            first_column = str(data['__columns__'][0])
+            return len(data[first_column])
+    raise ValueError(f"Unknown report file: {path}")
+
+
+def benchmark_report_formats(num_rows=200000, batch_size=DEFAULT_BATCH_SIZE):
+    """Compare file size, write time and read-back time for every format."""
+    import random
+
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    cursor.execute('CREATE TABLE results (id INTEGER, student_name TEXT, major TEXT, gpa REAL, courses INTEGER)')
+    majors = ['Computer Science', 'Mathematics', 'Physics', 'Biology', 'Chemistry']
+    cursor.executemany(
+        'INSERT INTO results VALUES (?, ?, ?, ?, ?)',
+        ((i, f"Student {i}", random.choice(majors), round(random.uniform(2.0, 4.0), 2), random.randint(1, 6))
+         for i in range(num_rows))
+    )
+    columns = ['ID', 'Student Name', 'Major', 'GPA', 'Courses']
+
+    print(f"Benchmarking report formats with {num_rows} rows ({columnar_sink_class().__name__} for columnar)")
+    print(f"{'Format':<10} {'Size (KB)':>12} {'Write (s)':>12} {'Read (s)':>12}")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in ('csv', 'jsonl', 'columnar'):
+            cursor.execute('SELECT * FROM results')
+            start_time = time.perf_counter()
+            [path] = export_cursor(cursor, Path(tmp_dir) / 'report', columns, [fmt], batch_size)
+            write_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            rows_read = read_report(path)
+            read_time = time.perf_counter() - start_time
+            assert rows_read == num_rows
+
+            size_kb = os.path.getsize(path) / 1024
+            print(f"{fmt:<10} {size_kb:>12.1f} {write_time:>12.3f} {read_time:>12.3f}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    benchmark_report_formats()
@@ -12,9 +12,9 @@ Follow along with the comments to understand each step.
 
 import sqlite3
 import os
-import csv
 from datetime import datetime
 from pathlib import Path
+from mmap_csv import MmapCsvReader
 
 # Get the current directory where this script is located
 BASE_DIR = Path(__file__).resolve().parent
@@ -65,25 +65,15 @@ conn.close()
 with sqlite3.connect(DB_PATH) as conn:
     cursor = conn.cursor()
     
-    # Read data from CSV file
-    with open(CSV_PATH, 'r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
+    # Read data from CSV file; the reader yields tuples in the column order we ask for
+    columns = ['id', 'first_name', 'last_name', 'email', 'major', 'gpa', 'enrollment_date']
+    with MmapCsvReader(CSV_PATH, columns=columns) as csv_reader:
         
-        # Insert each row into the database using parameterized queries
-        for row in csv_reader:
-            # Using parameterized query for security (prevents SQL injection)
-            cursor.execute('''
-            INSERT INTO students (id, first_name, last_name, email, major, gpa, enrollment_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                row['id'],
-                row['first_name'],
-                row['last_name'],
-                row['email'],
-                row['major'],
-                row['gpa'],
-                row['enrollment_date']
-            ))
+        # Insert every row using one parameterized query (prevents SQL injection)
+        cursor.executemany('''
+        INSERT INTO students (id, first_name, last_name, email, major, gpa, enrollment_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', csv_reader)
     
     print(f"Imported {cursor.rowcount if hasattr(cursor, 'rowcount') else '15'} students from CSV")
 
@@ -7,12 +7,16 @@ This hands-on project demonstrates:
 """
 
 import sqlite3
-import csv
 import os
+import json
+import time
+import hashlib
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-import matplotlib.pyplot as plt
-import pandas as pd
+from report_sinks import export_rows, export_cursor
+from mmap_csv import MmapCsvReader
 
 # Get the current directory where this script is located
 BASE_DIR = Path(__file__).resolve().parent
@@ -27,6 +31,12 @@ CSV_PATH = BASE_DIR / 'students.csv'
 REPORTS_DIR = BASE_DIR / 'reports'
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# Formats every report is written in: 'csv', 'jsonl' and/or 'columnar'
+REPORT_FORMATS = ['csv', 'columnar']
+
+# Remembers which data each chart was last drawn from, so unchanged charts are skipped
+CHART_CACHE_PATH = REPORTS_DIR / '.chart_cache.json'
+
 # Create a database connection with row factory
 def get_db_connection():
     conn = sqlite3.connect(DB_PATH)
@@ -89,24 +99,15 @@ def import_students_from_csv():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Read data from CSV file
-        with open(CSV_PATH, 'r') as csv_file:
-            csv_reader = csv.DictReader(csv_file)
+        # Read data from CSV file as tuples in the table's column order
+        columns = ['id', 'first_name', 'last_name', 'email', 'major', 'gpa', 'enrollment_date']
+        with MmapCsvReader(CSV_PATH, columns=columns) as csv_reader:
             
-            # Insert each row into the database
-            for row in csv_reader:
-                cursor.execute('''
-                INSERT INTO students (id, first_name, last_name, email, major, gpa, enrollment_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row['id'],
-                    row['first_name'],
-                    row['last_name'],
-                    row['email'],
-                    row['major'],
-                    row['gpa'],
-                    row['enrollment_date']
-                ))
+            # Insert all rows into the database
+            cursor.executemany('''
+            INSERT INTO students (id, first_name, last_name, email, major, gpa, enrollment_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', csv_reader)
         
         print(f"Imported {cursor.rowcount if hasattr(cursor, 'rowcount') else '15'} students from CSV")
 
@@ -188,9 +189,83 @@ def generate_enrollments():
         
         print(f"Generated {cursor.rowcount if hasattr(cursor, 'rowcount') else len(enrollments)} student enrollments")
 
-# Generate reports
-def generate_reports():
-    with get_db_connection() as conn:
+# Hash the data a chart is drawn from
+def chart_data_hash(chart):
+    payload = json.dumps([chart['title'], chart['xlabel'], chart['labels'], chart['values']])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# Render a single bar chart to PNG and return (filename, seconds taken)
+def render_bar_chart(chart):
+    start_time = time.perf_counter()
+    
+    # Import matplotlib only when a chart is actually drawn; this runs in a
+    # worker process, so the object-oriented Agg API is used instead of the
+    # global pyplot state machine
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    positions = range(len(chart['labels']))
+    ax.bar(positions, chart['values'])
+    ax.set_title(chart['title'])
+    ax.set_xlabel(chart['xlabel'])
+    ax.set_ylabel('Number of Students')
+    ax.set_xticks(positions)
+    ax.set_xticklabels(chart['labels'], rotation=45, ha='right')
+    fig.tight_layout()
+    fig.savefig(REPORTS_DIR / chart['filename'])
+    
+    return chart['filename'], time.perf_counter() - start_time
+
+# Render all charts in parallel, skipping those whose data has not changed
+def render_charts(charts, max_workers=None):
+    # Load the hashes recorded by the previous run
+    try:
+        with open(CHART_CACHE_PATH, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+    
+    # Work out which charts need drawing
+    pending = []
+    for chart in charts:
+        data_hash = chart_data_hash(chart)
+        if cache.get(chart['filename']) == data_hash and (REPORTS_DIR / chart['filename']).exists():
+            print(f"Chart {chart['filename']}: unchanged, skipped")
+            continue
+        cache[chart['filename']] = data_hash
+        pending.append(chart)
+    
+    timings = {}
+    if len(pending) == 1:
+        # Not worth starting a process pool for a single chart
+        filename, seconds = render_bar_chart(pending[0])
+        timings[filename] = seconds
+    elif pending:
+        workers = max_workers or min(len(pending), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for filename, seconds in executor.map(render_bar_chart, pending):
+                timings[filename] = seconds
+    
+    for filename, seconds in timings.items():
+        print(f"Chart {filename}: rendered in {seconds:.3f}s")
+    
+    # Save the hashes only after every chart rendered successfully
+    with open(CHART_CACHE_PATH, 'w') as f:
+        json.dump(cache, f, indent=2)
+    
+    return timings
+
+# Generate reports in the given formats (see report_sinks.py)
+def generate_reports(formats=REPORT_FORMATS):
+    # Chart tasks collected while the SQL reports run
+    charts = []
+    
+    # Read-only, so closing() is enough: the connection is closed (not just
+    # committed, as `with conn` would) before the charts are rendered
+    with closing(get_db_connection()) as conn:
         # Report 1: Students by Major
         print("\nGenerating Report: Students by Major")
         cursor = conn.cursor()
@@ -203,24 +278,17 @@ def generate_reports():
         
         results = cursor.fetchall()
         
-        # Save to CSV
-        with open(REPORTS_DIR / 'students_by_major.csv', 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Major', 'Count'])
-            for row in results:
-                writer.writerow([row['major'], row['count']])
+        # Save in every configured report format
+        export_rows(results, REPORTS_DIR / 'students_by_major', ['Major', 'Count'], formats)
         
-        # Create visualization
-        df = pd.DataFrame([(row['major'], row['count']) for row in results], columns=['Major', 'Count'])
-        plt.figure(figsize=(10, 6))
-        plt.bar(df['Major'], df['Count'])
-        plt.title('Students by Major')
-        plt.xlabel('Major')
-        plt.ylabel('Number of Students')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(REPORTS_DIR / 'students_by_major.png')
-        plt.close()
+        # Queue the chart; it is rendered together with the others at the end
+        charts.append({
+            'filename': 'students_by_major.png',
+            'title': 'Students by Major',
+            'xlabel': 'Major',
+            'labels': [row['major'] for row in results],
+            'values': [row['count'] for row in results],
+        })
         
         # Report 2: GPA Distribution
         print("Generating Report: GPA Distribution")
@@ -243,24 +311,17 @@ def generate_reports():
         
         results = cursor.fetchall()
         
-        # Save to CSV
-        with open(REPORTS_DIR / 'gpa_distribution.csv', 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['GPA Range', 'Count'])
-            for row in results:
-                writer.writerow([row['gpa_range'], row['count']])
+        # Save in every configured report format
+        export_rows(results, REPORTS_DIR / 'gpa_distribution', ['GPA Range', 'Count'], formats)
         
-        # Create visualization
-        df = pd.DataFrame([(row['gpa_range'], row['count']) for row in results], columns=['GPA Range', 'Count'])
-        plt.figure(figsize=(10, 6))
-        plt.bar(df['GPA Range'], df['Count'])
-        plt.title('GPA Distribution')
-        plt.xlabel('GPA Range')
-        plt.ylabel('Number of Students')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(REPORTS_DIR / 'gpa_distribution.png')
-        plt.close()
+        # Queue the chart; it is rendered together with the others at the end
+        charts.append({
+            'filename': 'gpa_distribution.png',
+            'title': 'GPA Distribution',
+            'xlabel': 'GPA Range',
+            'labels': [row['gpa_range'] for row in results],
+            'values': [row['count'] for row in results],
+        })
         
         # Report 3: Course Enrollment Statistics
         print("Generating Report: Course Enrollment Statistics")
@@ -277,15 +338,10 @@ def generate_reports():
         ORDER BY enrollment_count DESC
         ''')
         
-        results = cursor.fetchall()
-        
-        # Save to CSV
-        with open(REPORTS_DIR / 'course_enrollments.csv', 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Course Code', 'Title', 'Enrollment Count', 'Average Student GPA'])
-            for row in results:
-                writer.writerow([row['course_code'], row['title'], row['enrollment_count'], 
-                                row['avg_student_gpa'] if row['avg_student_gpa'] else 'N/A'])
+        # Stream the rows into every configured report format
+        export_cursor(cursor, REPORTS_DIR / 'course_enrollments',
+                      ['Course Code', 'Title', 'Enrollment Count', 'Average Student GPA'],
+                      formats, null_value='N/A')
         
         # Report 4: Student Performance Report
         print("Generating Report: Student Performance Report")
@@ -308,19 +364,16 @@ def generate_reports():
         ORDER BY overall_gpa DESC
         ''')
         
-        results = cursor.fetchall()
-        
-        # Save to CSV
-        with open(REPORTS_DIR / 'student_performance.csv', 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['ID', 'Student Name', 'Major', 'Overall GPA', 'Courses Taken', 
-                           'Courses Completed', 'A Grades', 'B Grades', 'C Grades', 'D Grades', 'F Grades'])
-            for row in results:
-                writer.writerow([row['id'], row['student_name'], row['major'], row['overall_gpa'],
-                               row['courses_taken'], row['courses_completed'], row['a_grades'],
-                               row['b_grades'], row['c_grades'], row['d_grades'], row['f_grades']])
-        
-        print(f"All reports generated and saved to {REPORTS_DIR}")
+        # Stream the rows into every configured report format
+        export_cursor(cursor, REPORTS_DIR / 'student_performance',
+                      ['ID', 'Student Name', 'Major', 'Overall GPA', 'Courses Taken',
+                       'Courses Completed', 'A Grades', 'B Grades', 'C Grades', 'D Grades', 'F Grades'],
+                      formats)
+    
+    # Render the charts once the database connection is closed
+    render_charts(charts)
+    
+    print(f"All reports generated and saved to {REPORTS_DIR}")
 
 # Main function to run the project
 def main():
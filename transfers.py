@@ -0,0 +1,235 @@
+# transfers.py
+
+#############
+# Batched, thread-safe transfers between the accounts of the Bank singleton
+#############
+#
+# BankAccount.deposit/withdraw read and write `balance` without any locking,
+# so two threads updating the same account can lose an update. TransferEngine
+# guards every balance change with a lock:
+#   - Lock striping: account i is protected by locks[i % stripes], so threads
+#     working on different accounts rarely wait for each other, while only a
+#     fixed number of locks exists no matter how many accounts there are.
+#   - Ordered acquisition: a transfer takes its two stripe locks in index
+#     order, so two opposite transfers (A->B and B->A) can never deadlock.
+#
+# sharded_apply() is the multiprocessing variant: balances are split into
+# shards, each process applies the transfers whose source account it owns,
+# and cross-shard credits are delivered after the batch.
+
+import random
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from oops import Bank, BankAccount
+
+DEFAULT_STRIPES = 64
+
+
+class TransferEngine:
+    """
+    Apply single transfers or whole batches between accounts of a Bank.
+
+    Transfers refer to accounts by their index in bank.accounts.
+
+    Usage example:
+        engine = TransferEngine(Bank())
+        engine.transfer(0, 1, 25)
+        applied = engine.apply_batch([(0, 1, 10), (1, 2, 5)], threads=4)
+    """
+
+    def __init__(self, bank=None, stripes=DEFAULT_STRIPES):
+        self.bank = bank or Bank()
+        self.stripes = stripes
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def _locks_for(self, *indexes):
+        """The distinct stripe locks for some accounts, in acquisition order."""
+        stripe_ids = sorted({index % self.stripes for index in indexes})
+        return [self.locks[stripe] for stripe in stripe_ids]
+
+    def deposit(self, index, amount):
+        """Thread-safe deposit into one account."""
+        account = self.bank.accounts[index]
+        with self.locks[index % self.stripes]:
+            return account.deposit(amount)
+
+    def withdraw(self, index, amount):
+        """Thread-safe withdrawal from one account."""
+        account = self.bank.accounts[index]
+        with self.locks[index % self.stripes]:
+            return account.withdraw(amount)
+
+    def transfer(self, source, target, amount):
+        """
+        Move amount from one account to another if the source can cover it.
+
+        Returns True when the transfer was applied.
+        """
+        if amount <= 0 or source == target:
+            return False
+        accounts = self.bank.accounts
+        from_account, to_account = accounts[source], accounts[target]
+        locks = self._locks_for(source, target)
+        for lock in locks:
+            lock.acquire()
+        try:
+            if from_account.balance < amount:
+                return False
+            from_account.balance -= amount
+            to_account.balance += amount
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        _log(from_account, 'TRANSFER_OUT', amount)
+        _log(to_account, 'TRANSFER_IN', amount)
+        return True
+
+    def apply_batch(self, transfers, threads=1):
+        """
+        Apply a batch of (source, target, amount) transfers using `threads` threads.
+
+        Transfers in the same thread run in order; different threads run
+        concurrently. Returns the number of transfers applied.
+        """
+        if threads <= 1:
+            return sum(self.transfer(*t) for t in transfers)
+        # Give each thread an interleaved slice of the batch
+        slices = [transfers[i::threads] for i in range(threads)]
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return sum(executor.map(lambda part: sum(self.transfer(*t) for t in part), slices))
+
+
+def _log(account, kind, amount):
+    # Only accounts that keep their own transaction list are logged here
+    transactions = getattr(account, 'transactions', None)
+    if transactions is not None:
+        transactions.append((kind, amount))
+
+
+#############
+# Multiprocessing: sharded balances
+#############
+
+def _apply_shard(args):
+    """Worker: apply the transfers whose source lives in this shard."""
+    shard, shards, balances, transfers = args
+    applied = 0
+    outgoing = []  # (target, amount) credits for accounts in other shards
+    for source, target, amount in transfers:
+        local_source = source // shards
+        if amount <= 0 or source == target or balances[local_source] < amount:
+            continue
+        balances[local_source] -= amount
+        if target % shards == shard:
+            balances[target // shards] += amount
+        else:
+            outgoing.append((target, amount))
+        applied += 1
+    return balances, outgoing, applied
+
+
+def sharded_apply(balances, transfers, shards=2):
+    """
+    Apply a batch of transfers on `shards` processes and return (balances, applied).
+
+    Account i belongs to shard i % shards. A shard only checks the balances it
+    owns, so credits arriving from other shards become usable in the next batch.
+
+    Usage example:
+        balances, applied = sharded_apply([100.0] * 10, [(0, 1, 5.0), (3, 4, 1.0)], shards=2)
+    """
+    shard_balances = [array('d', balances[shard::shards]) for shard in range(shards)]
+    shard_transfers = [[] for _ in range(shards)]
+    for transfer in transfers:
+        shard_transfers[transfer[0] % shards].append(transfer)
+
+    with ProcessPoolExecutor(max_workers=shards) as executor:
+        results = list(executor.map(
+            _apply_shard,
+            [(shard, shards, shard_balances[shard], shard_transfers[shard]) for shard in range(shards)]
+        ))
+
+    new_balances = list(balances)
+    applied = 0
+    for shard, (shard_result, _, shard_applied) in enumerate(results):
+        new_balances[shard::shards] = shard_result
+        applied += shard_applied
+    # Deliver the cross-shard credits
+    for _, outgoing, _ in results:
+        for target, amount in outgoing:
+            new_balances[target] += amount
+    return new_balances, applied
+
+
+#############
+# Benchmark and tests
+#############
+
+def _fresh_bank(num_accounts, balance):
+    """Reset the Bank singleton with num_accounts accounts."""
+    bank = Bank()
+    bank.accounts = [BankAccount(f"Owner {i}", balance) for i in range(num_accounts)]
+    return bank
+
+
+def _random_transfers(num_accounts, count, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(num_accounts), rng.randrange(num_accounts), rng.randint(1, 50))
+            for _ in range(count)]
+
+
+def benchmark(num_accounts=10000, num_transfers=200000, max_workers=8):
+    """Print transfers/sec for 1..max_workers threads and for the sharded process variant."""
+    transfers = _random_transfers(num_accounts, num_transfers)
+    workers = [n for n in (1, 2, 4, 8, 16) if n <= max_workers]
+
+    print(f"{num_transfers:,} transfers between {num_accounts:,} accounts")
+    print(f"{'Variant':<24} {'Transfers/sec':>14}")
+    print("-" * 40)
+    for threads in workers:
+        engine = TransferEngine(_fresh_bank(num_accounts, 1000))
+        start_time = time.perf_counter()
+        engine.apply_batch(transfers, threads=threads)
+        seconds = time.perf_counter() - start_time
+        print(f"{f'lock striping x{threads}':<24} {num_transfers / seconds:>14,.0f}")
+    for shards in workers:
+        start_time = time.perf_counter()
+        sharded_apply([1000.0] * num_accounts, transfers, shards=shards)
+        seconds = time.perf_counter() - start_time
+        print(f"{f'sharded processes x{shards}':<24} {num_transfers / seconds:>14,.0f}")
+
+
+def test_conservation_under_contention():
+    """
+    Many threads transfer between a few accounts; no money may appear or vanish.
+
+    Usage example:
+        test_conservation_under_contention()
+    """
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    try:
+        num_accounts = 8  # Few accounts, so threads constantly collide
+        bank = _fresh_bank(num_accounts, 1000)
+        engine = TransferEngine(bank, stripes=4)
+        total_before = bank.total_funds()
+        transfers = _random_transfers(num_accounts, 100000, seed=7)
+        engine.apply_batch(transfers, threads=16)
+        assert bank.total_funds() == total_before
+        assert all(account.balance >= 0 for account in bank.accounts)
+    finally:
+        sys.setswitchinterval(old_interval)
+
+    balances, applied = sharded_apply([1000.0] * num_accounts, transfers, shards=3)
+    assert sum(balances) == 1000.0 * num_accounts
+    assert all(balance >= 0 for balance in balances)
+    print("Transfer conservation tests passed.")
+
+
+if __name__ == "__main__":
+    test_conservation_under_contention()
+    benchmark()